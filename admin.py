@@ -1,19 +1,26 @@
-
 import os
 import sys
+import csv
+import json
 import argparse
 from datetime import datetime
 
-# Add apps/server to path to find app.py and its models
-sys.path.append(os.path.join(os.getcwd(), 'apps', 'server'))
+# apps/server holds models.py; only the database layer is loaded, not the web app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'apps', 'server'))
 
 try:
-    from app import app, db, User, AIUsage, AuditLog
+    from models import core_app, db, User, AIUsage, AuditLog
+    from sqlalchemy import select, insert, func, case
     from werkzeug.security import generate_password_hash
 except ImportError as e:
     print(f"Error: Could not import application modules. {e}")
     sys.exit(1)
 
+app = core_app()
+
+ROLES = ('user', 'admin')
+EXPORT_FIELDS = ('id', 'timestamp', 'user_id', 'email', 'action', 'details', 'ip_address')
+
 def list_admins():
     """List all users with the admin role."""
     with app.app_context():
@@ -39,7 +46,7 @@ def reset_admin(email, password):
         else:
             print(f"Updating existing account: {email}")
             user.role = 'admin'
-        
+
         user.password_hash = generate_password_hash(password)
         db.session.commit()
         print(f"SUCCESS: Account {email} is now a System Administrator with password: {password}")
@@ -58,21 +65,141 @@ def fix_admin_role(email):
 def check_telemetry():
     """Check AI usage and system health."""
     with app.app_context():
-        usage_count = AIUsage.query.count()
-        logs_count = AuditLog.query.count()
-        users_count = User.query.count()
-        
+        # One round trip for every counter
+        count = lambda model, *where: select(func.count(model.id)).where(*where).scalar_subquery()
+        totals = db.session.execute(select(
+            count(User).label('users'),
+            count(User, User.role == 'admin').label('admins'),
+            count(AIUsage).label('ai_events'),
+            count(AuditLog).label('audit_entries'),
+            select(func.max(AuditLog.timestamp)).scalar_subquery().label('last_activity'),
+        )).one()
+
         print("\n--- SYSTEM TELEMETRY ---")
-        print(f"Total Registered Nodes: {users_count}")
-        print(f"AI Inference Events:    {usage_count}")
-        print(f"Audit Log Entries:      {logs_count}")
-        
+        print(f"Total Registered Nodes: {totals.users} ({totals.admins} admin)")
+        print(f"AI Inference Events:    {totals.ai_events}")
+        print(f"Audit Log Entries:      {totals.audit_entries}")
+        print(f"Last Activity:          {totals.last_activity or 'never'}")
+
+        # Per-model usage in a single grouped query
+        usage = db.session.execute(
+            select(
+                AIUsage.model_used,
+                func.count(AIUsage.id).label('events'),
+                func.coalesce(func.sum(AIUsage.tokens_input), 0).label('tokens_input'),
+                func.coalesce(func.sum(AIUsage.tokens_output), 0).label('tokens_output'),
+                func.sum(case((AIUsage.status != 'success', 1), else_=0)).label('degraded'),
+            ).group_by(AIUsage.model_used).order_by(func.count(AIUsage.id).desc())
+        ).all()
+        if usage:
+            print("\nAI Usage by Model:")
+            for row in usage:
+                print(f"{row.model_used:<28} {row.events:>8} calls  {row.tokens_input:>10} in  "
+                      f"{row.tokens_output:>10} out  {row.degraded:>6} failed/fallback")
+
         last_logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).limit(5).all()
         print("\nRecent Activity Stream:")
         for log in last_logs:
             print(f"[{log.timestamp}] {log.action}: {log.details}")
         print("------------------------\n")
 
+def _read_users(path):
+    """Yields (line, email, role, password) from a CSV with an email column and optional role/password."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        fields = {name.strip().lower(): name for name in reader.fieldnames or ()}
+        if 'email' not in fields:
+            raise ValueError("CSV needs a header row with an 'email' column")
+        for row in reader:
+            value = lambda key: (row.get(fields[key]) or '').strip() if key in fields else ''
+            yield reader.line_num, value('email'), value('role') or 'user', value('password')
+
+def import_users(path, batch_size=500, dry_run=False):
+    """Create accounts from a CSV in batches: one lookup and one multi-row insert per batch."""
+    created = skipped = invalid = 0
+    seen = set()
+
+    def flush(batch):
+        nonlocal created, skipped
+        existing = set(db.session.scalars(select(User.email).where(User.email.in_([u['email'] for u in batch]))))
+        rows = [u for u in batch if u['email'] not in existing]
+        skipped += len(batch) - len(rows)
+        if rows and not dry_run:
+            db.session.execute(insert(User), rows)
+            db.session.commit()
+        created += len(rows)
+
+    with app.app_context():
+        batch = []
+        for line, email, role, password in _read_users(path):
+            if '@' not in email or role not in ROLES:
+                print(f"line {line}: skipped invalid row ({email or 'no email'}, role {role})")
+                invalid += 1
+                continue
+            if email in seen:
+                skipped += 1
+                continue
+            seen.add(email)
+            batch.append({
+                "email": email,
+                "role": role,
+                "salt": os.urandom(16),
+                # Hashing is deliberately slow; most accounts sign in by OTP and need none
+                "password_hash": generate_password_hash(password) if password else None,
+                "created_at": datetime.utcnow(),
+            })
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        if created and not dry_run:
+            db.session.add(AuditLog(action="ADMIN_IMPORTED_USERS", details=f"Imported {created} accounts from {os.path.basename(path)}"))
+            db.session.commit()
+
+    verb = "Would create" if dry_run else "Created"
+    print(f"{verb} {created} accounts; {skipped} already registered or duplicated, {invalid} invalid.")
+
+def export_logs(output=None, fmt='csv', since=None, action=None, batch_size=1000):
+    """Stream audit log entries, oldest first, without loading the table into memory."""
+    query = (
+        select(AuditLog.id, AuditLog.timestamp, AuditLog.user_id, User.email, AuditLog.action,
+               AuditLog.details, AuditLog.ip_address)
+        .outerjoin(User, User.id == AuditLog.user_id)
+        .order_by(AuditLog.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if since:
+        query = query.where(AuditLog.timestamp >= since)
+    if action:
+        query = query.where(AuditLog.action == action)
+
+    out = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    count = 0
+    try:
+        with app.app_context():
+            writer = csv.writer(out)
+            if fmt == 'csv':
+                writer.writerow(EXPORT_FIELDS)
+            for row in db.session.execute(query):
+                values = [row.timestamp.isoformat() if name == 'timestamp' and row.timestamp else getattr(row, name)
+                          for name in EXPORT_FIELDS]
+                if fmt == 'csv':
+                    writer.writerow(values)
+                else:
+                    out.write(json.dumps(dict(zip(EXPORT_FIELDS, values))) + "\n")
+                count += 1
+    finally:
+        if output:
+            out.close()
+    print(f"Exported {count} audit log entries{f' to {output}' if output else ''}.", file=sys.stderr)
+
+def _date(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD[THH:MM], got {value!r}")
+
 def main():
     parser = argparse.ArgumentParser(description="Gene Forge Administrative Terminal Utilities")
     subparsers = parser.add_subparsers(dest='command', help='Commands')
@@ -92,6 +219,20 @@ def main():
     # Telemetry
     subparsers.add_parser('status', help='Check system telemetry and logs')
 
+    # Bulk import
+    import_parser = subparsers.add_parser('import-users', help='Create accounts from a CSV (email[,role][,password])')
+    import_parser.add_argument('csv', help='CSV file with a header row')
+    import_parser.add_argument('--batch-size', type=int, default=500, help='Rows per insert')
+    import_parser.add_argument('--dry-run', action='store_true', help='Validate and count without writing')
+
+    # Audit export
+    export_parser = subparsers.add_parser('export-logs', help='Stream audit log entries as CSV or NDJSON')
+    export_parser.add_argument('--output', help='Output file (default stdout)')
+    export_parser.add_argument('--format', choices=('csv', 'ndjson'), default='csv')
+    export_parser.add_argument('--since', type=_date, help='Only entries at or after this date')
+    export_parser.add_argument('--action', help='Only entries with this action')
+    export_parser.add_argument('--batch-size', type=int, default=1000, help='Rows fetched per round trip')
+
     args = parser.parse_args()
 
     if args.command == 'list':
@@ -102,6 +243,19 @@ def main():
         fix_admin_role(args.email)
     elif args.command == 'status':
         check_telemetry()
+    elif args.command == 'import-users':
+        try:
+            import_users(args.csv, args.batch_size, args.dry_run)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    elif args.command == 'export-logs':
+        try:
+            export_logs(args.output, args.format, args.since, args.action, args.batch_size)
+        except BrokenPipeError:
+            # Reader went away (e.g. piped into head); silence the flush at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
     else:
         parser.print_help()
 
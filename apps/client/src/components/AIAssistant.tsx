@@ -16,6 +16,9 @@ import {
 import { useAuth } from '../hooks/useAuth';
 import { toast } from './ui/use-toast';
 import { API_BASE_URL as API_URL } from '@/utils/api';
+import { readEventStream } from '@/utils/sse';
+
+const STREAM_RETRIES = 3;
 
 interface AIAssistantProps {
     analysisData: {
@@ -38,47 +41,57 @@ const AIAssistant: React.FC<AIAssistantProps> = ({ analysisData }) => {
         setExplanation('');
         setActiveModel('Routing...');
 
-        try {
-            const response = await fetch(`${API_URL}/ai/explain`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'Authorization': `Bearer ${sessionStorage.getItem('access_token')}`
-                },
-                credentials: 'include',
-                body: JSON.stringify({
-                    results: analysisData,
-                    mode: mode
-                })
-            });
-
-            if (!response.body) throw new Error("No response stream");
-
-            const reader = response.body.getReader();
-            const decoder = new TextDecoder();
-
-            setExplanation(''); // Ready for stream
+        // Reconnects resume after the last event id; the server never re-runs the model for them
+        let lastEventId: string | undefined;
+        let finished = false;
+        let failed = false;
 
-            while (true) {
-                const { done, value } = await reader.read();
-                if (done) break;
-
-                const chunk = decoder.decode(value);
-
-                // Parse for Model Header
-                if (chunk.includes("__MODEL_USED__:")) {
-                    const parts = chunk.split("__MODEL_USED__:");
-                    const modelTag = parts[1].split("\n")[0];
-                    setActiveModel(modelTag);
-                    // Append only the non-header parts
-                    const cleanChunk = parts[0] + (parts[1].split("\n").slice(1).join("\n"));
-                    setExplanation(prev => (prev || '') + cleanChunk);
-                } else {
-                    setExplanation(prev => (prev || '') + chunk);
+        try {
+            for (let attempt = 0; !finished && attempt <= STREAM_RETRIES; attempt++) {
+                if (attempt > 0) await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+                try {
+                    const response = await fetch(`${API_URL}/ai/explain`, {
+                        method: 'POST',
+                        headers: {
+                            'Content-Type': 'application/json',
+                            'Authorization': `Bearer ${sessionStorage.getItem('access_token')}`,
+                            ...(lastEventId ? { 'Last-Event-ID': lastEventId } : {})
+                        },
+                        credentials: 'include',
+                        body: JSON.stringify({
+                            results: analysisData,
+                            mode: mode
+                        })
+                    });
+                    if (!response.ok) throw new Error(`Error ${response.status}`);
+
+                    await readEventStream(response, ({ id, event, data }) => {
+                        if (id) lastEventId = id;
+                        if (event === 'reset') {
+                            setExplanation('');
+                        } else if (event === 'model') {
+                            setActiveModel(data);
+                        } else if (event === 'error') {
+                            failed = true;
+                            setExplanation(prev => `${prev || ''}\n[Error: ${data}]`);
+                        } else if (event === 'done') {
+                            finished = true;
+                        } else {
+                            setExplanation(prev => (prev || '') + data);
+                        }
+                    });
+                } catch (error) {
+                    if (attempt === STREAM_RETRIES) throw error;
+                    console.warn("AI stream dropped, resuming:", error);
                 }
             }
+            if (!finished) throw new Error("AI stream ended early");
 
-            toast({ title: "Intelligence Deployed", description: "Analysis complete." });
+            if (failed) {
+                toast({ title: "Analysis Failed", description: "AI engine unavailable.", variant: "destructive" });
+            } else {
+                toast({ title: "Intelligence Deployed", description: "Analysis complete." });
+            }
 
         } catch (error) {
             console.error("AI Insights Error:", error);
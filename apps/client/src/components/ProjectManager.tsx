@@ -14,7 +14,7 @@ import {
     Plus
 } from 'lucide-react';
 import { useAuth } from '../hooks/useAuth';
-import { API_BASE_URL as API_URL } from '@/utils/api';
+import { API_BASE_URL as API_URL, fetchAllPages } from '@/utils/api';
 
 interface Project {
     id: number;
@@ -47,8 +47,8 @@ const ProjectManager: React.FC<ProjectManagerProps> = ({ onLoadAnalysis, current
     const fetchProjects = useCallback(async () => {
         setLoading(true);
         try {
-            const resp = await fetch(`${API_URL}/projects`, { credentials: 'include' });
-            if (resp.ok) setProjects(await resp.json());
+            const rows = await fetchAllPages<Project>(`${API_URL}/projects?limit=500`);
+            if (rows) setProjects(rows);
         } finally {
             setLoading(false);
         }
@@ -93,8 +93,8 @@ const ProjectManager: React.FC<ProjectManagerProps> = ({ onLoadAnalysis, current
     const fetchVersions = async (projectId: number) => {
         setLoadingVersions(true);
         try {
-            const resp = await fetch(`${API_URL}/projects/${projectId}/analysis`, { credentials: 'include' });
-            if (resp.ok) setVersions(await resp.json());
+            const rows = await fetchAllPages<AnalysisVersion>(`${API_URL}/projects/${projectId}/analysis?limit=500`);
+            if (rows) setVersions(rows);
         } finally {
             setLoadingVersions(false);
         }
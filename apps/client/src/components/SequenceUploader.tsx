@@ -8,7 +8,7 @@ import { toast } from '@/components/ui/use-toast';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { UploadCloud, FileText, Keyboard, CheckCircle2, Database, ShieldCheck, Clock, Loader2 } from 'lucide-react';
 import { useAuth } from '../hooks/useAuth';
-import { API_BASE_URL as API_URL } from '@/utils/api';
+import { API_BASE_URL as API_URL, fetchAllPages } from '@/utils/api';
 
 interface SequenceUploaderProps {
   onSequenceSubmit: (sequence: string) => void;
@@ -102,12 +102,9 @@ const SequenceUploader: React.FC<SequenceUploaderProps> = ({ onSequenceSubmit })
   const fetchSavedRecords = async () => {
     setLoadingSaved(true);
     try {
-      const response = await fetch(`${API_URL}/genomic-data`, {
-        credentials: 'include',
-      });
-      if (response.ok) {
-        const data = await response.json();
-        setSavedRecords(data);
+      const rows = await fetchAllPages<SavedRecord>(`${API_URL}/genomic-data?limit=500`);
+      if (rows) {
+        setSavedRecords(rows);
       }
     } finally {
       setLoadingSaved(false);
@@ -5,6 +5,7 @@ import { useAuth } from "@/hooks/useAuth";
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 import { Loader2, Activity, Database, ArrowUpRight, Cpu } from 'lucide-react';
 import { toast } from '@/components/ui/use-toast';
+import { fetchAllPages } from '@/utils/api';
 
 interface UsageRecord {
     id: number;
@@ -35,10 +36,9 @@ const AdminAI = () => {
     const fetchUsage = async () => {
         try {
             const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
-            const res = await fetch(`${API_URL}/ai/usage`, { credentials: 'include' });
-            if (res.ok) {
-                const json = await res.json();
-                setData(json);
+            const rows = await fetchAllPages<UsageRecord>(`${API_URL}/ai/usage?limit=1000`);
+            if (rows) {
+                setData(rows);
             } else {
                 toast({ title: "Access Denied", description: "Admin privileges required.", variant: "destructive" });
             }
@@ -46,6 +46,7 @@ import {
 } from "@/components/ui/select";
 import { Label } from "@/components/ui/label";
 import { toast } from '@/components/ui/use-toast';
+import { fetchAllPages } from '@/utils/api';
 
 interface UserRecord {
     id: number;
@@ -78,10 +79,9 @@ const AdminUsers = () => {
     const fetchUsers = async () => {
         try {
             const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
-            const res = await fetch(`${API_URL}/admin/users`, { credentials: 'include' });
-            if (res.ok) {
-                const json = await res.json();
-                setUsers(json);
+            const rows = await fetchAllPages<UserRecord>(`${API_URL}/admin/users?limit=1000`);
+            if (rows) {
+                setUsers(rows);
             }
         } catch (e) {
             console.error(e);
@@ -46,4 +46,23 @@ export const apiFetch = async (endpoint: string, options: RequestInit = {}) => {
     return response.json();
 };
 
+/**
+ * Collects every page of a cursor-paginated list endpoint (follows X-Next-Cursor).
+ * Resolves to null if any page request fails.
+ */
+export const fetchAllPages = async <T>(url: string, options: RequestInit = {}): Promise<T[] | null> => {
+    const rows: T[] = [];
+    let cursor: string | null = null;
+    do {
+        const pageUrl: string = cursor
+            ? `${url}${url.includes('?') ? '&' : '?'}cursor=${encodeURIComponent(cursor)}`
+            : url;
+        const response = await fetch(pageUrl, { credentials: 'include', ...options });
+        if (!response.ok) return null;
+        rows.push(...(await response.json()));
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return rows;
+};
+
 export default API_BASE_URL;
@@ -0,0 +1,51 @@
+/**
+ * Minimal Server-Sent Events reader for fetch() responses
+ * (EventSource cannot POST or send the Authorization header)
+ */
+
+export interface StreamEvent {
+    id?: string;
+    event: string;
+    data: string;
+}
+
+export const readEventStream = async (
+    response: Response,
+    onEvent: (event: StreamEvent) => void
+): Promise<void> => {
+    if (!response.body) throw new Error("No response stream");
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    const dispatch = (block: string) => {
+        const frame: StreamEvent = { event: 'message', data: '' };
+        const data: string[] = [];
+        for (const line of block.split('\n')) {
+            if (!line || line.startsWith(':')) continue; // comments are keep-alives
+            const colon = line.indexOf(':');
+            const field = colon === -1 ? line : line.slice(0, colon);
+            let value = colon === -1 ? '' : line.slice(colon + 1);
+            if (value.startsWith(' ')) value = value.slice(1);
+            if (field === 'data') data.push(value);
+            else if (field === 'event') frame.event = value;
+            else if (field === 'id') frame.id = value;
+        }
+        if (!data.length && !frame.id && frame.event === 'message') return;
+        frame.data = data.join('\n');
+        onEvent(frame);
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true }).replace(/\r\n?/g, '\n');
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+            dispatch(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+        }
+    }
+};
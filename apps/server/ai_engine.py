@@ -1,55 +1,103 @@
 import os
 import time
+import logging
 import warnings
+import threading
 # Suppress Google Generative AI deprecation warnings
 warnings.filterwarnings("ignore", category=FutureWarning, module="google.generativeai")
-import google.generativeai as genai
-from openai import OpenAI
 from dotenv import load_dotenv
+from metrics import AICall
 
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
 
+OFFLINE_MESSAGE = "AI interpretation service is currently offline. Please verify API configuration in the secure terminal."
+
+GATEWAY_BASE_URL = os.environ.get("AI_GATEWAY_BASE_URL", "https://ai-gateway.vercel.sh/v1")
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+# REST keeps Gemini calls on (green) sockets; gRPC would block the eventlet hub
+GEMINI_TRANSPORT = os.environ.get("AI_GEMINI_TRANSPORT", "rest")
+GEMINI_REQUEST_OPTIONS = {"timeout": float(os.environ.get("AI_READ_TIMEOUT", 120))}
+
+log = logging.getLogger(__name__)
+
 class AIBioEngine:
     def __init__(self):
+        # Keys only: SDK clients are imported and built on first use (or by warm()),
+        # which keeps importing this module cheap for CLIs and cold starts
+        self._clients = {}
+        self._lock = threading.Lock()
+
         # AI Gateway (Priority)
         self.gateway_key = os.environ.get("AI_GATEWAY_API_KEY")
-        if self.gateway_key:
-            print("AI GATEWAY: Initialize Secure Laboratory Proxy...")
-            self.gateway_client = OpenAI(
-                api_key=self.gateway_key,
-                base_url='https://ai-gateway.vercel.sh/v1'
-            )
-        else:
-            self.gateway_client = None
 
         # Primary Model: OpenAI
         self.openai_key = os.environ.get("OPENAI_API_KEY")
         if self.openai_key and "your-" in self.openai_key:
-            print("WARNING: OpenAI API Key is a placeholder. OpenAI will be disabled.")
+            log.warning("OpenAI API Key is a placeholder. OpenAI will be disabled.")
             self.openai_key = None
-            
-        self.openai_client = OpenAI(api_key=self.openai_key) if self.openai_key else None
         
         # Fallback Model: Gemini
         self.gemini_key = os.environ.get("GEMINI_API_KEY")
         if self.gemini_key and "your-" in self.gemini_key:
-            print("WARNING: Gemini API Key is a placeholder. Gemini will be disabled.")
+            log.warning("Gemini API Key is a placeholder. Gemini will be disabled.")
             self.gemini_key = None
 
-        if self.gemini_key:
-            genai.configure(api_key=self.gemini_key)
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-pro')
-        else:
-            self.gemini_model = None
+    def _client(self, name, build):
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = build()
+            return self._clients[name]
+
+    @property
+    def gateway_client(self):
+        if not self.gateway_key:
+            return None
+        def build():
+            from ai_transport import provider_transports
+            log.info("AI GATEWAY: Initialize Secure Laboratory Proxy...")
+            return provider_transports.openai_client('gateway', self.gateway_key, GATEWAY_BASE_URL)
+        return self._client('gateway', build)
+
+    @property
+    def openai_client(self):
+        if not self.openai_key:
+            return None
+        def build():
+            from ai_transport import provider_transports
+            return provider_transports.openai_client('openai', self.openai_key, OPENAI_BASE_URL)
+        return self._client('openai', build)
+
+    @property
+    def gemini_model(self):
+        if not self.gemini_key:
+            return None
+        def build():
+            import google.generativeai as genai
+            genai.configure(api_key=self.gemini_key, transport=GEMINI_TRANSPORT)
+            return genai.GenerativeModel('gemini-1.5-pro')
+        return self._client('gemini', build)
+
+    def warm(self):
+        """Worker start: builds the configured clients, then keeps their connection pools warm."""
+        for name in ('gateway_client', 'openai_client', 'gemini_model'):
+            try:
+                getattr(self, name)
+            except Exception as e:
+                log.warning("AI GATEWAY: %s unavailable: %s", name, e)
+        if self.gateway_key or self.openai_key:
+            from ai_transport import provider_transports
+            provider_transports.keep_warm()
 
     def generate_explanation(self, analysis_data, mode="researcher"):
         """Non-streaming version for simpler integration."""
         prompt = self._build_prompt(analysis_data, mode)
+        attempt = 0
         
         # 1. Try AI Gateway (Experimental/High Priority)
         if self.gateway_client:
+            call = AICall("gateway-experimental-gpt5", attempt)
             try:
-                print("AI GATEWAY: Routing through Vercel Neural Proxy...")
+                log.debug("AI GATEWAY: Routing through Vercel Neural Proxy...")
                 response = self.gateway_client.chat.completions.create(
                     model='openai/gpt-5', # Custom model per user specs
                     messages=[
@@ -57,12 +105,16 @@ class AIBioEngine:
                         {"role": "user", "content": prompt}
                     ]
                 )
+                call.done()
                 return response.choices[0].message.content
             except Exception as e:
-                print(f"AI GATEWAY: Proxy failure, falling back: {e}")
+                call.failed()
+                attempt += 1
+                log.warning("AI GATEWAY: Proxy failure, falling back: %s", e)
 
         # 2. Try Direct OpenAI
         if self.openai_client:
+            call = AICall("openai-gpt-4o", attempt)
             try:
                 response = self.openai_client.chat.completions.create(
                     model="gpt-4o",
@@ -71,19 +123,25 @@ class AIBioEngine:
                         {"role": "user", "content": prompt}
                     ]
                 )
+                call.done()
                 return response.choices[0].message.content
             except Exception as e:
-                print(f"AI GATEWAY: OpenAI Failure: {e}")
+                call.failed()
+                attempt += 1
+                log.warning("AI GATEWAY: OpenAI Failure: %s", e)
 
         # Try Gemini
         if self.gemini_model:
+            call = AICall("google-gemini-1.5", attempt)
             try:
-                response = self.gemini_model.generate_content(prompt)
+                response = self.gemini_model.generate_content(prompt, request_options=GEMINI_REQUEST_OPTIONS)
+                call.done()
                 return response.text
             except Exception as e:
-                print(f"AI GATEWAY: Gemini Failure: {e}")
+                call.failed()
+                log.warning("AI GATEWAY: Gemini Failure: %s", e)
 
-        return "AI interpretation service is currently offline. Please verify API configuration in the secure terminal."
+        return OFFLINE_MESSAGE
 
     def generate_explanation_stream(self, analysis_data, mode="researcher"):
         """
@@ -92,11 +150,13 @@ class AIBioEngine:
         """
         prompt = self._build_prompt(analysis_data, mode)
         model_used = "none"
+        attempt = 0
 
         # 1. Try AI Gateway
         if self.gateway_client:
+            call = AICall("gateway-experimental-gpt5", attempt)
             try:
-                print("AI GATEWAY: Attempting stream via Laboratory Proxy...")
+                log.debug("AI GATEWAY: Attempting stream via Laboratory Proxy...")
                 stream = self.gateway_client.chat.completions.create(
                     model='openai/gpt-5',
                     messages=[
@@ -109,17 +169,22 @@ class AIBioEngine:
                 yield f"__MODEL_USED__:{model_used}\n"
                 for chunk in stream:
                     if chunk.choices and chunk.choices[0].delta.content is not None:
+                        call.token()
                         yield chunk.choices[0].delta.content
+                call.done()
                 return
             except Exception as e:
-                print(f"AI GATEWAY: Proxy stream failure: {e}")
+                call.failed()
+                attempt += 1
+                log.warning("AI GATEWAY: Proxy stream failure: %s", e)
 
         # 2. Try Primary (OpenAI)
         if self.openai_client:
             models_to_try = ["gpt-4o", "gpt-4", "gpt-3.5-turbo"]
             for model_name in models_to_try:
+                call = AICall(f"openai-{model_name}", attempt)
                 try:
-                    print(f"AI GATEWAY: Routing to Primary Model (OpenAI {model_name})...")
+                    log.debug("AI GATEWAY: Routing to Primary Model (OpenAI %s)...", model_name)
                     stream = self.openai_client.chat.completions.create(
                         model=model_name,
                         messages=[
@@ -133,31 +198,39 @@ class AIBioEngine:
                     
                     for chunk in stream:
                         if chunk.choices and chunk.choices[0].delta.content is not None:
+                            call.token()
                             yield chunk.choices[0].delta.content
+                    call.done()
                     return # Success
                 except Exception as e:
-                    print(f"AI GATEWAY: OpenAI {model_name} Failed: {str(e)}")
+                    call.failed()
+                    attempt += 1
+                    log.warning("AI GATEWAY: OpenAI %s Failed: %s", model_name, e)
                     if model_name == models_to_try[-1]: # If last one failed
-                         print("AI GATEWAY: All OpenAI models failed. Trying Gemini fallback...")
+                         log.warning("AI GATEWAY: All OpenAI models failed. Trying Gemini fallback...")
         
         # 3. Fallback (Gemini)
         if self.gemini_model:
+            call = AICall("google-gemini-1.5", attempt)
             try:
-                print("AI GATEWAY: Routing to Fallback Model (Gemini 1.5)...")
-                response = self.gemini_model.generate_content(prompt, stream=True)
+                log.debug("AI GATEWAY: Routing to Fallback Model (Gemini 1.5)...")
+                response = self.gemini_model.generate_content(prompt, stream=True, request_options=GEMINI_REQUEST_OPTIONS)
                 model_used = "google-gemini-1.5"
                 yield f"__MODEL_USED__:{model_used}\n"
                 
                 for chunk in response:
                     try:
                         if chunk.text:
+                            call.token()
                             yield chunk.text
                     except Exception as inner_e:
-                        print(f"AI GATEWAY: Gemini chunk error: {inner_e}")
+                        log.warning("AI GATEWAY: Gemini chunk error: %s", inner_e)
                         yield "\n[Signal Interrupted: Safety filters or connectivity issues detected]\n"
+                call.done()
                 return # Success
             except Exception as e:
-                 print(f"AI GATEWAY: Fallback Model Failed: {str(e)}")
+                 call.failed()
+                 log.error("AI GATEWAY: Fallback Model Failed: %s", e)
         
         if not self.openai_client and not self.gemini_model:
             yield "Critical: No AI models are configured. Please set OPENAI_API_KEY or GEMINI_API_KEY in the environment."
@@ -171,7 +244,27 @@ class AIBioEngine:
         base_counts = results.get('base_counts', results.get('nucleotide_counts', {}))
         gc_content = results.get('gc_content', 'Unknown')
         crispr_guides = results.get('crispr_guides', results.get('crispr_targets', []))
+        codon_usage = results.get('codon_usage') or {}
+        annotations = results.get('annotations') or {}
         
+        # Optional codon usage summary from /api/analysis/codon-usage
+        codon_line = ""
+        if codon_usage:
+            summary = codon_usage.get('summary', codon_usage)
+            reference = codon_usage.get('reference_name', codon_usage.get('reference', 'reference organism'))
+            codon_line = (f"\n        - Codon Usage vs {reference}: {summary.get('genes', 0)} ORFs, "
+                          f"mean CAI {summary.get('mean_cai')}, mean tAI {summary.get('mean_tai')}, "
+                          f"GC3 {summary.get('mean_gc3')}")
+
+        # Optional structural annotation summary from /api/analysis/<id>/annotations
+        annotation_line = ""
+        if annotations:
+            summary = annotations.get('summary', annotations)
+            parts = [f"{v.get('count', 0)} {k.replace('_', ' ')} ({v.get('bases', 0)} bp)"
+                     for k, v in summary.items() if isinstance(v, dict)]
+            if parts:
+                annotation_line = "\n        - Structural Annotations: " + ", ".join(parts)
+
         system_context = "You are an expert bioinformatician and molecular biologist."
         if mode == "student":
             system_context += " Explain concepts simply for an undergraduate biology student."
@@ -185,7 +278,7 @@ class AIBioEngine:
         - Sequence (sample): {sequence[:150]}... (Total Length: {len(sequence)} bp)
         - Nucleotide Composition: {base_counts}
         - Global GC Content: {gc_content}%
-        - CRISPR Candidates: {len(crispr_guides)} guides found
+        - CRISPR Candidates: {len(crispr_guides)} guides found{codon_line}{annotation_line}
         
         Please provide a structured report including:
         1. **Executive Summary**: Brief overview of the sequence composition.
@@ -0,0 +1,223 @@
+import os
+import time
+import logging
+import threading
+import importlib.util
+
+try:
+    import httpx2 as httpx      # transport of openai>=3
+except ImportError:
+    import httpx
+
+log = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = float(os.environ.get('AI_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('AI_READ_TIMEOUT', 120))
+POOL_SIZE = int(os.environ.get('AI_POOL_SIZE', 20))
+POOL_KEEPALIVE = int(os.environ.get('AI_POOL_KEEPALIVE', 10))
+KEEPALIVE_EXPIRY = float(os.environ.get('AI_KEEPALIVE_EXPIRY', 90))
+MAX_RETRIES = int(os.environ.get('AI_MAX_RETRIES', 2))
+# Touch pools idle this long so connections outlive provider idle timeouts (0 disables)
+KEEPWARM_SECONDS = float(os.environ.get('AI_KEEPWARM_SECONDS', 60))
+# HTTP/2 needs the h2 package; 'auto' uses it when installed
+_HTTP2 = os.environ.get('AI_HTTP2', 'auto').lower()
+HTTP2 = importlib.util.find_spec('h2') is not None if _HTTP2 == 'auto' else _HTTP2 in ('1', 'true', 'yes')
+
+
+class _Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.errors = 0
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.tls_seconds = 0.0
+        self.header_seconds = 0.0
+        self.prewarms = 0
+        self.prewarmed_at = None
+        self.last_used = None
+
+
+class _DrainAfterDone(httpx.SyncByteStream):
+    """
+    The sync SDK stream closes the response as soon as it sees [DONE], before the chunked
+    terminator is read, and HTTP/1.1 then drops the connection. Finished event streams are
+    drained on close so the connection goes back to the pool.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._done = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._done = b"[DONE]" in chunk[-64:]
+            yield chunk
+
+    def close(self):
+        try:
+            if self._done:
+                for _ in self._stream:
+                    pass
+        except httpx.HTTPError:
+            pass
+        finally:
+            self._stream.close()
+
+
+class _MeteredTransport(httpx.HTTPTransport):
+    """Counts requests, new connections and handshake time via the connection-pool trace hooks."""
+
+    def __init__(self, counters, **kwargs):
+        super().__init__(**kwargs)
+        self.counters = counters
+
+    def handle_request(self, request):
+        counters = self.counters
+        upstream = request.extensions.get("trace")
+        started = {}
+
+        def trace(name, info):
+            step, _, phase = name.rpartition(".")
+            if phase == "started":
+                started[step] = time.perf_counter()
+            elif phase == "complete" and step in started:
+                elapsed = time.perf_counter() - started.pop(step)
+                with counters.lock:
+                    if step == "connection.connect_tcp":
+                        counters.connects += 1
+                        counters.connect_seconds += elapsed
+                    elif step == "connection.start_tls":
+                        counters.tls_seconds += elapsed
+            if upstream:
+                upstream(name, info)
+
+        request.extensions["trace"] = trace
+        begin = time.perf_counter()
+        with counters.lock:
+            counters.requests += 1
+            counters.in_flight += 1
+        try:
+            response = super().handle_request(request)
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                response.stream = _DrainAfterDone(response.stream)
+            return response
+        except Exception:
+            with counters.lock:
+                counters.errors += 1
+            raise
+        finally:
+            with counters.lock:
+                counters.in_flight -= 1
+                counters.header_seconds += time.perf_counter() - begin
+                counters.last_used = time.time()
+
+
+class ProviderTransport:
+    """One pooled keep-alive HTTP client per provider endpoint, shared by every SDK client for it."""
+
+    def __init__(self, name, base_url):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.counters = _Counters()
+        self.transport = _MeteredTransport(
+            self.counters,
+            http2=HTTP2,
+            retries=1,      # connection-level retries only; the SDK retries requests
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_KEEPALIVE,
+                                keepalive_expiry=KEEPALIVE_EXPIRY),
+        )
+        self.client = httpx.Client(
+            transport=self.transport,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=CONNECT_TIMEOUT),
+        )
+
+    def _connections(self):
+        pool = getattr(self.transport, "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def prewarm(self):
+        """Opens (DNS + TCP + TLS) a pooled connection ahead of the first real request."""
+        try:
+            # Any status will do; unauthenticated requests are not billed
+            self.client.request("HEAD", self.base_url + "/models", timeout=CONNECT_TIMEOUT * 2)
+        except httpx.HTTPError as e:
+            log.warning("AI TRANSPORT: prewarm of %s failed: %s", self.name, e)
+            return False
+        with self.counters.lock:
+            self.counters.prewarms += 1
+            self.counters.prewarmed_at = time.time()
+        return True
+
+    def snapshot(self):
+        connections = self._connections()
+        idle = sum(1 for c in connections if c.is_idle())
+        c = self.counters
+        with c.lock:
+            return {
+                "base_url": self.base_url,
+                "http2": HTTP2,
+                "connections": len(connections),
+                "idle": idle,
+                "active": len(connections) - idle,
+                "max_connections": POOL_SIZE,
+                "utilization": round((len(connections) - idle) / POOL_SIZE, 3),
+                "requests": c.requests,
+                "in_flight": c.in_flight,
+                "errors": c.errors,
+                "connects": c.connects,
+                "avg_connect_ms": round(1000 * c.connect_seconds / c.connects, 1) if c.connects else None,
+                "avg_tls_ms": round(1000 * c.tls_seconds / c.connects, 1) if c.connects else None,
+                "avg_headers_ms": round(1000 * c.header_seconds / c.requests, 1) if c.requests else None,
+                "prewarms": c.prewarms,
+                "prewarmed_at": c.prewarmed_at,
+                "last_used": c.last_used,
+            }
+
+
+class TransportRegistry:
+    def __init__(self):
+        self._transports = {}
+        self._lock = threading.Lock()
+        self._warming = False
+
+    def get(self, name, base_url):
+        with self._lock:
+            transport = self._transports.get(name)
+            if transport is None:
+                transport = self._transports[name] = ProviderTransport(name, base_url)
+            return transport
+
+    def openai_client(self, name, api_key, base_url):
+        """OpenAI-compatible SDK client on the shared pool for `name`, with explicit timeouts."""
+        from openai import OpenAI
+        transport = self.get(name, base_url)
+        return OpenAI(api_key=api_key, base_url=base_url, http_client=transport.client,
+                      timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT), max_retries=MAX_RETRIES)
+
+    def prewarm_all(self):
+        for transport in list(self._transports.values()):
+            transport.prewarm()
+
+    def keep_warm(self):
+        """
+        Worker-start loop (run it with task_runner.spawn): warms every provider once, then
+        touches any pool unused for KEEPWARM_SECONDS so its connection never idles out.
+        """
+        if self._warming or not self._transports:
+            return
+        self._warming = True
+        self.prewarm_all()
+        while KEEPWARM_SECONDS > 0:
+            time.sleep(KEEPWARM_SECONDS)
+            now = time.time()
+            for transport in list(self._transports.values()):
+                if now - (transport.counters.last_used or 0) >= KEEPWARM_SECONDS:
+                    transport.prewarm()
+
+    def snapshot(self):
+        return {name: t.snapshot() for name, t in self._transports.items()}
+
+
+provider_transports = TransportRegistry()
@@ -0,0 +1,200 @@
+import numpy as np
+
+from batch_engine import analyze_batch, RESTRICTION_ENZYMES, GUIDE_LENGTH
+from orf_engine import find_orfs
+
+# Byte -> code lookup: A, C, G, T = 0..3, anything else = 4
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _CODES[ord(_b)] = _i
+    _CODES[ord(_b.lower())] = _i
+A, C, G, T, OTHER = range(5)
+
+# CpG islands (Gardiner-Garden & Frommer)
+CPG_WINDOW = 200
+CPG_MIN_GC = 0.5
+CPG_MIN_OBS_EXP = 0.6
+
+# Tandem repeats; periods up to 6 are reported as microsatellites
+MAX_REPEAT_PERIOD = 50
+MICROSATELLITE_MAX_PERIOD = 6
+REPEAT_MIN_LENGTH = 12
+REPEAT_MIN_COPIES = 3
+
+# Symmetric DUST over 64 bp windows every 32 bp
+DUST_WINDOW = 64
+DUST_STEP = 32
+DUST_THRESHOLD = 20.0
+
+ORF_MIN_LENGTH = 100   # amino acids
+
+STRUCTURAL_KINDS = ("cpg_island", "microsatellite", "tandem_repeat", "low_complexity")
+FEATURE_KINDS = ("restriction_site", "crispr_guide", "orf", "snp")
+KINDS = STRUCTURAL_KINDS + FEATURE_KINDS
+
+_SITE_LENGTHS = {name: (len(site), cut) for name, site, cut in RESTRICTION_ENZYMES}
+
+
+def encode(sequence):
+    return _CODES[np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)]
+
+
+def _runs(mask):
+    """[start, end) pairs for runs of True."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _merge(starts, ends):
+    """Merges overlapping or touching [start, end) intervals sorted by start."""
+    if not len(starts):
+        return starts, ends
+    ends = np.maximum.accumulate(ends)
+    new_group = np.concatenate(([True], starts[1:] > ends[:-1]))
+    group = np.cumsum(new_group) - 1
+    merged_ends = np.zeros(group[-1] + 1, dtype=ends.dtype)
+    np.maximum.at(merged_ends, group, ends)
+    return starts[new_group], merged_ends
+
+
+def _annotation(kind, start, end, score, **attributes):
+    # Stored 1-based, end inclusive, like the rest of the analysis output
+    return {"kind": kind, "start": int(start) + 1, "end": int(end), "score": round(float(score), 4),
+            "attributes": attributes}
+
+
+def find_cpg_islands(codes, window=CPG_WINDOW, min_gc=CPG_MIN_GC, min_obs_exp=CPG_MIN_OBS_EXP):
+    """Windows passing GC and CpG observed/expected thresholds, merged into islands."""
+    n = len(codes)
+    if n < window:
+        return []
+    c_sum = np.concatenate(([0], np.cumsum(codes == C)))
+    g_sum = np.concatenate(([0], np.cumsum(codes == G)))
+    cg_sum = np.concatenate(([0, 0], np.cumsum((codes[:-1] == C) & (codes[1:] == G))))
+
+    def stats(lo, hi):
+        length = hi - lo
+        c = c_sum[hi] - c_sum[lo]
+        g = g_sum[hi] - g_sum[lo]
+        cg = cg_sum[hi] - cg_sum[lo + 1]          # dinucleotides starting inside [lo, hi - 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            obs_exp = np.where(c * g > 0, cg * length / (c * g), 0.0)
+        return (c + g) / length, obs_exp, cg
+
+    lo = np.arange(n - window + 1)
+    gc, obs_exp, _ = stats(lo, lo + window)
+    run_starts, run_ends = _runs((gc >= min_gc) & (obs_exp >= min_obs_exp))
+    # A run of passing window starts [s, e) covers bases [s, e - 1 + window)
+    starts, ends = _merge(run_starts, run_ends - 1 + window)
+    gc, obs_exp, cg = stats(starts, ends)
+    return [_annotation("cpg_island", s, e, oe, gc_content=round(float(g) * 100, 2),
+                        obs_exp=round(float(oe), 4), cpg_count=int(k), length=int(e - s))
+            for s, e, g, oe, k in zip(starts, ends, gc, obs_exp, cg)]
+
+
+def find_tandem_repeats(codes, sequence, max_period=MAX_REPEAT_PERIOD,
+                        min_length=REPEAT_MIN_LENGTH, min_copies=REPEAT_MIN_COPIES):
+    """
+    Exact tandem repeats: s[i] == s[i + p] runs per period p, shortest period first.
+    A repeat mostly covered by one of a shorter period (e.g. ATAT... at p=4) is dropped.
+    """
+    n = len(codes)
+    covered = np.zeros(n + 1, dtype=np.int64)    # prefix sum of bases already claimed
+    claimed = np.zeros(n, dtype=bool)
+    found = []
+    for p in range(1, min(max_period, n // 2) + 1):
+        same = (codes[:-p] == codes[p:]) & (codes[:-p] != OTHER)
+        run_starts, run_ends = _runs(same)
+        starts, ends = run_starts, run_ends + p
+        length = ends - starts
+        keep = (length >= max(min_length, min_copies * p)) & (length >= 2 * p)
+        starts, ends, length = starts[keep], ends[keep], length[keep]
+        if not len(starts):
+            continue
+        overlap = covered[ends] - covered[starts]
+        keep = overlap * 2 < length
+        for s, e in zip(starts[keep].tolist(), ends[keep].tolist()):
+            kind = "microsatellite" if p <= MICROSATELLITE_MAX_PERIOD else "tandem_repeat"
+            found.append(_annotation(kind, s, e, (e - s) / p, period=p, unit=sequence[s:s + p],
+                                     copies=round((e - s) / p, 2)))
+            claimed[s:e] = True
+        covered[1:] = np.cumsum(claimed)
+    found.sort(key=lambda a: a["start"])
+    return found
+
+
+def find_low_complexity(codes, window=DUST_WINDOW, step=DUST_STEP, threshold=DUST_THRESHOLD):
+    """Symmetric DUST: sum over triplets of c * (c - 1) / 2, divided by (triplets - 1), per window."""
+    n = len(codes)
+    if n < window:
+        return []
+    a, b, c = codes[:-2].astype(np.int64), codes[1:-1].astype(np.int64), codes[2:].astype(np.int64)
+    triplet = (a << 4) | (b << 2) | c
+    valid = (a != OTHER) & (b != OTHER) & (c != OTHER)
+    positions = np.flatnonzero(valid)
+    triplet = triplet[positions]
+
+    n_windows = (n - window) // step + 1
+    span = window - 2                              # triplets per full window
+    counts = np.zeros(n_windows * 64, dtype=np.int64)
+    for shift in range(window // step):
+        w = positions // step - shift
+        inside = (w >= 0) & (w < n_windows) & (positions < w * step + span)
+        counts += np.bincount(w[inside] * 64 + triplet[inside], minlength=n_windows * 64)
+    counts = counts.reshape(n_windows, 64)
+    total = counts.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(total > 1, (counts * (counts - 1) // 2).sum(axis=1) / (total - 1), 0.0)
+
+    hits = np.flatnonzero(score > threshold)
+    starts, ends = _merge(hits * step, hits * step + window)
+    out = []
+    for s, e in zip(starts.tolist(), ends.tolist()):
+        in_region = score[s // step:(e - window) // step + 1]
+        out.append(_annotation("low_complexity", s, e, in_region.max(), length=e - s))
+    return out
+
+
+def sequence_features(sequence, results=None, orf_min_length=ORF_MIN_LENGTH):
+    """Restriction sites, CRISPR guides and ORFs for a sequence, plus SNPs from saved results."""
+    record = next(analyze_batch([("sequence", sequence)]))
+    features = []
+    sites = record["restriction_sites"]
+    for enzyme, position in zip(sites["enzyme"], sites["position"]):
+        length, cut = _SITE_LENGTHS[enzyme]
+        features.append(_annotation("restriction_site", position - 1, position - 1 + length, 0,
+                                    enzyme=enzyme, cut_position=position + cut - 1))
+    guides = record.get("crispr_guides") or {"position": [], "gc_content": []}
+    for position, gc in zip(guides["position"], guides["gc_content"]):
+        features.append(_annotation("crispr_guide", position - 1, position - 1 + GUIDE_LENGTH, gc,
+                                    gc_content=gc))
+    for orf in find_orfs(sequence, min_length=orf_min_length, include_frames=False)["orfs"]:
+        features.append(_annotation("orf", orf["start"] - 1, orf["end"], orf["length_aa"],
+                                    frame=orf["frame"], strand=orf["strand"],
+                                    length_aa=orf["length_aa"], start_codon=orf["start_codon"]))
+    for snp in (results or {}).get("snps") or []:
+        position = snp.get("position") if isinstance(snp, dict) else None
+        if isinstance(position, int) and 1 <= position <= len(sequence):
+            alternate = snp.get("alternateBase", snp.get("alternate_base"))
+            features.append(_annotation("snp", position - 1, position, 0, alternate_base=alternate))
+    return features
+
+
+def annotate(sequence, results=None):
+    """All structural annotations and sequence features for a sequence, sorted by position."""
+    sequence = sequence.upper()
+    codes = encode(sequence)
+    annotations = (find_cpg_islands(codes) + find_tandem_repeats(codes, sequence)
+                   + find_low_complexity(codes) + sequence_features(sequence, results))
+    annotations.sort(key=lambda a: (a["start"], a["end"]))
+    return annotations
+
+
+def summarize(annotations):
+    """Counts and covered bases per kind, for reports and AI prompts."""
+    summary = {kind: {"count": 0, "bases": 0} for kind in KINDS}
+    for a in annotations:
+        entry = summary[a["kind"]]
+        entry["count"] += 1
+        entry["bases"] += a["end"] - a["start"] + 1
+    return summary
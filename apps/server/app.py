@@ -1,7 +1,8 @@
 import os
 
-# Production-only eventlet patching (avoid on Windows development)
-if os.name != 'nt':
+# Eventlet patching for the dev server (avoid on Windows development); gunicorn's eventlet
+# worker patches before it imports the app, and scripts importing this module don't need it
+if __name__ == '__main__' and os.name != 'nt':
     try:
         import eventlet
         eventlet.monkey_patch()
@@ -10,39 +11,72 @@ if os.name != 'nt':
 
 import random
 import datetime
-from flask import Flask, request, jsonify, make_response, redirect, Response
+from itertools import islice
+from flask import Flask, request, jsonify, make_response, redirect, Response, stream_with_context, g
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
+from socketio import RedisManager
 from flask_jwt_extended import (
     JWTManager, create_access_token, create_refresh_token,
     set_access_cookies, set_refresh_cookies, unset_jwt_cookies,
-    jwt_required, get_jwt_identity, decode_token
+    jwt_required, get_jwt_identity, decode_token, verify_jwt_in_request
 )
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
-from flask_sqlalchemy import SQLAlchemy
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from dotenv import load_dotenv
 from authlib.integrations.flask_client import OAuth
 from flask_mail import Mail, Message
-from encryption_utils import encrypt_data, decrypt_data
-from ai_engine import ai_bio_engine
+from models import (db, configure, init_db, seed_admin, job_progress, annotation_dict,
+                    User, GenomicData, Project, AnalysisSession, SequenceAnnotation, OTP, AuditLog,
+                    AIUsage, ReferenceGenome, BackgroundJob)
+from encryption_utils import encrypt_data, decrypt_data, encrypt_bytes, decrypt_bytes
+from ai_engine import ai_bio_engine, OFFLINE_MESSAGE
+from archive_utils import iter_project_archive, read_project_archive, ArchiveError
+from batch_engine import parse_multi_fasta, analyze_batch
+from result_codec import encode_results, decode_results, results_to_dict
+from http_utils import compress_response, immutable_etag, not_modified, cacheable
+from socket_metrics import room_metrics
+from db_config import read_replica
+from pagination import paginate, wants_stream
+import db_config
+import metrics
+from log_utils import configure_logging, request_id, new_request_id, snapshot as log_snapshot
+from profiler import profiles, MAX_SECONDS as PROFILER_MAX_SECONDS
+from result_cache import result_cache, make_key, sequence_hash, content_hash
+from orf_engine import find_orfs, GENETIC_CODES
+from codon_engine import analyze_codon_usage, genes_from_orfs, REFERENCES
+from fm_index import FMIndex, build_index_from_fasta, check_specificity
+from task_runner import spawn, offload, TaskLimiter
+from annotation_engine import annotate, KINDS as ANNOTATION_KINDS
+from interval_index import FeatureIndex
+from msa_engine import align as align_sequences, to_fasta as alignment_fasta
+from fastq_qc import decompress as decompress_fastq, qc_report as fastq_qc_report
+from report_engine import build_report, render as render_report, ArtifactStore, FORMATS as REPORT_FORMATS, MODES as REPORT_MODES
+from stream_hub import StreamHub, sse_event, parse_event_id
+from dotplot_engine import (PlotStore, compute_dotplot, TILE_SIZE, DEFAULT_MAX_OCCURRENCES,
+                            DEFAULT_K as DOTPLOT_DEFAULT_K, MAX_K as DOTPLOT_MAX_K)
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
 import binascii
+import hmac
+import numpy as np
 import json
+import logging
 
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
 
+# JSON logs written by a background thread (see log_utils); print() would block the hub on stdout
+configure_logging()
+log = logging.getLogger(__name__)
+
 app = Flask(__name__)
 
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
-# Fix for Render's Postgres URL format (postgres:// -> postgresql://)
-database_url = os.environ.get('DATABASE_URL', 'sqlite:///geneforge.db')
-if database_url and database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # JWT Configuration
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-dev-secret')
@@ -63,7 +97,7 @@ app.config['MAIL_USERNAME'] = os.environ.get('EMAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.environ.get('EMAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('EMAIL_FROM', ('Gene Forge Analyzer', 'noreply@geneforge.com'))
 
-db = SQLAlchemy(app)
+configure(app)
 jwt = JWTManager(app)
 mail = Mail(app)
 # Multi-origin CORS support for development and production
@@ -75,10 +109,33 @@ if "http://localhost:8080" not in allowed_origins:
 # In production, we restrict origins. In dev, we are permissive to allow IP-based local access.
 socket_origins = "*" if (app.debug or os.environ.get('NODE_ENV') == 'development') else allowed_origins
 
-socketio = SocketIO(app, cors_allowed_origins=socket_origins, manage_session=False)
-CORS(app, supports_credentials=True, origins=allowed_origins)
+# Multi-worker / multi-node: every process relays room events through a shared pub/sub queue
+# (e.g. redis://host:6379/0). Without it, rooms only span the current process.
+socketio_queue = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+socketio_channel = os.environ.get('SOCKETIO_CHANNEL', 'geneforge-socketio')
+socketio_options = {}
+if socketio_queue and socketio_queue.startswith(('redis://', 'rediss://')):
+    # Each relayed emit publishes from its own green thread; size the pool for bursts
+    socketio_options['client_manager'] = RedisManager(
+        socketio_queue, channel=socketio_channel,
+        redis_options={'max_connections': int(os.environ.get('SOCKETIO_REDIS_MAX_CONNECTIONS', 1000))}
+    )
+elif socketio_queue:
+    socketio_options['message_queue'] = socketio_queue
+    socketio_options['channel'] = socketio_channel
+if os.environ.get('SOCKETIO_STICKY_COOKIE'):
+    # Load balancers (HAProxy/ALB/nginx sticky) can pin long-polling clients by this cookie
+    socketio_options['cookie'] = os.environ.get('SOCKETIO_STICKY_COOKIE')
+if os.environ.get('SOCKETIO_WEBSOCKET_ONLY', 'False') == 'True':
+    # WebSocket-only clients never need sticky routing between workers
+    socketio_options['transports'] = ['websocket']
+
+socketio = SocketIO(app, cors_allowed_origins=socket_origins, manage_session=False, **socketio_options)
+CORS(app, supports_credentials=True, origins=allowed_origins, expose_headers=['X-Next-Cursor', 'Link'])
 
 # Rate Limiting: 5 requests per minute as per requirements
+# (RATELIMIT_ENABLED=False only for isolated load tests: every virtual user shares one IP)
+app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', 'True') == 'True'
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
@@ -88,24 +145,47 @@ limiter = Limiter(
 
 @app.before_request
 def log_request_info():
+    # Correlation id for every log line of this request; echoed back as X-Request-ID
+    request_id.set(new_request_id(request.headers.get('X-Request-ID')))
     if app.debug:
-        app.logger.debug('Headers: %s', request.headers)
-        app.logger.debug('Body: %s', request.get_data())
+        log.debug('Request headers: %s', request.headers)
+        log.debug('Request body: %s', request.get_data())
+
+@app.after_request
+def add_request_id(response):
+    rid = request_id.get()
+    if rid:
+        response.headers['X-Request-ID'] = rid
+    return response
+
+# Response compression (gzip/brotli); event streams pass through untouched
+app.after_request(compress_response)
+
+# Per-route latency and SQL counts for /metrics
+metrics.init_app(app)
+metrics.registry.collector(room_metrics.families)
+
+@metrics.registry.collector
+def _database_families():
+    with app.app_context():
+        return db_config.router.families(db.engine)
+
+# Read-your-writes cookie for clients that just wrote (only with DATABASE_REPLICA_URLS)
+db_config.init_app(app)
+metrics.registry.collector(lambda: [
+    ("log_queue_depth", "gauge", "Log records waiting for the writer thread.", [({}, log_snapshot()["queued"])]),
+    ("log_records_dropped_total", "counter", "Log records dropped because the queue was full.",
+     [({}, log_snapshot()["dropped"])]),
+])
 
 @app.errorhandler(Exception)
 def handle_exception(e):
-    # Log the error
-    import traceback
-    error_details = traceback.format_exc()
-    print(f"GLOBAL ERROR: {str(e)}")
-    # Write to a file for persistent debugging
-    with open("critical_errors.log", "a") as f:
-        f.write(f"[{datetime.datetime.utcnow().isoformat()}] {str(e)}\n{error_details}\n\n")
+    # Logged with the traceback; ERROR records also go to the rotating LOG_ERROR_FILE
+    log.error("Unhandled error: %s", e, exc_info=e, extra={"method": request.method, "path": request.path})
     # Return JSON instead of HTML for any uncaught error
     return jsonify({
         "msg": "Internal Server Error", 
-        "error": str(e),
-        "trace": error_details if app.debug else None
+        "error": str(e)
     }), 500
 
 # OAuth Setup
@@ -113,7 +193,7 @@ google_client_id = os.environ.get('GOOGLE_CLIENT_ID')
 google_client_secret = os.environ.get('GOOGLE_CLIENT_SECRET')
 
 if not google_client_id or google_client_id == 'your-google-client-id':
-    print("WARNING: GOOGLE_CLIENT_ID is not configured. Google Login will fail.")
+    log.warning("GOOGLE_CLIENT_ID is not configured. Google Login will fail.")
 
 oauth = OAuth(app)
 oauth.register(
@@ -124,15 +204,6 @@ oauth.register(
     client_kwargs={'scope': 'openid email profile'}
 )
 
-# Models
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    role = db.Column(db.String(20), default='user')
-    salt = db.Column(db.LargeBinary, nullable=False)
-    password_hash = db.Column(db.String(256), nullable=True) # For Admin Password
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-
 from werkzeug.security import generate_password_hash, check_password_hash
 
 @app.route('/api/auth/admin/login', methods=['POST'])
@@ -145,22 +216,21 @@ def admin_login():
         email = data.get('email')
         password = data.get('password')
         
-        print(f"DEBUG: Admin Login Attempt for {email}")
+        log.debug("Admin login attempt", extra={"email": email})
         
         if not email or not password:
             return jsonify({"msg": "Email and password required"}), 400
             
         user = User.query.filter_by(email=email).first()
-        print(f"DEBUG: User found: {user.email if user else 'None'}")
         
         if not user or user.role != 'admin' or not user.password_hash:
-            print(f"DEBUG: Auth failed (User not admin or no pass hash)")
+            log.debug("Admin login failed: not an admin or no password set", extra={"email": email})
             check_password_hash('dummy', 'dummy')
             log_action("ADMIN_LOGIN_FAIL", details=f"Failed attempt for {email}")
             return jsonify({"msg": "Invalid admin credentials"}), 401
             
         if check_password_hash(user.password_hash, password):
-            print(f"DEBUG: Password match success")
+            log.debug("Admin login succeeded", extra={"email": email})
             access_token = create_access_token(identity=email)
             refresh_token = create_refresh_token(identity=email)
             resp = jsonify({"msg": "Admin Access Granted", "user": {"email": email, "role": "admin"}})
@@ -169,13 +239,11 @@ def admin_login():
             log_action("ADMIN_LOGIN_SUCCESS", user_id=user.id, details="Password Auth")
             return resp, 200
         else:
-            print(f"DEBUG: Password match failed")
+            log.debug("Admin login failed: wrong password", extra={"email": email})
             log_action("ADMIN_LOGIN_FAIL", user_id=user.id, details="Wrong Password")
             return jsonify({"msg": "Invalid credentials"}), 401
     except Exception as e:
-        import traceback
-        print(f"ERROR in admin_login: {e}")
-        traceback.print_exc()
+        log.exception("admin_login failed")
         raise e
 
 @app.route('/api/auth/admin/reset-password-request', methods=['POST'])
@@ -207,9 +275,9 @@ def admin_reset_request():
         msg.body = f"Your Admin Password Reset Code is: {reset_code}"
         mail.send(msg)
     except Exception as e:
-        print(f"FAILED TO SEND ADMIN RESET: {e}")
+        log.warning("Failed to send admin reset email: %s", e)
         # Still show code in console for dev
-        print(f"DEV ADMIN RESET CODE FOR {email}: {reset_code}")
+        log.warning("DEV ADMIN RESET CODE FOR %s: %s", email, reset_code)
         
     return jsonify({"msg": "If this is a valid admin email, a reset link has been sent."}), 200
 
@@ -289,6 +357,19 @@ def admin_system_stats():
         "logs": log_data
     }), 200
 
+@app.route('/api/admin/socket-stats', methods=['GET'])
+@jwt_required()
+def admin_socket_stats():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    # Counters are per worker; with several workers each reports its own rooms
+    stats = room_metrics.snapshot()
+    stats["message_queue"] = bool(socketio_queue)
+    return jsonify(stats), 200
+
 @app.route('/api/admin/users', methods=['GET'])
 @jwt_required()
 def admin_get_users():
@@ -297,15 +378,14 @@ def admin_get_users():
     if not user or user.role != 'admin':
         return jsonify({"msg": "Unauthorized"}), 403
     
-    users = User.query.order_by(User.created_at.desc()).all()
-    user_data = [{
+    # Newest first; ids follow created_at
+    users = db.session.query(User.id, User.email, User.role, User.created_at)
+    return paginate(users, User.id, lambda u: {
         "id": u.id,
         "email": u.email,
         "role": u.role,
         "created_at": u.created_at.isoformat() if u.created_at else None
-    } for u in users]
-    
-    return jsonify(user_data), 200
+    }, descending=True)
 
 @app.route('/api/admin/users/create', methods=['POST'])
 @jwt_required()
@@ -340,12 +420,21 @@ def admin_create_user():
 
 @app.route('/api/admin/logs', methods=['GET'])
 @jwt_required()
+@read_replica
 def admin_get_logs():
     email = get_jwt_identity()
     user = User.query.filter_by(email=email).first()
     if not user or user.role != 'admin':
         return jsonify({"msg": "Unauthorized"}), 403
     
+    if not request.args.get('page') and ('cursor' in request.args or 'limit' in request.args or wants_stream()):
+        # Cursor mode: a bare array of entries like the other list endpoints, without the COUNT(*)
+        entries = db.session.query(
+            AuditLog.id, AuditLog.action, AuditLog.details, AuditLog.ip_address, AuditLog.timestamp,
+            User.email.label('user_email')
+        ).outerjoin(User, AuditLog.user_id == User.id)
+        return paginate(entries, AuditLog.id, lambda l: _log_entry(l, l.user_email), descending=True)
+
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
     
@@ -362,14 +451,9 @@ def admin_get_logs():
         total = AuditLog.query.count()
         pages = (total // per_page) + (1 if total % per_page > 0 else 0)
 
-    log_data = [{
-        "id": l.id,
-        "action": l.action,
-        "details": l.details,
-        "ip": l.ip_address,
-        "timestamp": l.timestamp.isoformat(),
-        "user_email": User.query.get(l.user_id).email if l.user_id else "System"
-    } for l in items]
+    user_ids = {l.user_id for l in items if l.user_id}
+    emails = dict(db.session.query(User.id, User.email).filter(User.id.in_(user_ids))) if user_ids else {}
+    log_data = [_log_entry(l, emails.get(l.user_id)) for l in items]
     
     return jsonify({
         "logs": log_data,
@@ -378,92 +462,28 @@ def admin_get_logs():
         "current_page": page
     }), 200
 
-
-class GenomicData(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    title = db.Column(db.String(200), nullable=False)
-    data_type = db.Column(db.String(50), nullable=False) # raw_sequence, analysis_result, ai_report
-    encrypted_payload = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-
-class Project(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    name = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-    analyses = db.relationship('AnalysisSession', backref='project', lazy=True, cascade="all, delete-orphan")
-
-class AnalysisSession(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
-    encrypted_sequence = db.Column(db.Text, nullable=False)
-    encrypted_results = db.Column(db.Text, nullable=True) # JSON stored as encrypted string
-    version = db.Column(db.Integer, default=1)
-    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-
-class OTP(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), nullable=False)
-    code = db.Column(db.String(6), nullable=False)
-    expiry = db.Column(db.DateTime, nullable=False)
-    used = db.Column(db.Boolean, default=False)
-
-class AuditLog(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    action = db.Column(db.String(100), nullable=False)
-    details = db.Column(db.Text, nullable=True)
-    ip_address = db.Column(db.String(45), nullable=True)
-    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
-
-class AIUsage(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    model_used = db.Column(db.String(50), nullable=False)
-    tokens_input = db.Column(db.Integer, default=0)
-    tokens_output = db.Column(db.Integer, default=0)
-    status = db.Column(db.String(20), default='success') # success, failed, fallback
-    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+def _log_entry(l, user_email):
+    return {
+        "id": l.id,
+        "action": l.action,
+        "details": l.details,
+        "ip": l.ip_address,
+        "timestamp": l.timestamp.isoformat(),
+        "user_email": user_email or "System"
+    }
 
 def log_action(action, user_id=None, details=None):
     try:
-        log = AuditLog(
+        entry = AuditLog(
             user_id=user_id,
             action=action,
             details=details,
             ip_address=request.remote_addr
         )
-        db.session.add(log)
+        db.session.add(entry)
         db.session.commit()
     except Exception as e:
-        print(f"Audit Log Error: {e}")
-
-with app.app_context():
-    db.create_all()
-    
-    # Seed Admin from Env (Runs on App Startup/Import)
-    admin_email = os.environ.get('ADMIN_EMAIL')
-    admin_pass = os.environ.get('ADMIN_PASSWORD')
-    if admin_email and admin_pass:
-        try:
-            admin = User.query.filter_by(email=admin_email).first()
-            if not admin:
-                print(f"Creating Admin User: {admin_email}")
-                salt = os.urandom(16)
-                admin = User(email=admin_email, role='admin', salt=salt)
-                admin.password_hash = generate_password_hash(admin_pass)
-                db.session.add(admin)
-                db.session.commit()
-            else:
-                # Always ensure the admin password in DB matches the ENV variable
-                if admin.role != 'admin' or not admin.password_hash or not check_password_hash(admin.password_hash, admin_pass):
-                    admin.role = 'admin'
-                    admin.password_hash = generate_password_hash(admin_pass)
-                    db.session.commit()
-                    print(f"Updated Admin User credentials from Environment: {admin_email}")
-        except Exception as e:
-            print(f"Admin seeding error: {e}")
+        log.error("Audit log write failed: %s", e)
 
 # Routes
 @app.route('/', methods=['GET'])
@@ -525,14 +545,14 @@ def send_otp():
             </div>
             """
             mail.send(msg)
-            print(f"DEBUG: Email sent successfully to {email}")
+            log.debug("OTP email sent", extra={"email": email})
         except Exception as e:
             # Check if it's a configuration error
             is_configured = os.environ.get('EMAIL_USERNAME') and os.environ.get('EMAIL_PASSWORD') and "your_gmail" not in os.environ.get('EMAIL_USERNAME')
             if not is_configured:
-                print(f"WARNING: Email NOT SENT to {email} because MAIL_USERNAME/PASSWORD are not set in .env")
+                log.warning("OTP email not sent: MAIL_USERNAME/PASSWORD are not set in .env", extra={"email": email})
             else:
-                print(f"CRITICAL: Failed to send email to {email}: {str(e)}")
+                log.error("Failed to send OTP email: %s", e, extra={"email": email})
             
             # In development, we still allow success even if email fails
             if not (os.environ.get('NODE_ENV') == 'development' or app.debug):
@@ -550,16 +570,14 @@ def send_otp():
         
         if is_dev:
             # We still log the code to console so the user can see it if they haven't set up SMTP
-            print(f"|-----------------------------------------|")
-            print(f"| DEV PASSCODE FOR {email}: {code} |")
-            print(f"|-----------------------------------------|")
+            log.warning("DEV PASSCODE FOR %s: %s", email, code)
             
         return jsonify(response_data), 200
     except Exception as e:
         db.session.rollback()
         import traceback
         error_details = traceback.format_exc()
-        print(f"CRITICAL ERROR in send_otp:\n{error_details}")
+        log.exception("send_otp failed")
         return jsonify({
             "msg": "Failed to generate OTP. Internal server error.",
             "error": str(e),
@@ -664,10 +682,10 @@ def google_verify_token():
         
     except ValueError as e:
         # Invalid token
-        print(f"Token verification error: {str(e)}")
+        log.warning("Google token verification failed: %s", e)
         return jsonify({"msg": "Invalid Google token"}), 401
-    except Exception as e:
-        print(f"Unexpected OAuth error: {str(e)}")
+    except Exception:
+        log.exception("Unexpected OAuth error")
         return jsonify({"msg": "Internal server error during OAuth"}), 500
 
 @app.route('/api/auth/google/login')
@@ -701,8 +719,8 @@ def google_callback():
             set_refresh_cookies(resp, refresh_token)
             log_action("LOGIN_SUCCESS", user_id=user.id, details="Google OAuth Redirect")
             return resp
-    except Exception as e:
-        print(f"Callback error: {str(e)}")
+    except Exception:
+        log.exception("Google OAuth callback failed")
         
     return jsonify({"msg": "Google login failed"}), 400
 
@@ -743,13 +761,15 @@ def list_genomic_data():
     email = get_jwt_identity()
     user = User.query.filter_by(email=email).first()
     
-    entries = GenomicData.query.filter_by(user_id=user.id).all()
-    return jsonify([{
+    # Metadata columns only: the encrypted payloads stay in the database
+    entries = db.session.query(GenomicData.id, GenomicData.title, GenomicData.data_type, GenomicData.created_at) \
+        .filter(GenomicData.user_id == user.id)
+    return paginate(entries, GenomicData.id, lambda e: {
         "id": e.id,
         "title": e.title,
         "data_type": e.data_type,
         "created_at": e.created_at.isoformat()
-    } for e in entries]), 200
+    })
 
 @app.route('/api/genomic-data/<int:data_id>', methods=['GET'])
 @jwt_required()
@@ -760,18 +780,24 @@ def fetch_genomic_data(data_id):
     entry = GenomicData.query.filter_by(id=data_id, user_id=user.id).first()
     if not entry:
         return jsonify({"msg": "Data not found"}), 404
-        
+
+    # Entries are never updated, so a revalidation can skip decryption entirely
+    etag = immutable_etag('genomic-data', entry.id, entry.created_at.isoformat())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     # Decrypt only for the owner
     decrypted_payload = decrypt_data(entry.encrypted_payload, user.email, user.salt)
     
-    return jsonify({
+    return cacheable(jsonify({
         "id": entry.id,
         "title": entry.title,
         "data_type": entry.data_type,
         "payload": decrypted_payload,
         "created_at": entry.created_at.isoformat(),
         "encrypted": True
-    }), 200
+    }), etag), 200
 
 # Project Management Routes
 @app.route('/api/projects', methods=['POST'])
@@ -789,16 +815,21 @@ def create_project():
 
 @app.route('/api/projects', methods=['GET'])
 @jwt_required()
+@read_replica
 def list_projects():
     email = get_jwt_identity()
     user = User.query.filter_by(email=email).first()
-    projects = Project.query.filter_by(user_id=user.id).all()
-    return jsonify([{
+    # Counted in SQL rather than loading every project's analyses
+    projects = db.session.query(Project.id, Project.name, Project.created_at,
+                                db.func.count(AnalysisSession.id).label('analysis_count')) \
+        .outerjoin(AnalysisSession, AnalysisSession.project_id == Project.id) \
+        .filter(Project.user_id == user.id).group_by(Project.id)
+    return paginate(projects, Project.id, lambda p: {
         "id": p.id,
         "name": p.name,
         "created_at": p.created_at.isoformat(),
-        "analysis_count": len(p.analyses)
-    } for p in projects]), 200
+        "analysis_count": p.analysis_count
+    })
 
 @app.route('/api/projects/<int:project_id>', methods=['DELETE'])
 @jwt_required()
@@ -829,9 +860,9 @@ def save_analysis_version(project_id):
     if not sequence:
         return jsonify({"msg": "Sequence is required"}), 400
         
-    # Encrypt data
+    # Encrypt data (results are stored in the compact columnar encoding)
     enc_seq = encrypt_data(sequence, user.email, user.salt)
-    enc_res = encrypt_data(json.dumps(results), user.email, user.salt)
+    enc_res = encrypt_data(encode_results(results), user.email, user.salt)
     
     # Get latest version
     latest = AnalysisSession.query.filter_by(project_id=project_id).order_by(AnalysisSession.version.desc()).first()
@@ -845,11 +876,14 @@ def save_analysis_version(project_id):
     )
     db.session.add(new_analysis)
     db.session.commit()
+
+    spawn(annotate_analysis, new_analysis.id, sequence, results)
     
     return jsonify({"msg": "Analysis version saved", "version": new_version}), 201
 
 @app.route('/api/projects/<int:project_id>/analysis', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_analysis_history(project_id):
     email = get_jwt_identity()
     user = User.query.filter_by(email=email).first()
@@ -857,12 +891,14 @@ def get_analysis_history(project_id):
     if not project:
         return jsonify({"msg": "Project not found"}), 404
         
-    analyses = AnalysisSession.query.filter_by(project_id=project_id).order_by(AnalysisSession.version.desc()).all()
-    return jsonify([{
+    # Newest version first (versions are saved in id order)
+    analyses = db.session.query(AnalysisSession.id, AnalysisSession.version, AnalysisSession.created_at) \
+        .filter(AnalysisSession.project_id == project_id)
+    return paginate(analyses, AnalysisSession.id, lambda a: {
         "id": a.id,
         "version": a.version,
         "created_at": a.created_at.isoformat()
-    } for a in analyses]), 200
+    }, descending=True)
 
 @app.route('/api/analysis/<int:analysis_id>', methods=['GET'])
 @jwt_required()
@@ -878,30 +914,162 @@ def get_specific_analysis(analysis_id):
     
     if not analysis:
         return jsonify({"msg": "Analysis not found"}), 404
-        
-    # Decrypt
-    dec_seq = decrypt_data(analysis.encrypted_sequence, user.email, user.salt)
-    dec_res = json.loads(decrypt_data(analysis.encrypted_results, user.email, user.salt) or "{}")
-    
-    return jsonify({
-        "id": analysis.id,
-        "project_id": analysis.project_id,
-        "version": analysis.version,
-        "sequence": dec_seq,
-        "results": dec_res,
-        "created_at": analysis.created_at.isoformat()
-    }), 200
+
+    # Saved versions are immutable; the query string selects the representation
+    etag = immutable_etag('analysis', analysis.id, analysis.version,
+                          analysis.created_at.isoformat(), request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    def compute():
+        # Decrypt
+        dec_seq = decrypt_data(analysis.encrypted_sequence, user.email, user.salt)
+        raw_res = decrypt_data(analysis.encrypted_results, user.email, user.salt) or "{}"
+
+        if request.args.get('encoding') == 'columnar':
+            # Hand the stored envelope through untouched; the caller decodes fields itself
+            dec_res = json.loads(raw_res)
+        else:
+            # Only requested fields are decoded (?fields=gc_content,base_counts)
+            fields = [f for f in request.args.get('fields', '').split(',') if f]
+            dec_res = results_to_dict(decode_results(raw_res), fields or None)
+
+        return json.dumps({
+            "id": analysis.id,
+            "project_id": analysis.project_id,
+            "version": analysis.version,
+            "sequence": dec_seq,
+            "results": dec_res,
+            "created_at": analysis.created_at.isoformat()
+        })
+
+    # The ETag already identifies this exact immutable representation
+    body = result_cache.get_or_compute(make_key('analysis', etag, scope=user.id), compute,
+                                       owner=(user.email, user.salt), bypass=_cache_bypass())
+    return cacheable(Response(body, mimetype='application/json'), etag), 200
+
+# Bulk Project Export / Import
+IMPORT_BATCH_SIZE = 200
+
+@app.route('/api/projects/<int:project_id>/export', methods=['GET'])
+@jwt_required()
+def export_project(project_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    project = Project.query.filter_by(id=project_id, user_id=user.id).first()
+    if not project:
+        return jsonify({"msg": "Project not found"}), 404
+
+    def iter_analyses():
+        # Server-side batches keep memory flat regardless of version count
+        return AnalysisSession.query.filter_by(project_id=project_id) \
+            .order_by(AnalysisSession.version.asc()).yield_per(50)
+
+    # Capture plain values before log_action commits and expires the ORM instances
+    user_email, user_salt = user.email, user.salt
+    project_meta = {
+        "name": project.name,
+        "created_at": project.created_at.isoformat() if project.created_at else None
+    }
+    filename = f"project-{project.id}.zip"
+    archive = iter_project_archive(
+        project_meta, iter_analyses,
+        lambda blob: decrypt_data(blob, user_email, user_salt)
+    )
+    log_action("PROJECT_EXPORT", user_id=user.id, details=f"Project: {project.id}")
+
+    return Response(
+        stream_with_context(archive),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/api/projects/import', methods=['POST'])
+@jwt_required()
+def import_project():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+
+    upload = request.files.get('archive')
+    if not upload:
+        return jsonify({"msg": "Archive file is required"}), 400
+
+    try:
+        meta, records = read_project_archive(upload.stream)
+        project = Project(user_id=user.id, name=request.form.get('name') or meta.get('name') or 'Imported Project')
+        db.session.add(project)
+        db.session.flush()
+
+        imported = 0
+        batch = []
+        for version, created_at, sequence, results in records:
+            row = {
+                "project_id": project.id,
+                "encrypted_sequence": encrypt_data(sequence, user.email, user.salt),
+                "encrypted_results": encrypt_data(encode_results(results), user.email, user.salt),
+                "version": version,
+                "created_at": created_at or datetime.datetime.utcnow()
+            }
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                db.session.execute(db.insert(AnalysisSession), batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(db.insert(AnalysisSession), batch)
+            imported += len(batch)
+
+        # Single transaction: project and all versions land together or not at all
+        db.session.commit()
+    except ArchiveError as e:
+        db.session.rollback()
+        return jsonify({"msg": str(e)}), 400
+    except Exception:
+        # Nothing of a failed import stays behind in the session
+        db.session.rollback()
+        raise
+
+    log_action("PROJECT_IMPORT", user_id=user.id, details=f"Project: {project.id}, Versions: {imported}")
+    return jsonify({"msg": "Project imported", "id": project.id, "versions": imported}), 201
 
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({"status": "healthy"}), 200
 
+@app.route('/metrics', methods=['GET'])
+@limiter.exempt
+def prometheus_metrics():
+    # Prometheus text format; with METRICS_TOKEN set, scrapers send it as a bearer token
+    token = os.environ.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return jsonify({"msg": "Unauthorized"}), 401
+    return Response(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 # WebSocket Events for Encrypted Chat
+def _payload_size(data):
+    try:
+        return len(json.dumps(data, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 0
+
+@socketio.on('connect')
+def on_connect():
+    room_metrics.connected(request.sid)
+
+@socketio.on('disconnect')
+def on_disconnect():
+    room_metrics.disconnected(request.sid)
+
 @socketio.on('join')
 def on_join(data):
     room = data.get('room')
     if room:
         join_room(room)
+        room_metrics.joined(request.sid, room)
         emit('status', {'msg': f'User joined room: {room}'}, room=room)
 
 @socketio.on('leave')
@@ -909,6 +1077,7 @@ def on_leave(data):
     room = data.get('room')
     if room:
         leave_room(room)
+        room_metrics.left(request.sid, room)
 
 @socketio.on('message')
 def handle_message(data):
@@ -916,12 +1085,1008 @@ def handle_message(data):
     # The server only relays the blob to the specific room
     room = data.get('room')
     if room:
-        emit('message', {
+        payload = {
             'sender': data.get('sender'),
             'encrypted_payload': data.get('encrypted_payload'),
             'timestamp': datetime.datetime.utcnow().isoformat(),
             'context': data.get('context') # DNA sequence or result metadata
-        }, room=room)
+        }
+        emit('message', payload, room=room)
+        room_metrics.relayed(room, 'message', _payload_size(payload))
+
+# Result cache helpers
+def _cache_bypass():
+    # Clients can force recomputation with Cache-Control: no-cache
+    return 'no-cache' in request.headers.get('Cache-Control', '')
+
+def _results_digest(results):
+    return content_hash(json.dumps(results, sort_keys=True, separators=(',', ':'), default=str))
+
+@app.route('/api/admin/cache-stats', methods=['GET'])
+@jwt_required()
+def admin_cache_stats():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+    return jsonify(dict(result_cache.snapshot(), ai_streams=stream_hub.snapshot())), 200
+
+# Batched Multi-Record Analysis
+MAX_BATCH_BASES = int(os.environ.get('MAX_BATCH_BASES', 20_000_000))
+BATCH_STREAM_RECORDS = 100
+
+@app.route('/api/analysis/batch', methods=['POST'])
+@jwt_required()
+def batch_analysis():
+    if request.is_json:
+        data = request.get_json()
+        if data.get('records'):
+            records = [(r.get('id') or f"record_{i + 1}", (r.get('sequence') or '').upper())
+                       for i, r in enumerate(data['records'])]
+        else:
+            records = parse_multi_fasta(data.get('fasta', ''))
+        pam = data.get('pam', 'NGG')
+        include_guides = data.get('guides', True)
+    else:
+        # Raw multi-FASTA body (text/plain, text/x-fasta)
+        records = parse_multi_fasta(request.get_data(as_text=True))
+        pam = request.args.get('pam', 'NGG')
+        include_guides = request.args.get('guides', 'true') != 'false'
+
+    if not records:
+        return jsonify({"msg": "No sequences provided"}), 400
+    if sum(len(r[1]) for r in records) > MAX_BATCH_BASES:
+        return jsonify({"msg": f"Batch exceeds {MAX_BATCH_BASES} bases"}), 413
+    if not pam or any(c not in 'ACGTN' for c in pam.upper()):
+        return jsonify({"msg": "Invalid PAM pattern"}), 400
+
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    log_action("BATCH_ANALYSIS", user_id=user.id, details=f"Records: {len(records)}")
+
+    batch_digest = content_hash("\n".join(f"{rid}\t{seq}" for rid, seq in records))
+    key = make_key('batch', batch_digest, {"pam": pam.upper(), "guides": bool(include_guides)}, scope=user.id)
+    owner = (user.email, user.salt)
+    body = None if _cache_bypass() else result_cache.get(key, owner)
+    if body is not None:
+        return Response(body, mimetype='application/x-ndjson')
+
+    def generate():
+        # One JSON document per record (NDJSON), flushed a few records at a time
+        results = analyze_batch(records, pam=pam.upper(), include_guides=include_guides)
+        while True:
+            chunk = list(islice(results, BATCH_STREAM_RECORDS))
+            if not chunk:
+                break
+            yield "".join(json.dumps(r, separators=(',', ':')) + "\n" for r in chunk)
+
+    return Response(result_cache.tee(key, generate(), owner), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
+
+# Six-Frame Translation / ORF Finder
+@app.route('/api/analysis/orfs', methods=['POST'])
+@jwt_required()
+def orf_analysis():
+    data = request.get_json() or {}
+    sequence = (data.get('sequence') or '').upper()
+    try:
+        table = int(data.get('table', 1))
+        min_length = max(int(data.get('min_length', 30)), 1)
+    except (TypeError, ValueError):
+        return jsonify({"msg": "table and min_length must be integers"}), 400
+
+    if not sequence:
+        return jsonify({"msg": "No sequence provided"}), 400
+    if len(sequence) > MAX_BATCH_BASES:
+        return jsonify({"msg": f"Sequence exceeds {MAX_BATCH_BASES} bases"}), 413
+    if table not in GENETIC_CODES:
+        return jsonify({"msg": f"Unsupported genetic code table. Available: {sorted(GENETIC_CODES)}"}), 400
+
+    params = {
+        "table": table,
+        "min_length": min_length,
+        "alternative_starts": bool(data.get('alternative_starts', False)),
+        "include_partial": bool(data.get('include_partial', False)),
+        "include_frames": bool(data.get('frames', True)),
+    }
+
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+
+    key = make_key('orfs', sequence_hash(sequence), params, scope=user.id)
+    body = result_cache.get_or_compute(
+        key, lambda: json.dumps(find_orfs(sequence, **params), separators=(',', ':')),
+        owner=(user.email, user.salt), bypass=_cache_bypass()
+    )
+    return Response(body, mimetype='application/json')
+
+# Codon Usage / CAI / tAI
+@app.route('/api/analysis/codon-usage', methods=['POST'])
+@jwt_required()
+def codon_usage_analysis():
+    data = request.get_json() or {}
+    reference = data.get('reference', 'ecoli')
+    try:
+        table = int(data.get('table', 1))
+        min_length = max(int(data.get('min_length', 100)), 1)
+    except (TypeError, ValueError):
+        return jsonify({"msg": "table and min_length must be integers"}), 400
+
+    if reference not in REFERENCES:
+        return jsonify({"msg": f"Unknown reference organism. Available: {sorted(REFERENCES)}"}), 400
+    if table not in GENETIC_CODES:
+        return jsonify({"msg": f"Unsupported genetic code table. Available: {sorted(GENETIC_CODES)}"}), 400
+
+    # Coding sequences as given, or every ORF of a single sequence
+    if data.get('genes'):
+        source = [(g.get('id') or f"gene_{i + 1}", (g.get('sequence') or '').upper())
+                  for i, g in enumerate(data['genes'])]
+    elif data.get('fasta'):
+        source = parse_multi_fasta(data['fasta'])
+    else:
+        source = (data.get('sequence') or '').upper()
+
+    total = len(source) if isinstance(source, str) else sum(len(g[1]) for g in source)
+    if not total:
+        return jsonify({"msg": "No sequences provided"}), 400
+    if total > MAX_BATCH_BASES:
+        return jsonify({"msg": f"Input exceeds {MAX_BATCH_BASES} bases"}), 413
+
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+
+    def compute():
+        genes = genes_from_orfs(source, table, min_length) if isinstance(source, str) else source
+        result = analyze_codon_usage(genes, reference=reference, table=table,
+                                     per_gene=bool(data.get('per_gene', True)))
+        return json.dumps(result, separators=(',', ':'))
+
+    digest = sequence_hash(source) if isinstance(source, str) else \
+        content_hash("\n".join(f"{gid}\t{seq}" for gid, seq in source))
+    params = {"reference": reference, "table": table, "min_length": min_length,
+              "orfs": isinstance(source, str), "per_gene": bool(data.get('per_gene', True))}
+    body = result_cache.get_or_compute(make_key('codon_usage', digest, params, scope=user.id), compute,
+                                       owner=(user.email, user.salt), bypass=_cache_bypass())
+    return Response(body, mimetype='application/json')
+
+# Structural Annotations (CpG islands, repeats, low complexity)
+ANNOTATION_QUERY_LIMIT = 5000
+_annotating = set()
+
+def annotate_analysis(analysis_id, sequence, results=None):
+    # Background job: replaces any previous annotations of this analysis version
+    _annotating.add(analysis_id)
+    try:
+        annotations = offload(annotate, sequence, results)
+        with app.app_context():
+            SequenceAnnotation.query.filter_by(analysis_id=analysis_id).delete()
+            rows = []
+            for a in annotations:
+                attributes = dict(a['attributes'])
+                period = attributes.pop('period', None)
+                attributes.pop('unit', None)
+                attributes.pop('reference_base', None)
+                rows.append({
+                    "analysis_id": analysis_id,
+                    "kind": a['kind'],
+                    "start": a['start'],
+                    "end": a['end'],
+                    "score": a['score'],
+                    "period": period,
+                    "attributes": json.dumps(attributes)
+                })
+            if rows:
+                db.session.execute(db.insert(SequenceAnnotation), rows)
+            db.session.commit()
+    except Exception:
+        log.exception("Annotation failed for analysis %s", analysis_id)
+    finally:
+        _annotating.discard(analysis_id)
+
+def _owned_analysis(analysis_id, user):
+    return AnalysisSession.query.join(Project).filter(
+        AnalysisSession.id == analysis_id,
+        Project.user_id == user.id
+    ).first()
+
+def annotation_summary(analysis_id):
+    rows = db.session.query(
+        SequenceAnnotation.kind,
+        db.func.count(SequenceAnnotation.id),
+        db.func.sum(SequenceAnnotation.end - SequenceAnnotation.start + 1)
+    ).filter(SequenceAnnotation.analysis_id == analysis_id).group_by(SequenceAnnotation.kind).all()
+    summary = {kind: {"count": 0, "bases": 0} for kind in ANNOTATION_KINDS}
+    for kind, count, bases in rows:
+        summary[kind] = {"count": count, "bases": int(bases or 0)}
+    return summary
+
+@app.route('/api/analysis/<int:analysis_id>/annotations', methods=['GET'])
+@jwt_required()
+def get_annotations(analysis_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    analysis = _owned_analysis(analysis_id, user)
+    if not analysis:
+        return jsonify({"msg": "Analysis not found"}), 404
+
+    query = SequenceAnnotation.query.filter_by(analysis_id=analysis_id)
+    kinds = [k for k in request.args.get('kind', '').split(',') if k]
+    if kinds:
+        query = query.filter(SequenceAnnotation.kind.in_(kinds))
+    # Overlap with [start, end] (1-based, inclusive)
+    start = request.args.get('start', type=int)
+    end = request.args.get('end', type=int)
+    if start is not None:
+        query = query.filter(SequenceAnnotation.end >= start)
+    if end is not None:
+        query = query.filter(SequenceAnnotation.start <= end)
+    min_score = request.args.get('min_score', type=float)
+    if min_score is not None:
+        query = query.filter(SequenceAnnotation.score >= min_score)
+    limit = max(1, min(request.args.get('limit', ANNOTATION_QUERY_LIMIT, type=int), ANNOTATION_QUERY_LIMIT))
+
+    rows = query.order_by(SequenceAnnotation.start.asc()).limit(limit).all()
+    sequence = None
+    if any(r.period or r.kind == 'snp' for r in rows):
+        sequence = decrypt_data(analysis.encrypted_sequence, user.email, user.salt)
+
+    return jsonify({
+        "analysis_id": analysis_id,
+        "pending": analysis_id in _annotating,
+        "summary": annotation_summary(analysis_id),
+        "annotations": [r.to_dict(sequence) for r in rows]
+    }), 200
+
+@app.route('/api/analysis/<int:analysis_id>/annotations', methods=['POST'])
+@jwt_required()
+def refresh_annotations(analysis_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    analysis = _owned_analysis(analysis_id, user)
+    if not analysis:
+        return jsonify({"msg": "Analysis not found"}), 404
+    if analysis_id in _annotating:
+        return jsonify({"msg": "Annotation already running", "pending": True}), 202
+
+    sequence = decrypt_data(analysis.encrypted_sequence, user.email, user.salt)
+    raw_res = decrypt_data(analysis.encrypted_results, user.email, user.salt) or "{}"
+    spawn(annotate_analysis, analysis_id, sequence, results_to_dict(decode_results(raw_res)))
+    return jsonify({"msg": "Annotation started", "pending": True}), 202
+
+# Region Tiles for Sequence Viewers
+REGION_MAX_BASES = int(os.environ.get('REGION_MAX_BASES', 20000))
+REGION_MAX_FEATURES = 2000
+REGION_MAX_BINS = 2000
+FEATURE_INDEX_LIMIT = 16
+
+# Interval indexes over stored annotations, keyed by (analysis, annotation count, max row id)
+_feature_indexes = OrderedDict()
+_feature_indexes_lock = threading.Lock()
+
+def _annotation_stamp(analysis_id):
+    count, max_id = db.session.query(
+        db.func.count(SequenceAnnotation.id), db.func.max(SequenceAnnotation.id)
+    ).filter(SequenceAnnotation.analysis_id == analysis_id).one()
+    return count, max_id or 0
+
+def _feature_index(analysis_id, stamp, sequence):
+    key = (analysis_id,) + stamp
+    with _feature_indexes_lock:
+        index = _feature_indexes.get(key)
+        if index is not None:
+            _feature_indexes.move_to_end(key)
+            return index
+    # Plain column tuples: building ORM objects for every guide would dominate the cost
+    rows = db.session.query(
+        SequenceAnnotation.kind, SequenceAnnotation.start, SequenceAnnotation.end,
+        SequenceAnnotation.score, SequenceAnnotation.period, SequenceAnnotation.attributes
+    ).filter(SequenceAnnotation.analysis_id == analysis_id).all()
+    features = [annotation_dict(kind, start, end, score, period, json.loads(attrs) if attrs else {}, sequence)
+                for kind, start, end, score, period, attrs in rows]
+    index = offload(FeatureIndex, features)
+    with _feature_indexes_lock:
+        _feature_indexes[key] = index
+        while len(_feature_indexes) > FEATURE_INDEX_LIMIT:
+            _feature_indexes.popitem(last=False)
+    return index
+
+def _gc_bins(sequence, start, end, bin_size):
+    window = np.frombuffer(sequence[start - 1:end].upper().encode('ascii', errors='replace'), dtype=np.uint8)
+    gc = (window == ord('G')) | (window == ord('C'))
+    edges = np.arange(0, len(window), bin_size)
+    counts = np.add.reduceat(gc.astype(np.int64), edges)
+    sizes = np.diff(np.append(edges, len(window)))
+    return np.round(counts * 100.0 / sizes, 2)
+
+@app.route('/api/analysis/<int:analysis_id>/region', methods=['GET'])
+@jwt_required()
+def get_analysis_region(analysis_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    analysis = _owned_analysis(analysis_id, user)
+    if not analysis:
+        return jsonify({"msg": "Analysis not found"}), 404
+
+    # Saved versions are immutable; the tile only changes when annotations are regenerated
+    stamp = _annotation_stamp(analysis_id)
+    etag = immutable_etag('region', analysis.id, analysis.version, analysis.created_at.isoformat(),
+                          *stamp, request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    sequence = decrypt_data(analysis.encrypted_sequence, user.email, user.salt) or ""
+    length = len(sequence)
+    start = max(request.args.get('start', 1, type=int), 1)
+    end = min(request.args.get('end', length, type=int), length)
+    if start > end:
+        return jsonify({"msg": "Invalid region"}), 400
+    kinds = [k for k in request.args.get('kind', '').split(',') if k]
+    bins = min(max(request.args.get('bins', 200, type=int), 1), REGION_MAX_BINS)
+
+    index = _feature_index(analysis_id, stamp, sequence)
+    idx = index.query(start, end, kinds)
+    span = end - start + 1
+
+    body = {
+        "analysis_id": analysis.id,
+        "version": analysis.version,
+        "length": length,
+        "start": start,
+        "end": end,
+        "pending": analysis_id in _annotating,
+        "feature_count": int(len(idx)),
+        "zoom": "bases" if span <= REGION_MAX_BASES else "summary"
+    }
+    if span <= REGION_MAX_BASES:
+        body["bases"] = sequence[start - 1:end]
+    if len(idx) <= REGION_MAX_FEATURES:
+        body["features"] = [index.features[i] for i in idx.tolist()]
+
+    # Zoomed out (or too dense to list): per-bin GC and feature counts instead
+    if span > REGION_MAX_BASES or len(idx) > REGION_MAX_FEATURES:
+        bin_size, counts = index.binned_counts(idx, start, end, bins)
+        gc = _gc_bins(sequence, start, end, bin_size)
+        body["summary"] = {
+            "bin_size": bin_size,
+            "bins": [{
+                "start": start + i * bin_size,
+                "end": min(start + (i + 1) * bin_size - 1, end),
+                "gc_content": float(gc[i]),
+                "counts": {k: int(counts[j, i]) for j, k in enumerate(index.kinds) if counts[j, i]}
+            } for i in range(len(gc))]
+        }
+
+    return cacheable(jsonify(body), etag), 200
+
+# k-mer Dot Plots / Self-Similarity
+DOTPLOT_DIR = os.environ.get('DOTPLOT_DIR', os.path.join(tempfile.gettempdir(), 'geneforge-dotplots'))
+DOTPLOT_DISK_MB = int(os.environ.get('DOTPLOT_DISK_MB', 1024))
+DOTPLOT_MAX_GRID = 1024
+# Ceiling for a request's max_occurrences: a k-mer seen n times in each sequence yields n * n matches
+DOTPLOT_MAX_OCCURRENCES = int(os.environ.get('DOTPLOT_MAX_OCCURRENCES', 256))
+dotplot_store = PlotStore(DOTPLOT_DIR, DOTPLOT_DISK_MB * 1024 * 1024)
+
+def _dotplot_sequence(data, axis, user):
+    # Either a saved analysis of the caller or an inline sequence
+    analysis_id = data.get(f'analysis_{axis}')
+    if analysis_id is not None:
+        analysis = _owned_analysis(analysis_id, user)
+        if not analysis:
+            return None
+        return (decrypt_data(analysis.encrypted_sequence, user.email, user.salt) or '').upper()
+    return (data.get(f'sequence_{axis}') or '').upper()
+
+def _owned_dotplot(plot_id, user):
+    plot = dotplot_store.load(plot_id) if all(c in '0123456789abcdef' for c in plot_id) else None
+    if not plot or plot.meta.get('owner_id') != user.id:
+        return None
+    return plot
+
+def _dotplot_summary(plot_id, plot):
+    meta = {k: v for k, v in plot.meta.items() if k not in ('owner_id', 'created')}
+    return dict(meta, plot_id=plot_id, max_zoom=plot.max_zoom, tile_size=TILE_SIZE,
+                tiles=f"/api/dotplot/{plot_id}/tiles/{{z}}/{{x}}/{{y}}.png")
+
+@app.route('/api/dotplot', methods=['POST'])
+@jwt_required()
+def create_dotplot():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    data = request.get_json() or {}
+    for axis in ('x', 'y'):
+        if data.get(f'analysis_{axis}') is not None:
+            try:
+                data[f'analysis_{axis}'] = int(data[f'analysis_{axis}'])
+            except (TypeError, ValueError):
+                return jsonify({"msg": f"analysis_{axis} must be an integer"}), 400
+        if not isinstance(data.get(f'sequence_{axis}') or '', str):
+            return jsonify({"msg": f"sequence_{axis} must be a string"}), 400
+
+    seq_x = _dotplot_sequence(data, 'x', user)
+    if seq_x is None:
+        return jsonify({"msg": "Analysis not found"}), 404
+    # Without a second sequence this is a self-similarity plot
+    has_y = data.get('analysis_y') is not None or data.get('sequence_y')
+    seq_y = _dotplot_sequence(data, 'y', user) if has_y else seq_x
+    if seq_y is None:
+        return jsonify({"msg": "Analysis not found"}), 404
+    if not seq_x or not seq_y:
+        return jsonify({"msg": "No sequence provided"}), 400
+    if len(seq_x) + len(seq_y) > MAX_BATCH_BASES:
+        return jsonify({"msg": f"Sequences exceed {MAX_BATCH_BASES} bases"}), 413
+    try:
+        k = int(data.get('k', DOTPLOT_DEFAULT_K))
+        max_occurrences = int(data.get('max_occurrences', DEFAULT_MAX_OCCURRENCES))
+        min_segment = int(data.get('min_segment', 50))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "k, max_occurrences and min_segment must be integers"}), 400
+    if not 4 <= k <= DOTPLOT_MAX_K:
+        return jsonify({"msg": f"k must be between 4 and {DOTPLOT_MAX_K}"}), 400
+    if max_occurrences > DOTPLOT_MAX_OCCURRENCES:
+        return jsonify({"msg": f"max_occurrences must be at most {DOTPLOT_MAX_OCCURRENCES}"}), 400
+
+    params = {"k": k, "max_occurrences": max(max_occurrences, 1), "min_segment": max(min_segment, 0)}
+    plot_id = make_key('dotplot', f"{sequence_hash(seq_x)}:{sequence_hash(seq_y)}", params, scope=user.id)
+    cached = dotplot_store.exists(plot_id) and not _cache_bypass()
+    if not cached:
+        plot = offload(compute_dotplot, seq_x, seq_y, **params)
+        dotplot_store.save(plot_id, plot, user.id)
+        log_action("DOTPLOT", user_id=user.id, details=f"{len(seq_x)} x {len(seq_y)} bases, k={k}")
+    plot = dotplot_store.load(plot_id)
+    return jsonify(dict(_dotplot_summary(plot_id, plot), cached=cached)), 200 if cached else 201
+
+@app.route('/api/dotplot/<plot_id>', methods=['GET'])
+@jwt_required()
+def get_dotplot(plot_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    plot = _owned_dotplot(plot_id, user)
+    if not plot:
+        return jsonify({"msg": "Dot plot not found"}), 404
+
+    etag = immutable_etag('dotplot', plot_id, request.query_string.decode())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    body = _dotplot_summary(plot_id, plot)
+    # Optional whole-plot density grid for canvas renderers
+    size = request.args.get('grid', 0, type=int)
+    if size > 0:
+        body['grid'] = offload(plot.grid, min(size, DOTPLOT_MAX_GRID))
+    return cacheable(jsonify(body), etag), 200
+
+@app.route('/api/dotplot/<plot_id>/tiles/<int:z>/<int:x>/<int:y>.png', methods=['GET'])
+@jwt_required()
+def get_dotplot_tile(plot_id, z, x, y):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    plot = _owned_dotplot(plot_id, user)
+    if not plot:
+        return jsonify({"msg": "Dot plot not found"}), 404
+    if z > plot.max_zoom or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"msg": "Tile out of range"}), 404
+
+    # Plots are keyed by content, so a tile never changes
+    etag = immutable_etag('dotplot-tile', plot_id, z, x, y)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return cacheable(Response(offload(plot.tile, z, x, y), mimetype='image/png'), etag), 200
+
+# Reference Library (FM-index) for Primer / Guide Specificity
+REFERENCE_DIR = os.environ.get('REFERENCE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'references'))
+REFERENCE_MAX_MB = int(os.environ.get('REFERENCE_MAX_MB', 1024))
+REFERENCE_BUILD_CONCURRENCY = int(os.environ.get('REFERENCE_BUILD_CONCURRENCY', 1))
+MAX_SPECIFICITY_QUERIES = 2000
+reference_builds = TaskLimiter(REFERENCE_BUILD_CONCURRENCY)
+
+# Memory-mapped indexes stay open between requests; only page cache is shared
+_open_indexes = OrderedDict()
+_open_indexes_lock = threading.Lock()
+OPEN_INDEX_LIMIT = 8
+
+def _reference_path(reference_id, *parts):
+    return os.path.join(REFERENCE_DIR, str(reference_id), *parts)
+
+def _open_reference_index(reference):
+    key = (reference.id, reference.built_at)
+    with _open_indexes_lock:
+        index = _open_indexes.get(key)
+        if index is not None:
+            _open_indexes.move_to_end(key)
+            return index
+    index = FMIndex.load(_reference_path(reference.id, 'index'))
+    with _open_indexes_lock:
+        _open_indexes[key] = index
+        while len(_open_indexes) > OPEN_INDEX_LIMIT:
+            _open_indexes.popitem(last=False)
+    return index
+
+def build_reference_index(reference_id):
+    # Background job: the index build itself runs on an OS thread via offload()
+    with reference_builds:
+        with app.app_context():
+            reference = ReferenceGenome.query.get(reference_id)
+            if not reference:
+                return
+            reference.status = 'building'
+            db.session.commit()
+            try:
+                summary = offload(build_index_from_fasta, _reference_path(reference_id, 'reference.fa'),
+                                  _reference_path(reference_id, 'index'))
+                reference.length = summary['length']
+                reference.contigs = summary['contigs']
+                reference.index_bytes = summary['index_bytes']
+                reference.status = 'ready'
+                reference.error = None
+                reference.built_at = datetime.datetime.utcnow()
+                # The FASTA is no longer needed once the index is on disk
+                os.remove(_reference_path(reference_id, 'reference.fa'))
+            except Exception as e:
+                log.exception("Reference index build failed (%s)", reference_id)
+                reference.status = 'failed'
+                reference.error = str(e)
+            db.session.commit()
+
+@app.route('/api/references', methods=['POST'])
+@jwt_required()
+def upload_reference():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+
+    upload = request.files.get('file')
+    if upload:
+        name = request.form.get('name') or upload.filename or 'Reference'
+    else:
+        data = request.get_json(silent=True) or {}
+        name = data.get('name') or 'Reference'
+        if not data.get('fasta'):
+            return jsonify({"msg": "FASTA file or text is required"}), 400
+
+    if request.content_length and request.content_length > REFERENCE_MAX_MB * 1024 * 1024:
+        return jsonify({"msg": f"Reference exceeds {REFERENCE_MAX_MB} MB"}), 413
+
+    reference = ReferenceGenome(user_id=user.id, name=name[:200])
+    db.session.add(reference)
+    db.session.commit()
+
+    os.makedirs(_reference_path(reference.id), exist_ok=True)
+    if upload:
+        upload.save(_reference_path(reference.id, 'reference.fa'))
+    else:
+        with open(_reference_path(reference.id, 'reference.fa'), 'w') as f:
+            f.write(data['fasta'])
+
+    log_action("REFERENCE_UPLOAD", user_id=user.id, details=f"Reference: {reference.id}")
+    spawn(build_reference_index, reference.id)
+    return jsonify(reference.to_dict()), 202
+
+@app.route('/api/references', methods=['GET'])
+@jwt_required()
+def list_references():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    references = ReferenceGenome.query.filter_by(user_id=user.id)
+    return paginate(references, ReferenceGenome.id, ReferenceGenome.to_dict, descending=True)
+
+@app.route('/api/references/<int:reference_id>', methods=['GET'])
+@jwt_required()
+def get_reference(reference_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    reference = ReferenceGenome.query.filter_by(id=reference_id, user_id=user.id).first()
+    if not reference:
+        return jsonify({"msg": "Reference not found"}), 404
+    return jsonify(reference.to_dict()), 200
+
+@app.route('/api/references/<int:reference_id>', methods=['DELETE'])
+@jwt_required()
+def delete_reference(reference_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    reference = ReferenceGenome.query.filter_by(id=reference_id, user_id=user.id).first()
+    if not reference:
+        return jsonify({"msg": "Reference not found"}), 404
+    if reference.status == 'building':
+        return jsonify({"msg": "Reference index is still building"}), 409
+
+    with _open_indexes_lock:
+        _open_indexes.pop((reference.id, reference.built_at), None)
+    db.session.delete(reference)
+    db.session.commit()
+    shutil.rmtree(_reference_path(reference_id), ignore_errors=True)
+    log_action("REFERENCE_DELETE", user_id=user.id, details=f"Reference: {reference_id}")
+    return jsonify({"msg": "Reference deleted"}), 200
+
+@app.route('/api/references/<int:reference_id>/specificity', methods=['POST'])
+@jwt_required()
+def reference_specificity(reference_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    reference = ReferenceGenome.query.filter_by(id=reference_id, user_id=user.id).first()
+    if not reference:
+        return jsonify({"msg": "Reference not found"}), 404
+    if reference.status != 'ready':
+        return jsonify({"msg": f"Reference index is {reference.status}"}), 409
+
+    data = request.get_json() or {}
+    sequences = [str(s).strip().upper() for s in (data.get('sequences') or data.get('primers') or []) if s]
+    if not sequences:
+        return jsonify({"msg": "No sequences provided"}), 400
+    if len(sequences) > MAX_SPECIFICITY_QUERIES:
+        return jsonify({"msg": f"At most {MAX_SPECIFICITY_QUERIES} sequences per request"}), 413
+    invalid = [s for s in sequences if any(c not in 'ACGT' for c in s)]
+    if invalid:
+        return jsonify({"msg": "Sequences may only contain A, C, G and T", "invalid": invalid[:10]}), 400
+    try:
+        max_mismatches = int(data.get('max_mismatches', 0))
+        max_locations = int(data.get('max_locations', 20))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "max_mismatches and max_locations must be integers"}), 400
+    if not 0 <= max_mismatches <= 3:
+        return jsonify({"msg": "max_mismatches must be between 0 and 3"}), 400
+
+    index = _open_reference_index(reference)
+    results = offload(check_specificity, index, sequences, max_mismatches, max(max_locations, 0))
+    return jsonify({"reference": reference.to_dict(), "max_mismatches": max_mismatches, "results": results}), 200
+
+# Multiple Sequence Alignment (background jobs per project)
+MSA_MAX_SEQUENCES = int(os.environ.get('MSA_MAX_SEQUENCES', 200))
+MSA_MAX_LENGTH = int(os.environ.get('MSA_MAX_LENGTH', 10000))
+MSA_WORKERS = int(os.environ.get('MSA_WORKERS', 0)) or None
+MSA_CONCURRENCY = int(os.environ.get('MSA_CONCURRENCY', 1))
+alignment_jobs = TaskLimiter(MSA_CONCURRENCY)
+
+def _run_job(job_id, limiter, work, user_email, user_salt):
+    # Shared background job runner: work(progress) returns the payload to store encrypted
+    with limiter:
+        with app.app_context():
+            job = BackgroundJob.query.get(job_id)
+            if not job:
+                return
+            job.status = 'running'
+            job.started_at = datetime.datetime.utcnow()
+            db.session.commit()
+
+            def progress(done, total):
+                job_progress[job_id] = round(done / total, 3)
+
+            try:
+                payload = work(progress)
+                job.encrypted_result = encrypt_data(json.dumps(payload, separators=(',', ':')), user_email, user_salt)
+                job.status = 'done'
+                job.error = None
+            except Exception as e:
+                log.exception("Background job failed (%s %s)", job.kind, job_id)
+                job.status = 'failed'
+                job.error = str(e)
+            job.finished_at = datetime.datetime.utcnow()
+            db.session.commit()
+            job_progress.pop(job_id, None)
+
+def run_alignment_job(job_id, records, user_email, user_salt):
+    def work(progress):
+        # The alignment itself runs on OS threads via offload()
+        result = offload(align_sequences, records, MSA_WORKERS, progress)
+        return {"result": result, "sequences": [seq for _, seq in records]}
+    _run_job(job_id, alignment_jobs, work, user_email, user_salt)
+
+def _owned_job(job_id, user):
+    return BackgroundJob.query.filter_by(id=job_id, user_id=user.id).first()
+
+def _job_payload(job, user):
+    return json.loads(decrypt_data(job.encrypted_result, user.email, user.salt) or '{}')
+
+@app.route('/api/projects/<int:project_id>/alignments', methods=['POST'])
+@jwt_required()
+def create_alignment(project_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    project = Project.query.filter_by(id=project_id, user_id=user.id).first()
+    if not project:
+        return jsonify({"msg": "Project not found"}), 404
+
+    # Inline sequences, or saved versions of this project (all of them by default)
+    data = request.get_json(silent=True) or {}
+    if data.get('sequences'):
+        entries = data['sequences']
+        if not isinstance(entries, list) or not all(
+                isinstance(s, dict) and isinstance(s.get('sequence') or '', str)
+                and isinstance(s.get('id') or '', (str, int)) and not isinstance(s.get('id'), bool)
+                for s in entries):
+            return jsonify({"msg": "sequences must be a list of {id, sequence} objects with string sequences"}), 400
+        records = [(str(s.get('id') or f"seq_{i + 1}"), (s.get('sequence') or '').upper())
+                   for i, s in enumerate(entries)]
+    elif data.get('fasta'):
+        if not isinstance(data['fasta'], str):
+            return jsonify({"msg": "fasta must be a string"}), 400
+        records = parse_multi_fasta(data['fasta'])
+    else:
+        query = AnalysisSession.query.filter_by(project_id=project_id)
+        if data.get('analysis_ids'):
+            try:
+                ids = [int(i) for i in data['analysis_ids']] if isinstance(data['analysis_ids'], list) else None
+            except (TypeError, ValueError):
+                ids = None
+            if ids is None:
+                return jsonify({"msg": "analysis_ids must be a list of integers"}), 400
+            query = query.filter(AnalysisSession.id.in_(ids))
+        analyses = query.order_by(AnalysisSession.version).all()
+        records = [(f"v{a.version}", (decrypt_data(a.encrypted_sequence, user.email, user.salt) or '').upper())
+                   for a in analyses]
+
+    records = [(rid, seq) for rid, seq in records if seq]
+    if len(records) < 2:
+        return jsonify({"msg": "At least two sequences are required"}), 400
+    if len(records) > MSA_MAX_SEQUENCES:
+        return jsonify({"msg": f"At most {MSA_MAX_SEQUENCES} sequences per alignment"}), 413
+    if max(len(seq) for _, seq in records) > MSA_MAX_LENGTH:
+        return jsonify({"msg": f"Sequences longer than {MSA_MAX_LENGTH} bases are not supported"}), 413
+
+    job = BackgroundJob(user_id=user.id, project_id=project.id, kind='alignment',
+                        params=json.dumps({"sequences": len(records), "ids": [rid for rid, _ in records]}))
+    db.session.add(job)
+    db.session.commit()
+
+    log_action("ALIGNMENT_START", user_id=user.id, details=f"Project: {project.id}, Sequences: {len(records)}")
+    spawn(run_alignment_job, job.id, records, user.email, user.salt)
+    return jsonify(job.to_dict()), 202
+
+@app.route('/api/projects/<int:project_id>/jobs', methods=['GET'])
+@jwt_required()
+def list_project_jobs(project_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    project = Project.query.filter_by(id=project_id, user_id=user.id).first()
+    if not project:
+        return jsonify({"msg": "Project not found"}), 404
+    query = BackgroundJob.query.filter_by(project_id=project.id)
+    if request.args.get('kind'):
+        query = query.filter_by(kind=request.args['kind'])
+    return paginate(query, BackgroundJob.id, BackgroundJob.to_dict, descending=True)
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    job = _owned_job(job_id, user)
+    if not job:
+        return jsonify({"msg": "Job not found"}), 404
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 200
+
+    # Finished jobs never change
+    etag = immutable_etag('job', job.id, job.finished_at.isoformat())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    body = dict(job.to_dict(), result=_job_payload(job, user).get('result'))
+    return cacheable(jsonify(body), etag), 200
+
+@app.route('/api/jobs/<int:job_id>/alignment.fasta', methods=['GET'])
+@jwt_required()
+def get_alignment_fasta(job_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    job = _owned_job(job_id, user)
+    if not job or job.kind != 'alignment':
+        return jsonify({"msg": "Alignment not found"}), 404
+    if job.status != 'done':
+        return jsonify({"msg": f"Alignment is {job.status}"}), 409
+
+    payload = _job_payload(job, user)
+    ids = [entry['id'] for entry in payload['result']['sequences']]
+    fasta = alignment_fasta(list(zip(ids, payload['sequences'])), payload['result'])
+    return Response(fasta, mimetype='text/x-fasta',
+                    headers={"Content-Disposition": f"attachment; filename=alignment_{job.id}.fasta"})
+
+# FASTQ Quality Control
+QC_UPLOAD_DIR = os.environ.get('QC_UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'geneforge-fastq'))
+QC_MAX_MB = int(os.environ.get('QC_MAX_MB', 8192))
+QC_WORKERS = int(os.environ.get('QC_WORKERS', 0)) or None
+QC_CONCURRENCY = int(os.environ.get('QC_CONCURRENCY', 1))
+qc_jobs = TaskLimiter(QC_CONCURRENCY)
+
+def run_fastq_qc_job(job_id, path, user_email, user_salt):
+    def work(progress):
+        # Inflating gzip is one long CPU call; the scan itself fans out to worker processes
+        plain = offload(decompress_fastq, path)
+        try:
+            return {"result": fastq_qc_report(plain, QC_WORKERS)}
+        finally:
+            if plain != path:
+                os.remove(plain)
+    try:
+        _run_job(job_id, qc_jobs, work, user_email, user_salt)
+    finally:
+        # Reads are never kept once the report exists
+        if os.path.exists(path):
+            os.remove(path)
+
+@app.route('/api/qc/fastq', methods=['POST'])
+@jwt_required()
+def create_fastq_qc():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if request.content_length and request.content_length > QC_MAX_MB * 1024 * 1024:
+        return jsonify({"msg": f"FASTQ exceeds {QC_MAX_MB} MB"}), 413
+
+    project_id = request.form.get('project_id', type=int) or request.args.get('project_id', type=int)
+    if project_id and not Project.query.filter_by(id=project_id, user_id=user.id).first():
+        return jsonify({"msg": "Project not found"}), 404
+
+    upload = request.files.get('file')
+    name = (upload.filename if upload else request.args.get('name')) or 'reads.fastq'
+    job = BackgroundJob(user_id=user.id, project_id=project_id, kind='fastq_qc',
+                        params=json.dumps({"file": name[:200]}))
+    db.session.add(job)
+    db.session.commit()
+
+    # Multipart upload or a raw (optionally gzipped) request body, streamed to disk
+    os.makedirs(QC_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(QC_UPLOAD_DIR, f"{job.id}.fastq")
+
+    def discard():
+        if os.path.exists(path):
+            os.remove(path)
+        db.session.delete(job)
+        db.session.commit()
+
+    try:
+        if upload:
+            upload.save(path)
+        else:
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(request.stream, f, 4 * 1024 * 1024)
+    except Exception:
+        # Client gone or disk full: no half-written file, no job left pending forever
+        db.session.rollback()
+        discard()
+        raise
+    if not os.path.getsize(path):
+        discard()
+        return jsonify({"msg": "FASTQ file is required"}), 400
+
+    log_action("FASTQ_QC", user_id=user.id, details=f"Job: {job.id}, File: {name[:100]}")
+    spawn(run_fastq_qc_job, job.id, path, user.email, user.salt)
+    return jsonify(job.to_dict()), 202
+
+# Analysis Reports (HTML / PDF rendered in the background, cached per saved version)
+REPORT_DIR = os.environ.get('REPORT_DIR', os.path.join(tempfile.gettempdir(), 'geneforge-reports'))
+REPORT_DISK_MB = int(os.environ.get('REPORT_DISK_MB', 512))
+REPORT_CONCURRENCY = int(os.environ.get('REPORT_CONCURRENCY', 2))
+REPORT_CHUNK = 64 * 1024
+report_store = ArtifactStore(REPORT_DIR, REPORT_DISK_MB * 1024 * 1024)
+report_jobs = TaskLimiter(REPORT_CONCURRENCY)
+
+def _report_params(analysis, user, source):
+    mode = source.get('mode', 'researcher')
+    fmt = source.get('format', 'pdf')
+    if mode not in REPORT_MODES or fmt not in REPORT_FORMATS:
+        return None
+    narrative = str(source.get('narrative', 'true')).lower() not in ('false', '0', 'no')
+    # Saved versions are immutable but their annotations can be regenerated, so the artifact
+    # is named by (analysis, version, mode, format) plus the annotation summary it renders
+    annotations = content_hash(json.dumps(annotation_summary(analysis.id), sort_keys=True))
+    params = {"analysis_id": analysis.id, "version": analysis.version, "mode": mode, "format": fmt,
+              "narrative": narrative, "annotations": annotations[:16]}
+    key = make_key('report', f"{analysis.id}:{analysis.version}", params, scope=user.id)
+    return dict(params, artifact=key)
+
+def _report_filename(params):
+    return f"geneforge_report_{params['analysis_id']}_v{params['version']}_{params['mode']}.{params['format']}"
+
+def _pending_report_job(user, params):
+    return BackgroundJob.query.filter(
+        BackgroundJob.user_id == user.id,
+        BackgroundJob.kind == 'report',
+        BackgroundJob.params == json.dumps(params, sort_keys=True),
+        BackgroundJob.status.in_(('pending', 'running'))
+    ).first()
+
+def run_report_job(job_id, params, sequence, results, annotations, subject, user_id, user_email, user_salt):
+    def work(progress):
+        narrative = None
+        if params['narrative'] and results:
+            # Same cache entry as /api/ai/analyze, so an explanation the user already read is reused
+            def compute():
+                text = ai_bio_engine.generate_explanation(results, params['mode'])
+                return None if text == OFFLINE_MESSAGE else text
+            key = make_key('ai_analyze', _results_digest(results), {"mode": params['mode']}, scope=user_id)
+            narrative = result_cache.get_or_compute(key, compute, owner=(user_email, user_salt))
+        progress(1, 3)
+        meta = {"subject": subject, "version": params['version'], "mode": params['mode'].title()}
+        report = offload(build_report, sequence, results, annotations, narrative, meta)
+        progress(2, 3)
+        artifact, _ = offload(render_report, report, params['format'])
+        report_store.save(params['artifact'], offload(encrypt_bytes, artifact, user_email, user_salt))
+        return {"result": {"bytes": len(artifact), "sections": [s['title'] for s in report['sections']],
+                           "narrative": narrative is not None}}
+    _run_job(job_id, report_jobs, work, user_email, user_salt)
+
+def _report_status(analysis_id, params, job=None):
+    download = f"/api/analysis/{analysis_id}/report?mode={params['mode']}&format={params['format']}"
+    if not params['narrative']:
+        # Part of the artifact key: without it the URL names the narrated report
+        download += "&narrative=false"
+    body = {"ready": job is None, "format": params['format'], "mode": params['mode'], "download": download}
+    if job is not None:
+        body["job"] = job.to_dict()
+    return body
+
+@app.route('/api/analysis/<int:analysis_id>/report', methods=['POST'])
+@jwt_required()
+def create_report(analysis_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    analysis = _owned_analysis(analysis_id, user)
+    if not analysis:
+        return jsonify({"msg": "Analysis not found"}), 404
+    params = _report_params(analysis, user, request.get_json(silent=True) or {})
+    if not params:
+        return jsonify({"msg": f"mode must be one of {', '.join(REPORT_MODES)}; "
+                               f"format one of {', '.join(REPORT_FORMATS)}"}), 400
+
+    if report_store.exists(params['artifact']) and not _cache_bypass():
+        return jsonify(_report_status(analysis_id, params)), 200
+    job = _pending_report_job(user, params)
+    if job:
+        return jsonify(_report_status(analysis_id, params, job)), 202
+
+    sequence = (decrypt_data(analysis.encrypted_sequence, user.email, user.salt) or '').upper()
+    raw_res = decrypt_data(analysis.encrypted_results, user.email, user.salt) or "{}"
+    results = results_to_dict(decode_results(raw_res))
+    annotations = annotation_summary(analysis_id) if analysis.annotations else None
+    job = BackgroundJob(user_id=user.id, project_id=analysis.project_id, kind='report',
+                        params=json.dumps(params, sort_keys=True))
+    db.session.add(job)
+    db.session.commit()
+
+    log_action("REPORT_RENDER", user_id=user.id,
+               details=f"Analysis: {analysis_id}, Mode: {params['mode']}, Format: {params['format']}")
+    spawn(run_report_job, job.id, params, sequence, results, annotations,
+          f"{analysis.project.name} v{analysis.version}", user.id, user.email, user.salt)
+    return jsonify(_report_status(analysis_id, params, job)), 202
+
+@app.route('/api/analysis/<int:analysis_id>/report', methods=['GET'])
+@jwt_required()
+def download_report(analysis_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    analysis = _owned_analysis(analysis_id, user)
+    if not analysis:
+        return jsonify({"msg": "Analysis not found"}), 404
+    params = _report_params(analysis, user, request.args)
+    if not params:
+        return jsonify({"msg": "Unknown report mode or format"}), 400
+
+    etag = immutable_etag('report', params['artifact'])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    blob = report_store.load(params['artifact'])
+    if blob is None:
+        job = _pending_report_job(user, params)
+        if job:
+            return jsonify(_report_status(analysis_id, params, job)), 202
+        return jsonify({"msg": "Report has not been rendered; POST to this URL first"}), 404
+    try:
+        artifact = decrypt_bytes(blob, user.email, user.salt)
+    except ValueError:
+        return jsonify({"msg": "Report artifact is unreadable"}), 500
+
+    def chunks():
+        for offset in range(0, len(artifact), REPORT_CHUNK):
+            yield artifact[offset:offset + REPORT_CHUNK]
+
+    mimetype = 'application/pdf' if params['format'] == 'pdf' else 'text/html'
+    response = Response(chunks(), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename={_report_filename(params)}",
+        "Content-Length": str(len(artifact))
+    })
+    return cacheable(response, etag)
 
 # AI Explanation Engine
 @app.route('/api/ai/analyze', methods=['POST'])
@@ -934,16 +2099,25 @@ def ai_analyze():
     if not analysis_results:
         return jsonify({"msg": "Missing analysis results"}), 400
         
-    explanation = ai_bio_engine.generate_explanation(analysis_results, mode)
-    
     email = get_jwt_identity()
     user = User.query.filter_by(email=email).first()
+
+    def compute():
+        text = ai_bio_engine.generate_explanation(analysis_results, mode)
+        # Never pin an outage message in the cache
+        return None if text == OFFLINE_MESSAGE else text
+
+    key = make_key('ai_analyze', _results_digest(analysis_results), {"mode": mode}, scope=user.id)
+    explanation = result_cache.get_or_compute(key, compute, owner=(user.email, user.salt),
+                                              bypass=_cache_bypass()) or OFFLINE_MESSAGE
+
     log_action("AI_ANALYSIS", user_id=user.id, details=f"Mode: {mode}")
     
     return jsonify({"explanation": explanation}), 200
 
 @app.route('/api/ai/usage', methods=['GET'])
 @jwt_required()
+@read_replica
 def ai_usage_stats():
     email = get_jwt_identity()
     user = User.query.filter_by(email=email).first()
@@ -952,21 +2126,190 @@ def ai_usage_stats():
     # For now, allow all logged in users to see their own, or admin to see all.
     # Let's assume role 'admin' exists in User model (it does).
     
-    if user.role == 'admin':
-        # Join to get email
-        results = db.session.query(AIUsage, User.email).join(User, AIUsage.user_id == User.id).order_by(AIUsage.timestamp.desc()).all()
+    # Join to get email
+    results = db.session.query(AIUsage.id, User.email, AIUsage.model_used, AIUsage.tokens_input,
+                               AIUsage.tokens_output, AIUsage.status, AIUsage.timestamp) \
+        .join(User, AIUsage.user_id == User.id)
+    if user.role != 'admin':
+        results = results.filter(AIUsage.user_id == user.id)
+
+    return paginate(results, AIUsage.id, lambda r: {
+        "id": r.id,
+        "user": r.email,
+        "model": r.model_used,
+        "input": r.tokens_input,
+        "output": r.tokens_output,
+        "status": r.status,
+        "timestamp": r.timestamp.isoformat()
+    }, descending=True)
+
+@app.route('/api/admin/ai-transport', methods=['GET'])
+@jwt_required()
+def admin_ai_transport():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+    from ai_transport import provider_transports
+    return jsonify(provider_transports.snapshot()), 200
+
+# On-demand profiling of this worker (admin only): a sampling profiler for N seconds, or
+# cProfile for a single request sent with an "X-Profile: 1" header
+@app.before_request
+def start_request_profile():
+    if profiles.sampling:
+        profiles.label(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}")
+    if request.headers.get('X-Profile'):
+        try:
+            verify_jwt_in_request(optional=True)
+        except Exception:
+            return
+        email = get_jwt_identity()
+        admin = User.query.filter_by(email=email).first() if email else None
+        if admin and admin.role == 'admin':
+            profile = profiles.start_request(f"{request.method} {request.path}")
+            if profile is None:
+                return jsonify({"msg": "A request is already being profiled on this worker",
+                                "id": profiles.request_active.id}), 409
+            g.request_profile = profile
+            g.request_profile_admin = admin.id
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('request_profile', None)
+    if profile:
+        profiles.finish_request(profile)
+        response.headers['X-Profile-Id'] = profile.id
+        log_action("ADMIN_PROFILED_REQUEST", user_id=g.request_profile_admin, details=f"{profile.name} ({profile.id})")
+    return response
+
+@app.teardown_request
+def release_request_profile(exc):
+    # after_request is skipped when the view raised; free the slot for the next X-Profile request
+    profile = g.pop('request_profile', None)
+    if profile:
+        profiles.finish_request(profile)
+
+@app.route('/api/admin/profiler', methods=['GET'])
+@jwt_required()
+def admin_profiler_status():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+    active = profiles.active
+    return jsonify({
+        "active": active.summary() if active and active.running else None,
+        "profiles": profiles.snapshot()
+    }), 200
+
+@app.route('/api/admin/profiler/start', methods=['POST'])
+@jwt_required()
+def admin_profiler_start():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+    data = request.get_json(silent=True) or {}
+    try:
+        seconds = float(data.get('seconds', 30))
+        interval_ms = float(data.get('interval_ms', 10))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "seconds and interval_ms must be numbers"}), 400
+    if not 0 < seconds <= PROFILER_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+        return jsonify({"msg": f"seconds must be in (0, {PROFILER_MAX_SECONDS}] and interval_ms in [1, 1000]"}), 400
+
+    profiler = profiles.start_sampling(seconds, interval_ms / 1000)
+    if profiler is None:
+        return jsonify({"msg": "A profiler is already running on this worker", "id": profiles.active.id}), 409
+    log_action("ADMIN_STARTED_PROFILER", user_id=user.id, details=f"{seconds:g}s every {interval_ms:g}ms ({profiler.id})")
+    return jsonify({"id": profiler.id, "seconds": seconds, "interval_ms": interval_ms}), 202
+
+@app.route('/api/admin/profiler/stop', methods=['POST'])
+@jwt_required()
+def admin_profiler_stop():
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+    active = profiles.active
+    if not active or not active.running:
+        return jsonify({"msg": "No profiler is running"}), 404
+    active.stop()
+    log_action("ADMIN_STOPPED_PROFILER", user_id=user.id, details=active.id)
+    return jsonify({"id": active.id}), 200
+
+@app.route('/api/admin/profiler/<profile_id>', methods=['GET'])
+@jwt_required()
+def admin_profiler_download(profile_id):
+    email = get_jwt_identity()
+    user = User.query.filter_by(email=email).first()
+    if not user or user.role != 'admin':
+        return jsonify({"msg": "Unauthorized"}), 403
+    profile = profiles.get(profile_id)
+    if not profile:
+        return jsonify({"msg": "Profile not found (only the most recent ones are kept)"}), 404
+
+    # json: summary; collapsed: flamegraph input (sampling); text / pstats: cProfile output (request)
+    fmt = request.args.get('format', 'json')
+    if fmt == 'json':
+        return jsonify(profile.summary()), 200
+    if profile.kind == 'sampling' and fmt == 'collapsed':
+        body, mimetype, filename = profile.collapsed(), 'text/plain', f"profile-{profile.id}.folded"
+    elif profile.kind == 'request' and fmt == 'text':
+        body, mimetype, filename = profile.text(), 'text/plain', f"profile-{profile.id}.txt"
+    elif profile.kind == 'request' and fmt == 'pstats':
+        body, mimetype, filename = profile.pstats_dump(), 'application/octet-stream', f"profile-{profile.id}.prof"
     else:
-        results = db.session.query(AIUsage, User.email).join(User, AIUsage.user_id == User.id).filter(AIUsage.user_id == user.id).order_by(AIUsage.timestamp.desc()).all()
-        
-    return jsonify([{
-        "id": r[0].id,
-        "user": r[1],
-        "model": r[0].model_used,
-        "input": r[0].tokens_input,
-        "output": r[0].tokens_output,
-        "status": r[0].status,
-        "timestamp": r[0].timestamp.isoformat()
-    } for r in results]), 200
+        return jsonify({"msg": f"Format {fmt} is not available for a {profile.kind} profile"}), 400
+    log_action("ADMIN_DOWNLOADED_PROFILE", user_id=user.id, details=f"{profile.id} as {fmt}")
+    return Response(body, mimetype=mimetype, headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+# Resumable explain streams: one upstream generation per (user, results, mode), replayable by event id
+AI_STREAM_REPLAY_TTL = int(os.environ.get('AI_STREAM_REPLAY_TTL', 300))
+stream_hub = StreamHub(AI_STREAM_REPLAY_TTL)
+
+def produce_explanation(generation, analysis_results, mode, cache_key, owner, user_id):
+    # Runs on its own greenlet, so a dropped connection neither cancels nor repeats the upstream call
+    model_used = "unknown"
+    full_text_len = 0
+    try:
+        for chunk in ai_bio_engine.generate_explanation_stream(analysis_results, mode):
+            if chunk.startswith("__MODEL_USED__:"):
+                model_used = chunk.split(":", 1)[1].strip()
+                generation.append(model_used, event='model')
+                continue
+            full_text_len += len(chunk)
+            generation.append(chunk)
+
+        # Only complete answers from a real model are worth replaying
+        if model_used != "unknown" and full_text_len:
+            result_cache.put(cache_key, json.dumps({"generation": generation.id, "events": generation.events}), owner)
+
+        with app.app_context():
+            usage = AIUsage(
+                user_id=user_id,
+                model_used=model_used,
+                tokens_input=0, # Approximation not calculated here
+                tokens_output=full_text_len // 4, # Rough est
+                status='success'
+            )
+            db.session.add(usage)
+            db.session.commit()
+
+    except Exception as e:
+        log.exception("AI explanation stream failed")
+        with app.app_context():
+            usage = AIUsage(
+                user_id=user_id,
+                model_used=model_used,
+                status='failed'
+            )
+            db.session.add(usage)
+            db.session.commit()
+        generation.append(f"AI interpretation engine encountered a connectivity issue ({str(e)}). Please ensure your API keys are valid and quotas are not exceeded.", event='error')
+    finally:
+        generation.finish()
 
 @app.route('/api/ai/explain', methods=['POST'])
 @jwt_required()
@@ -980,52 +2323,42 @@ def ai_explain_stream():
     
     user_email = get_jwt_identity()
     user = User.query.filter_by(email=user_email).first()
+    owner = (user.email, user.salt)
+    cache_key = make_key('ai_stream_events', _results_digest(analysis_results), {"mode": mode}, scope=user.id)
+
+    # Reconnects send the last id they saw ('<generation>-<seq>') and resume right after it
+    resume_id, last_seq = parse_event_id(request.headers.get('Last-Event-ID') or data.get('last_event_id'))
+    generation = stream_hub.get(resume_id) if resume_id else None
+    if generation is not None and generation.key != cache_key:
+        generation = None
+    replay = None
+    if generation is None:
+        cached = None if (_cache_bypass() and not resume_id) else result_cache.get(cache_key, owner)
+        if cached is not None:
+            replay = json.loads(cached)
+        else:
+            generation, started = stream_hub.attach(cache_key)
+            if started:
+                spawn(produce_explanation, generation, analysis_results, mode, cache_key, owner, user.id)
+    generation_id = replay["generation"] if replay else generation.id
+    after = last_seq if resume_id == generation_id else -1
 
     def generate():
-        # Generator wrapper to capture model usage and log to DB
-        stream = ai_bio_engine.generate_explanation_stream(analysis_results, mode)
-        model_used = "unknown"
-        first_chunk = True
-        full_text_len = 0
-        
-        try:
-            for chunk in stream:
-                if chunk.startswith("__MODEL_USED__:"):
-                    model_used = chunk.split(":", 1)[1].strip()
-                    yield chunk # Pass header to frontend too!
-                    continue
-                
-                full_text_len += len(chunk)
-                yield chunk
-            
-            # Log success after stream finishes
-            with app.app_context():
-                # Re-fetch user to ensure session attached
-                u = User.query.get(user.id) 
-                usage = AIUsage(
-                    user_id=u.id,
-                    model_used=model_used,
-                    tokens_input=0, # Approximation not calculated here
-                    tokens_output=full_text_len // 4, # Rough est
-                    status='success'
-                )
-                db.session.add(usage)
-                db.session.commit()
-                
-        except Exception as e:
-            import traceback
-            err_trace = traceback.format_exc()
-            print(f"CRITICAL STREAM ERROR: {e}\n{err_trace}")
-            with app.app_context():
-                u = User.query.get(user.id)
-                usage = AIUsage(
-                    user_id=u.id,
-                    model_used=model_used,
-                    status='failed'
-                )
-                db.session.add(usage)
-                db.session.commit()
-            yield f"\n[Error: AI interpretation engine encountered a connectivity issue ({str(e)}). Please ensure your API keys are valid and quotas are not exceeded.]"
+        yield "retry: 3000\n\n"
+        if resume_id and after < 0:
+            # The old generation is gone; the client must discard what it has
+            yield sse_event("", event='reset')
+        if replay:
+            events = ((seq, event, text) for seq, (event, text) in enumerate(replay["events"]) if seq > after)
+        else:
+            events = generation.follow(after)
+        for item in events:
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            seq, event, text = item
+            yield sse_event(text, f"{generation_id}-{seq}", event)
+        yield sse_event("", event='done')
 
     return Response(
         generate(), 
@@ -1043,35 +2376,62 @@ def handle_offer(data):
     room = data.get('room')
     if room:
         emit('webrtc-offer', data, room=room, include_self=False)
+        room_metrics.relayed(room, 'webrtc-offer', _payload_size(data), include_self=False)
 
 @socketio.on('webrtc-answer')
 def handle_answer(data):
     room = data.get('room')
     if room:
         emit('webrtc-answer', data, room=room, include_self=False)
+        room_metrics.relayed(room, 'webrtc-answer', _payload_size(data), include_self=False)
 
 @socketio.on('webrtc-ice-candidate')
 def handle_ice_candidate(data):
     room = data.get('room')
     if room:
         emit('webrtc-ice-candidate', data, room=room, include_self=False)
+        room_metrics.relayed(room, 'webrtc-ice-candidate', _payload_size(data), include_self=False)
 
 @app.route('/api/auth/ping', methods=['GET'])
 def ping():
     return jsonify({"msg": "pong"}), 200
 
+_started = False
+
+def create_app():
+    """
+    Serving entry point (gunicorn "app:create_app()"). Starts this worker's background
+    services; schema and admin seeding are not part of it (python manage.py init), unless
+    AUTO_MIGRATE=True for hosts without a release step.
+    """
+    global _started
+    if not _started:
+        _started = True
+        if os.environ.get('AUTO_MIGRATE', 'False') == 'True':
+            init_db(app)
+            seed_admin(app)
+        # Open provider connections now, so the first explanation skips DNS/TLS setup
+        if os.environ.get('AI_PREWARM', 'True') == 'True':
+            spawn(ai_bio_engine.warm)
+        # Replica lag is measured in the background; requests only read the last result
+        if db_config.router.replicas:
+            spawn(db_config.router.watch)
+    return app
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'True') == 'True'
     
+    init_db(app)
+    seed_admin(app)
+    create_app()
     with app.app_context():
-        db.create_all()
         # Seed default admin if missing
         admin_email = os.environ.get('ADMIN_EMAIL', 'admin@geneforge.com')
         admin_pass = os.environ.get('ADMIN_PASSWORD', 'admin123')
         admin = User.query.filter_by(role='admin').first()
         if not admin:
-            print(f"SEeding default admin account: {admin_email}")
+            log.info("Seeding default admin account: %s", admin_email)
             salt = os.urandom(16)
             admin = User(
                 email=admin_email,
@@ -1083,13 +2443,13 @@ if __name__ == '__main__':
             db.session.commit()
     
     try:
-        print(f"Initializing Analysis Engine on port {port}...")
-        print(f"CORS allowed origins: {allowed_origins}")
+        log.info("Initializing Analysis Engine on port %s...", port)
+        log.info("CORS allowed origins: %s", allowed_origins)
         # On Windows, we need allow_unsafe_werkzeug=True for SocketIO with debug
         socketio.run(app, host='0.0.0.0', port=port, debug=debug, allow_unsafe_werkzeug=True)
     except Exception as e:
         if "10048" in str(e):
-            print(f"PORT {port} CONFLICT: Attempting recovery on backup port...")
+            log.warning("PORT %s CONFLICT: Attempting recovery on backup port...", port)
             socketio.run(app, host='0.0.0.0', port=port + 1, debug=debug, allow_unsafe_werkzeug=True)
         else:
             raise e
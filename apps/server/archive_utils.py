@@ -0,0 +1,183 @@
+import io
+import json
+import zlib
+import zipfile
+import datetime
+from itertools import zip_longest
+
+from result_codec import decode_results, results_to_dict
+
+# Archive layout (zip):
+#   project.json     - project metadata and format marker
+#   sequences.fasta  - one record per analysis version, header ">v<version> ..."
+#   results.jsonl    - one JSON object per analysis version, same order; it also carries the
+#                      stored sequence verbatim when that is not plain bases (pasted FASTA with
+#                      headers, line breaks, spaces), since the FASTA body holds only the bases
+ARCHIVE_FORMAT = "geneforge-project"
+ARCHIVE_VERSION = 1
+FASTA_LINE_WIDTH = 80
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable sink that collects zip output so a generator can hand it out."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def _fasta_body(sequence):
+    """The bases of a stored sequence: header lines and whitespace dropped."""
+    lines = (line for line in sequence.splitlines() if not line.lstrip().startswith(">"))
+    return "".join("".join(line.split()) for line in lines)
+
+
+def iter_project_archive(project_meta, iter_analyses, decrypt):
+    """
+    Streams a project as a zip archive.
+    project_meta is a plain dict (name, created_at) so no ORM state outlives the request,
+    iter_analyses() must return a fresh iterator of AnalysisSession rows ordered by version,
+    decrypt(ciphertext) returns plaintext. Only one row is decrypted at a time.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        meta = {
+            "format": ARCHIVE_FORMAT,
+            "format_version": ARCHIVE_VERSION,
+            "name": project_meta.get("name"),
+            "created_at": project_meta.get("created_at"),
+            "exported_at": datetime.datetime.utcnow().isoformat(),
+        }
+        zf.writestr("project.json", json.dumps(meta, indent=2))
+        yield sink.drain()
+
+        # Pass 1: sequences only
+        verbatim = set()
+        with zf.open("sequences.fasta", "w") as fh:
+            for analysis in iter_analyses():
+                stored = decrypt(analysis.encrypted_sequence) or ""
+                sequence = _fasta_body(stored)
+                if sequence != stored:
+                    verbatim.add(analysis.id)
+                fh.write(f">v{analysis.version} id={analysis.id}\n".encode("utf-8"))
+                for i in range(0, len(sequence), FASTA_LINE_WIDTH):
+                    fh.write(sequence[i:i + FASTA_LINE_WIDTH].encode("utf-8") + b"\n")
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+        # Pass 2: results only
+        with zf.open("results.jsonl", "w") as fh:
+            for analysis in iter_analyses():
+                raw = decrypt(analysis.encrypted_results) if analysis.encrypted_results else None
+                try:
+                    results = results_to_dict(decode_results(raw))
+                except ValueError:
+                    results = {}
+                entry = {
+                    "version": analysis.version,
+                    "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
+                    "results": results,
+                }
+                if analysis.id in verbatim:
+                    entry["sequence"] = decrypt(analysis.encrypted_sequence) or ""
+                line = json.dumps(entry)
+                fh.write(line.encode("utf-8") + b"\n")
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+    # Central directory is written on close
+    yield sink.drain()
+
+
+def _iter_fasta(fh):
+    header = None
+    parts = []
+    for line in fh:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(">"):
+            if header is not None:
+                yield header, "".join(parts)
+            header = line[1:]
+            parts = []
+        else:
+            parts.append(line)
+    if header is not None:
+        yield header, "".join(parts)
+
+
+def _fasta_version(header):
+    token = header.split()[0] if header else ""
+    if not token.startswith("v") or not token[1:].isdigit():
+        raise ArchiveError(f"Malformed FASTA header: {header[:40]}")
+    return int(token[1:])
+
+
+def read_project_archive(fileobj):
+    """
+    Opens an exported archive. Returns (metadata, records) where records lazily yields
+    (version, created_at, sequence, results) in archive order.
+    """
+    try:
+        zf = zipfile.ZipFile(fileobj)
+        meta = json.loads(zf.read("project.json"))
+    except (zipfile.BadZipFile, KeyError, ValueError) as e:
+        raise ArchiveError(f"Invalid project archive: {e}")
+
+    if meta.get("format") != ARCHIVE_FORMAT or meta.get("format_version", 0) > ARCHIVE_VERSION:
+        raise ArchiveError("Unsupported archive format")
+
+    def records():
+        # Anything malformed inside the members surfaces while the caller iterates
+        try:
+            yield from _records()
+        except ArchiveError:
+            raise
+        except (zipfile.BadZipFile, zlib.error, KeyError, ValueError, TypeError, AttributeError) as e:
+            raise ArchiveError(f"Invalid project archive: {e}")
+
+    def _records():
+        with zf.open("sequences.fasta") as seq_raw, zf.open("results.jsonl") as res_raw:
+            fasta = _iter_fasta(io.TextIOWrapper(seq_raw, encoding="utf-8"))
+            results = (l for l in io.TextIOWrapper(res_raw, encoding="utf-8") if l.strip())
+            for record, line in zip_longest(fasta, results):
+                if record is None or line is None:
+                    raise ArchiveError("Archive has mismatched sequence and result counts")
+                header, sequence = record
+                entry = json.loads(line)
+                version = _fasta_version(header)
+                if entry.get("version") != version:
+                    raise ArchiveError(f"Sequence/result mismatch at version {version}")
+                if entry.get("sequence") is not None:
+                    if not isinstance(entry["sequence"], str) or _fasta_body(entry["sequence"]) != sequence:
+                        raise ArchiveError(f"Sequence/result mismatch at version {version}")
+                    sequence = entry["sequence"]
+                if not sequence:
+                    raise ArchiveError(f"Empty sequence at version {version}")
+                created_at = entry.get("created_at")
+                yield (
+                    version,
+                    datetime.datetime.fromisoformat(created_at) if created_at else None,
+                    sequence,
+                    entry.get("results", {}),
+                )
+
+    return meta, records()
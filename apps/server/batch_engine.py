@@ -0,0 +1,174 @@
+import numpy as np
+
+# Mirrors COMMON_RESTRICTION_ENZYMES in apps/client/src/utils/dnaUtils.ts
+RESTRICTION_ENZYMES = [
+    ("EcoRI", "GAATTC", 1),
+    ("BamHI", "GGATCC", 1),
+    ("HindIII", "AAGCTT", 1),
+    ("NotI", "GCGGCCGC", 2),
+    ("XhoI", "CTCGAG", 1),
+    ("SalI", "GTCGAC", 1),
+    ("PstI", "CTGCAG", 5),
+    ("SmaI", "CCCGGG", 3),
+    ("KpnI", "GGTACC", 5),
+    ("SacI", "GAGCTC", 5),
+]
+
+GUIDE_LENGTH = 20
+BASES = "ACGT"
+# Records are joined with this byte so no window can span two records
+SEPARATOR = ord("|")
+
+# Byte -> code lookup: A,C,G,T = 0..3, anything else = 4, separator = 5
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate(BASES):
+    _CODES[ord(_b)] = _i
+    _CODES[ord(_b.lower())] = _i
+_CODES[SEPARATOR] = 5
+
+
+def parse_multi_fasta(text):
+    """Splits multi-FASTA text into (id, sequence) pairs. Bare text is treated as one record."""
+    records = []
+    header = None
+    parts = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(">"):
+            if header is not None or parts:
+                records.append((header or f"record_{len(records) + 1}", "".join(parts).upper()))
+            header = line[1:].split()[0] if len(line) > 1 else f"record_{len(records) + 1}"
+            parts = []
+        else:
+            parts.append(line.replace(" ", ""))
+    if header is not None or parts:
+        records.append((header or f"record_{len(records) + 1}", "".join(parts).upper()))
+    return records
+
+
+class RecordBuffer:
+    """All records concatenated into one uint8 buffer with start offsets."""
+
+    def __init__(self, records):
+        self.ids = [r[0] for r in records]
+        joined = "|".join(r[1] for r in records).encode("ascii", errors="replace")
+        self.raw = np.frombuffer(joined, dtype=np.uint8)
+        self.codes = _CODES[self.raw]
+        self.lengths = np.fromiter((len(r[1]) for r in records), dtype=np.int64, count=len(records))
+        self.starts = np.zeros(len(records), dtype=np.int64)
+        if len(records) > 1:
+            self.starts[1:] = np.cumsum(self.lengths[:-1] + 1)
+        # Record index for every buffer position (separators map to the preceding record)
+        self.record_of = np.repeat(np.arange(len(records)), self.lengths + 1)[:len(self.raw)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def locate(self, positions):
+        """Maps buffer positions to (record index, 1-based local position)."""
+        rec = self.record_of[positions]
+        return rec, positions - self.starts[rec] + 1
+
+
+def _site_mask(raw, site):
+    """Boolean mask of buffer positions where site starts; N matches any base."""
+    n = len(raw) - len(site) + 1
+    if n <= 0:
+        return np.zeros(0, dtype=bool)
+    mask = np.ones(n, dtype=bool)
+    for j, ch in enumerate(site.upper()):
+        if ch == "N":
+            mask &= _CODES[raw[j:j + n]] < 4
+        else:
+            mask &= raw[j:j + n] == ord(ch)
+    return mask
+
+
+def count_bases(buf):
+    n = len(buf)
+    counts = np.bincount(buf.record_of * 6 + buf.codes, minlength=n * 6).reshape(n, 6)
+    return counts[:, :5]
+
+
+def find_restriction_sites(buf, enzymes=RESTRICTION_ENZYMES):
+    """Returns (record index, position, enzyme index) columns sorted by record then position."""
+    recs, positions, enzyme_idx = [], [], []
+    for k, (_, site, _) in enumerate(enzymes):
+        hits = np.flatnonzero(_site_mask(buf.raw, site))
+        rec, pos = buf.locate(hits)
+        recs.append(rec)
+        positions.append(pos)
+        enzyme_idx.append(np.full(len(hits), k, dtype=np.int64))
+    if not recs:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    rec, pos, enz = np.concatenate(recs), np.concatenate(positions), np.concatenate(enzyme_idx)
+    order = np.lexsort((pos, rec))
+    return rec[order], pos[order], enz[order]
+
+
+def find_guides(buf, pam="NGG", guide_length=GUIDE_LENGTH):
+    """Returns (record index, position, guide GC%) for every guide followed by the PAM."""
+    window = guide_length + len(pam)
+    pam_mask = _site_mask(buf.raw[guide_length:], pam)
+    n = len(pam_mask)
+    if n <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    # Prefix sums: separators inside the window reject it, G/C gives guide GC
+    sep_cum = np.concatenate(([0], np.cumsum(buf.codes == 5)))
+    gc_cum = np.concatenate(([0], np.cumsum((buf.codes == 1) | (buf.codes == 2))))
+    starts = np.arange(n)
+    ok = pam_mask & (sep_cum[starts + window] - sep_cum[starts] == 0)
+    hits = np.flatnonzero(ok)
+    gc = (gc_cum[hits + guide_length] - gc_cum[hits]) * (100.0 / guide_length)
+    rec, pos = buf.locate(hits)
+    return rec, pos, gc
+
+
+def _split_by_record(rec, n_records, *columns):
+    """Splits record-sorted columns into per-record slices."""
+    bounds = np.searchsorted(rec, np.arange(n_records + 1))
+    for i in range(n_records):
+        lo, hi = bounds[i], bounds[i + 1]
+        yield [col[lo:hi] for col in columns]
+
+
+def analyze_batch(records, pam="NGG", include_guides=True, enzymes=RESTRICTION_ENZYMES):
+    """
+    Runs base counting, GC, restriction mapping and guide finding over all records in one pass.
+    Yields one compact, column-oriented dict per record.
+    """
+    buf = RecordBuffer(records)
+    counts = count_bases(buf)
+    gc = np.where(buf.lengths > 0, (counts[:, 1] + counts[:, 2]) * 100.0 / np.maximum(buf.lengths, 1), 0.0)
+
+    site_rec, site_pos, site_enz = find_restriction_sites(buf, enzymes)
+    site_groups = _split_by_record(site_rec, len(buf), site_pos, site_enz)
+    if include_guides:
+        guide_rec, guide_pos, guide_gc = find_guides(buf, pam)
+        guide_groups = _split_by_record(guide_rec, len(buf), guide_pos, guide_gc)
+
+    enzyme_names = [e[0] for e in enzymes]
+    for i, record_id in enumerate(buf.ids):
+        positions, enz = next(site_groups)
+        result = {
+            "id": record_id,
+            "length": int(buf.lengths[i]),
+            "base_counts": dict(zip(["A", "C", "G", "T", "Other"], counts[i].tolist())),
+            "gc_content": round(float(gc[i]), 2),
+            "restriction_sites": {
+                "enzyme": [enzyme_names[k] for k in enz.tolist()],
+                "position": positions.tolist()
+            }
+        }
+        if include_guides:
+            g_pos, g_gc = next(guide_groups)
+            result["crispr_guides"] = {
+                "position": g_pos.tolist(),
+                "gc_content": np.round(g_gc, 1).tolist()
+            }
+        yield result
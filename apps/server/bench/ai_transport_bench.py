@@ -0,0 +1,89 @@
+"""
+LLM provider transport check against the local fake OpenAI server.
+
+Compares time-to-first-token of a default SDK client with the pooled, pre-warmed
+transport from ai_transport, then runs concurrent streams to show connection reuse
+and pool utilization.
+
+    python bench/ai_transport_bench.py --handshake-ms 150 --concurrency 8 --rounds 3
+
+Starts bench/fake_openai.py itself unless --base-url points at a running server.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+MESSAGES = [{"role": "user", "content": "Explain this sequence."}]
+
+
+def first_token_ms(client):
+    begin = time.perf_counter()
+    stream = client.chat.completions.create(model="fake-gpt", messages=MESSAGES, stream=True)
+    ttft = None
+    for chunk in stream:
+        if ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            ttft = (time.perf_counter() - begin) * 1000
+    return ttft
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(base_url.rsplit("/v1", 1)[0] + "/stats") as response:
+        return json.load(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    fake = None
+    base_url = args.base_url
+    if not base_url:
+        fake = subprocess.Popen([sys.executable, os.path.join(SERVER_DIR, "bench", "fake_openai.py"),
+                                 "--port", str(args.port), "--handshake-ms", str(args.handshake_ms)],
+                                stdout=subprocess.PIPE)
+        fake.stdout.readline()
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    from openai import OpenAI
+    from ai_transport import provider_transports
+
+    try:
+        # A fresh default client per request: what a cold pool costs
+        cold = [first_token_ms(OpenAI(api_key="sk-test", base_url=base_url)) for _ in range(args.rounds)]
+        print(f"default client, new connection   first token {sum(cold) / len(cold):7.1f} ms")
+
+        client = provider_transports.openai_client("bench", "sk-test", base_url)
+        transport = provider_transports.get("bench", base_url)
+        begin = time.perf_counter()
+        transport.prewarm()
+        print(f"prewarm                           {(time.perf_counter() - begin) * 1000:7.1f} ms (off the request path)")
+        warm = [first_token_ms(client) for _ in range(args.rounds)]
+        print(f"pooled client, pre-warmed         first token {sum(warm) / len(warm):7.1f} ms")
+
+        before = server_stats(base_url)["connections"]
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            for _ in range(args.rounds):
+                list(pool.map(lambda _: first_token_ms(client), range(args.concurrency)))
+        opened = server_stats(base_url)["connections"] - before
+        print(f"{args.rounds} x {args.concurrency} concurrent streams    new connections {opened}")
+        print(json.dumps(transport.snapshot(), indent=2))
+    finally:
+        if fake:
+            fake.terminate()
+
+
+if __name__ == "__main__":
+    main()
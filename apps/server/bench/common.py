@@ -0,0 +1,112 @@
+"""
+Shared helpers for the bench scripts: percentiles, JSON results with run metadata, and
+comparison against a saved baseline so numbers can be tracked across commits.
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import subprocess
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, p):
+    """Linear-interpolated percentile (0-100) of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples, scale=1000.0):
+    """count / p50 / p95 / p99 / max / mean of samples in seconds, reported in ms (scale)."""
+    values = sorted(samples)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values) * scale, 3),
+        "p50": round(percentile(values, 50) * scale, 3),
+        "p95": round(percentile(values, 95) * scale, 3),
+        "p99": round(percentile(values, 99) * scale, 3),
+        "max": round(values[-1] * scale, 3),
+    }
+
+
+def run_metadata(**extra):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return dict({
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }, **extra)
+
+
+def save(path, results, meta):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+
+
+def load_baseline(path):
+    if not path:
+        return {}, {}
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("results", {}), data.get("meta", {})
+
+
+def delta(now, then, lower_is_better=True):
+    """Percent change string, marked with ! when it is a regression."""
+    if now is None or not then:
+        return ""
+    change = (now - then) / then * 100
+    worse = change > 0 if lower_is_better else change < 0
+    return f" ({change:+.1f}%{'!' if worse and abs(change) >= 5 else ''})"
+
+
+def regressions(results, baseline, key, threshold, lower_is_better=True):
+    """Names whose `key` got worse than the baseline by more than threshold percent."""
+    worse = []
+    for name, now in results.items():
+        then = baseline.get(name, {}).get(key)
+        if now.get(key) is None or not then:
+            continue
+        change = (now[key] - then) / then * 100
+        if (change if lower_is_better else -change) > threshold:
+            worse.append(f"{name} {key} {change:+.1f}%")
+    return worse
+
+
+def sample_results(length=100_000, guides=2000, orfs=800, seed=7):
+    """Analysis results shaped like the client's /analysis payload, at a realistic size."""
+    rng = random.Random(seed)
+    sequence = "".join(rng.choice("ACGT") for _ in range(length))
+    counts = {base: sequence.count(base) for base in "ACGT"}
+    return {
+        "sequence": sequence,
+        "length": length,
+        "base_counts": counts,
+        "gc_content": round(100 * (counts["G"] + counts["C"]) / length, 2),
+        "crispr_guides": [{"sequence": sequence[i:i + 20], "position": i, "strand": rng.choice("+-"),
+                           "pam": "NGG", "score": round(rng.random(), 4)}
+                          for i in rng.sample(range(length - 23), guides)],
+        "orfs": [{"start": s, "end": s + rng.randrange(300, 3000), "frame": s % 3, "strand": "+",
+                  "length": rng.randrange(100, 1000)} for s in rng.sample(range(length), orfs)],
+        "gc_skew": [round(rng.uniform(-0.2, 0.2), 4) for _ in range(length // 100)],
+    }
+
+
+def fail(message):
+    print(message, file=sys.stderr)
+    return 1
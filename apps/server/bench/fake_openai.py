@@ -0,0 +1,128 @@
+"""
+Minimal OpenAI-compatible chat completions server for local transport testing.
+
+Serves POST /v1/chat/completions (plain and stream=true SSE), HEAD/GET /v1/models
+and GET /stats over HTTP/1.1 keep-alive. --handshake-ms delays the first request of
+every new connection to stand in for DNS + TLS setup, so connection reuse and
+pre-warming show up in latency. Not a model.
+
+    python bench/fake_openai.py --port 8099 --handshake-ms 150
+    OPENAI_API_KEY=sk-test OPENAI_BASE_URL=http://127.0.0.1:8099/v1 gunicorn ...
+"""
+import json
+import time
+import asyncio
+import argparse
+
+WORDS = ("The sequence shows balanced GC content with several candidate open reading frames "
+         "and guide sites suitable for further validation .").split()
+
+
+class FakeOpenAI:
+    def __init__(self, handshake_ms=0, first_token_ms=50, token_ms=5, tokens=40):
+        self.handshake = handshake_ms / 1000
+        self.first_token = first_token_ms / 1000
+        self.token = token_ms / 1000
+        self.tokens = tokens
+        self.connections = 0
+        self.open = 0
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.open += 1
+        first = True
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if first:
+                    await asyncio.sleep(self.handshake)
+                    first = False
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                await self.route(method, path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+
+    async def send(self, writer, status, payload, method="GET"):
+        data = json.dumps(payload).encode()
+        writer.write(b"HTTP/1.1 %d OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                     % (status, len(data)))
+        if method != "HEAD":
+            writer.write(data)
+        await writer.drain()
+
+    async def route(self, method, path, body, writer):
+        if path.startswith("/stats"):
+            return await self.send(writer, 200, {"connections": self.connections, "open": self.open,
+                                                 "requests": self.requests})
+        if path.startswith("/v1/models"):
+            return await self.send(writer, 200, {"object": "list", "data": [{"id": "fake-gpt", "object": "model"}]}, method)
+        if method != "POST" or not path.startswith("/v1/chat/completions"):
+            return await self.send(writer, 404, {"error": {"message": "not found"}}, method)
+
+        request = json.loads(body or b"{}")
+        model = request.get("model", "fake-gpt")
+        words = [WORDS[i % len(WORDS)] for i in range(self.tokens)]
+        created = int(time.time())
+        await asyncio.sleep(self.first_token)
+        if not request.get("stream"):
+            await asyncio.sleep(self.token * self.tokens)
+            return await self.send(writer, 200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": self.tokens, "total_tokens": 10 + self.tokens},
+            })
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+
+        def chunk(payload):
+            data = b"data: " + payload + b"\n\n"
+            return b"%x\r\n%s\r\n" % (len(data), data)
+
+        for i, word in enumerate(words):
+            delta = {"content": (" " if i else "") + word}
+            writer.write(chunk(json.dumps({
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }).encode()))
+            await writer.drain()
+            await asyncio.sleep(self.token)
+        writer.write(chunk(b"[DONE]") + b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def serve(host, port, fake):
+    server = await asyncio.start_server(fake.handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--token-ms", type=float, default=5)
+    parser.add_argument("--tokens", type=int, default=40)
+    args = parser.parse_args()
+    fake = FakeOpenAI(args.handshake_ms, args.first_token_ms, args.token_ms, args.tokens)
+    print(f"fake OpenAI on http://{args.host}:{args.port}/v1", flush=True)
+    try:
+        asyncio.run(serve(args.host, args.port, fake))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
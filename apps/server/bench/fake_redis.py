@@ -0,0 +1,130 @@
+"""
+Minimal Redis-compatible pub/sub server for local multi-worker testing.
+
+Speaks enough RESP2/RESP3 for the Socket.IO Redis manager (HELLO / PUBLISH /
+SUBSCRIBE / PING) and replies +OK to connection housekeeping commands.
+Not a datastore.
+
+    python bench/fake_redis.py --port 6399
+    SOCKETIO_MESSAGE_QUEUE=redis://127.0.0.1:6399/0 gunicorn ...
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items, kind=b"*"):
+    # kind b">" is a RESP3 push frame (pub/sub traffic after HELLO 3)
+    out = kind + b"%d\r\n" % len(items)
+    for item in items:
+        out += b":%d\r\n" % item if isinstance(item, int) else _bulk(item)
+    return out
+
+
+def _hello(proto):
+    fields = [b"server", b"redis", b"version", b"7.0.0", b"proto", proto, b"mode", b"standalone"]
+    if proto < 3:
+        return _array(fields)
+    out = b"%%%d\r\n" % (len(fields) // 2)
+    for item in fields:
+        out += b":%d\r\n" % item if isinstance(item, int) else _bulk(item)
+    return out
+
+
+class FakeRedis:
+    def __init__(self):
+        self.channels = defaultdict(set)
+        self.push_kind = {}
+        self.published = 0
+
+    async def read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. from redis-cli / telnet)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            size = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    async def handle(self, reader, writer):
+        subscribed = set()
+        try:
+            while True:
+                args = await self.read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                cmd = args[0].upper()
+                if cmd == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif cmd == b"HELLO":
+                    proto = int(args[1]) if len(args) > 1 else 2
+                    self.push_kind[writer] = b">" if proto >= 3 else b"*"
+                    writer.write(_hello(proto))
+                elif cmd == b"PUBLISH":
+                    channel, message = args[1], args[2]
+                    receivers = list(self.channels.get(channel, ()))
+                    for w in receivers:
+                        w.write(_array([b"message", channel, message], self.push_kind.get(w, b"*")))
+                    self.published += 1
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif cmd == b"SUBSCRIBE":
+                    for channel in args[1:]:
+                        self.channels[channel].add(writer)
+                        subscribed.add(channel)
+                        writer.write(_array([b"subscribe", channel, len(subscribed)], self.push_kind.get(writer, b"*")))
+                elif cmd == b"UNSUBSCRIBE":
+                    for channel in args[1:] or list(subscribed):
+                        self.channels[channel].discard(writer)
+                        subscribed.discard(channel)
+                        writer.write(_array([b"unsubscribe", channel, len(subscribed)], self.push_kind.get(writer, b"*")))
+                elif cmd == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                else:
+                    # CLIENT SETINFO/SETNAME, SELECT, AUTH... are acknowledged and ignored
+                    writer.write(b"+OK\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels[channel].discard(writer)
+            self.push_kind.pop(writer, None)
+            writer.close()
+
+
+async def serve(host, port):
+    broker = FakeRedis()
+    server = await asyncio.start_server(broker.handle, host, port)
+    print(f"Fake Redis pub/sub listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Redis-compatible pub/sub stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
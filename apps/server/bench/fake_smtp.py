@@ -0,0 +1,150 @@
+"""
+Minimal SMTP sink for local load tests of the OTP login flow.
+
+Accepts EHLO/HELO, AUTH PLAIN/LOGIN (any credentials), MAIL, RCPT, DATA, RSET, NOOP and
+QUIT without TLS, keeps the last message per recipient, and hands it out once over HTTP
+so a load generator can read the passcode back. --latency-ms delays the reply to DATA to stand
+in for a real provider. Not a mail server.
+
+    python bench/fake_smtp.py --port 8025 --http-port 8026
+    EMAIL_HOST=127.0.0.1 EMAIL_PORT=8025 EMAIL_USE_TLS=False EMAIL_USERNAME=bench EMAIL_PASSWORD=bench ...
+    curl 'http://127.0.0.1:8026/last?to=user@example.org'
+"""
+import json
+import asyncio
+import argparse
+from email import message_from_bytes
+from email.utils import parseaddr
+from urllib.parse import urlsplit, parse_qs
+
+
+def plain_text(raw):
+    """The first text/plain part of a message, decoded (Flask-Mail sends base64 multipart)."""
+    message = message_from_bytes(raw)
+    for part in message.walk():
+        if part.get_content_type() == "text/plain":
+            payload = part.get_payload(decode=True) or b""
+            return payload.decode(part.get_content_charset() or "utf-8", "replace")
+    return ""
+
+
+class FakeSMTP:
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.inbox = {}
+        self.messages = 0
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        reply = lambda line: writer.write(line.encode() + b"\r\n")
+        reply("220 fake-smtp ready")
+        recipients = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb = line.decode("latin-1").strip().split(" ", 1)
+                command, argument = verb[0].upper(), (verb[1] if len(verb) > 1 else "")
+                if command == "EHLO":
+                    writer.write(b"250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                elif command == "HELO":
+                    reply("250 fake-smtp")
+                elif command == "AUTH":
+                    # Prompt for whatever the client did not send as an initial response; any answer is accepted
+                    mechanism, _, initial = argument.partition(" ")
+                    prompts = ["334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"] if mechanism.upper() == "LOGIN" else ["334 "]
+                    for prompt in prompts[1 if initial else 0:]:
+                        reply(prompt)
+                        await writer.drain()
+                        await reader.readline()
+                    reply("235 2.7.0 Authentication successful")
+                elif command == "MAIL":
+                    recipients = []
+                    reply("250 OK")
+                elif command == "RCPT":
+                    recipients.append(parseaddr(argument.split(":", 1)[-1])[1].lower())
+                    reply("250 OK")
+                elif command == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    lines = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk in (b".\r\n", b".\n"):
+                            break
+                        lines.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    body = plain_text(b"".join(lines))
+                    for rcpt in recipients:
+                        self.inbox[rcpt] = body
+                    self.messages += 1
+                    reply("250 OK queued")
+                elif command in ("RSET", "NOOP"):
+                    recipients = [] if command == "RSET" else recipients
+                    reply("250 OK")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_http(self, reader, writer):
+        # One request per connection is enough for the load test's inbox lookups
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            url = urlsplit(request_line[1] if len(request_line) > 1 else "/")
+            if url.path == "/last":
+                to = parse_qs(url.query).get("to", [""])[0].lower()
+                # Reading takes the message, so a later login never sees an old passcode
+                body = self.inbox.pop(to, None)
+                status, payload = (200, {"to": to, "body": body}) if body is not None else (404, {"to": to})
+            elif url.path == "/stats":
+                status, payload = 200, {"messages": self.messages, "connections": self.connections,
+                                        "recipients": len(self.inbox)}
+            else:
+                status, payload = 404, {}
+            data = json.dumps(payload).encode()
+            writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n"
+                         b"Connection: close\r\n\r\n%s" % (status, b"OK" if status == 200 else b"Not Found", len(data), data))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, http_port, fake):
+    smtp = await asyncio.start_server(fake.handle, host, port)
+    http = await asyncio.start_server(fake.handle_http, host, http_port)
+    async with smtp, http:
+        await asyncio.gather(smtp.serve_forever(), http.serve_forever())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--http-port", type=int, default=8026)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    fake = FakeSMTP(args.latency_ms)
+    print(f"fake SMTP on {args.host}:{args.port}, inbox on http://{args.host}:{args.http_port}/last?to=", flush=True)
+    try:
+        asyncio.run(serve(args.host, args.port, args.http_port, fake))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
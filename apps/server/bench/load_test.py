@@ -0,0 +1,396 @@
+"""
+End-to-end load test of the Flask API: OTP login, project save/load, genomic data
+save/fetch and AI explanation streaming, with per-operation throughput and p50/p95/p99.
+
+By default it starts everything locally: bench/fake_smtp.py (OTP mail, read back through its
+inbox endpoint), bench/fake_openai.py (the only AI provider) and `python app.py` against a
+throw-away SQLite database with rate limiting off. Point --url at a running server instead
+to measure a real deployment; it must then use the same fake SMTP inbox (--inbox).
+
+    python bench/load_test.py                                  # 20 users, 30 s
+    python bench/load_test.py --users 50 --duration 60 --sequence-kb 100
+    python bench/load_test.py --save load.json                 # record a baseline
+    python bench/load_test.py --baseline load.json --max-regression 20
+    python bench/load_test.py --server-cmd "gunicorn -k eventlet -w 1 -b 127.0.0.1:5710 app:create_app()"
+
+Each virtual user logs in, creates a project, then loops over a weighted mix of operations
+with keep-alive connections. Samples from the first --warmup seconds are discarded. Exits
+non-zero when an operation's p95 regresses by more than --max-regression percent.
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+import urllib.request
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit, quote
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import SERVER_DIR, summarize, run_metadata, save, load_baseline, delta, regressions, sample_results  # noqa: E402
+
+# Relative weight of each operation in a virtual user's loop
+MIX = {
+    "analysis.save": 3,
+    "analysis.history": 3,
+    "analysis.load": 4,
+    "genomic.save": 2,
+    "genomic.fetch": 4,
+    "ai.explain": 1,
+}
+
+
+class Client:
+    """One keep-alive connection with a cookie jar, like a browser tab."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self.conn = None
+
+    def _send(self, method, path, body):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {"Content-Type": "application/json"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        for header in response.headers.get_all("Set-Cookie") or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response
+
+    def request(self, method, path, payload=None, raw=None):
+        body = raw if raw is not None else (json.dumps(payload) if payload is not None else None)
+        try:
+            response = self._send(method, path, body)
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        return response.status, data
+
+    def stream(self, path, raw):
+        """POSTs and reads an SSE response to `event: done`.
+
+        Returns (status, seconds to first data, set of event types seen).
+        """
+        started = time.perf_counter()
+        first = None
+        events = set()
+        try:
+            response = self._send("POST", path, raw)
+            if response.status != 200:
+                response.read()
+                return response.status, None, events
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                if first is None and line.startswith(b"data:"):
+                    first = time.perf_counter() - started
+                if line.startswith(b"event:"):
+                    event = line[6:].strip().decode()
+                    events.add(event)
+                    if event == "done":
+                        break
+            # Drain the rest of the chunked body so the connection can be reused
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        return response.status, first, events
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Recorder:
+    def __init__(self, warmup_until):
+        self.warmup_until = warmup_until
+        self.samples = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def add(self, op, seconds, ok):
+        if time.perf_counter() < self.warmup_until:
+            return
+        with self.lock:
+            if ok:
+                self.samples.setdefault(op, []).append(seconds)
+            else:
+                self.errors[op] = self.errors.get(op, 0) + 1
+                self.samples.setdefault(op, [])
+
+
+class VirtualUser:
+    def __init__(self, index, args, recorder, body_template, run_id):
+        self.args = args
+        self.client = Client(args.url, args.timeout)
+        self.recorder = recorder
+        self.template = body_template
+        self.email = f"load-{run_id}-{index}@example.org"
+        self.rng = random.Random(index)
+        self.counter = 0
+        self.project = None
+        self.analyses = []
+        self.genomic = []
+
+    def timed(self, op, method, path, payload=None, raw=None, expect=(200, 201)):
+        started = time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, payload, raw)
+            ok = status in expect
+        except (OSError, http.client.HTTPException):
+            status, data, ok = None, b"", False
+        self.recorder.add(op, time.perf_counter() - started, ok)
+        if not ok:
+            return None
+        try:
+            return json.loads(data or b"null")
+        except ValueError:
+            return None
+
+    def results_body(self, extra):
+        # A fresh nonce per request so neither the server nor the AI result cache can short-cut it
+        self.counter += 1
+        results = '{"nonce": "%s:%d", ' % (self.email, self.counter) + self.template[1:]
+        return json.dumps(extra)[:-1] + ', "results": ' + results + "}"
+
+    def login(self):
+        self.client.cookies.clear()
+        if self.timed("auth.otp_send", "POST", "/api/auth/otp/send", {"email": self.email}) is None:
+            return False
+        code = None
+        for _ in range(50):
+            try:
+                with urllib.request.urlopen(f"{self.args.inbox}/last?to={quote(self.email)}", timeout=5) as r:
+                    body = json.load(r)["body"]
+                code = next(w.strip(".,") for w in body.split() if w.strip(".,").isdigit() and len(w.strip(".,")) == 6)
+                break
+            except (OSError, ValueError, KeyError, StopIteration):
+                time.sleep(0.05)
+        if code is None:
+            self.recorder.add("auth.otp_verify", 0, False)
+            return False
+        return self.timed("auth.otp_verify", "POST", "/api/auth/otp/verify",
+                          {"email": self.email, "code": code}) is not None
+
+    def run(self, deadline):
+        if not self.login():
+            return
+        created = self.timed("project.create", "POST", "/api/projects", {"name": f"load {self.email}"})
+        if not created:
+            return
+        self.project = created["id"]
+        ops, weights = zip(*MIX.items())
+        iteration = 0
+        while time.perf_counter() < deadline:
+            iteration += 1
+            if self.args.login_every and iteration % self.args.login_every == 0:
+                self.login()
+            getattr(self, self.rng.choices(ops, weights)[0].replace(".", "_"))()
+            if self.args.think_ms:
+                time.sleep(self.rng.expovariate(1000 / self.args.think_ms))
+        self.client.close()
+
+    def analysis_save(self):
+        saved = self.timed("analysis.save", "POST", f"/api/projects/{self.project}/analysis",
+                           raw=self.results_body({"sequence": "ACGT" * 256}))
+        if saved is not None:
+            self.analyses = []    # refreshed by the next history call
+
+    def analysis_history(self):
+        history = self.timed("analysis.history", "GET", f"/api/projects/{self.project}/analysis")
+        if history:
+            self.analyses = [a["id"] for a in history]
+
+    def analysis_load(self):
+        if not self.analyses:
+            return self.analysis_history()
+        self.timed("analysis.load", "GET", f"/api/analysis/{self.rng.choice(self.analyses)}")
+
+    def genomic_save(self):
+        saved = self.timed("genomic.save", "POST", "/api/genomic-data", {
+            "title": f"load {self.counter}", "data_type": "analysis_results",
+            "payload": self.template})
+        if saved is not None:
+            self.genomic.append(saved["id"])
+
+    def genomic_fetch(self):
+        if not self.genomic:
+            return self.genomic_save()
+        self.timed("genomic.fetch", "GET", f"/api/genomic-data/{self.rng.choice(self.genomic[-20:])}")
+
+    def ai_explain(self):
+        started = time.perf_counter()
+        try:
+            status, first, events = self.client.stream("/api/ai/explain", self.results_body({"mode": "researcher"}))
+            # A failed generation still streams (an error event, or no model announced) with a 200
+            ok = status == 200 and first is not None and "model" in events and "error" not in events
+        except (OSError, http.client.HTTPException):
+            ok, first = False, None
+        self.recorder.add("ai.explain", time.perf_counter() - started, ok)
+        if ok:
+            self.recorder.add("ai.first_event", first, True)
+
+
+def wait_for(url, timeout, process=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up in {timeout:.0f}s")
+
+
+def spawn_stack(args):
+    """Fake SMTP, fake OpenAI and the app on a temporary database; returns the processes."""
+    bench = os.path.join(SERVER_DIR, "bench")
+    procs = [
+        subprocess.Popen([sys.executable, os.path.join(bench, "fake_smtp.py"), "--port", str(args.smtp_port),
+                          "--http-port", str(args.smtp_port + 1), "--latency-ms", str(args.smtp_latency_ms)],
+                         stdout=subprocess.DEVNULL),
+        subprocess.Popen([sys.executable, os.path.join(bench, "fake_openai.py"), "--port", str(args.ai_port),
+                          "--handshake-ms", "0", "--first-token-ms", str(args.ai_first_token_ms)],
+                         stdout=subprocess.DEVNULL),
+    ]
+    workdir = tempfile.mkdtemp(prefix="geneforge-load-")
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(args.port),
+        "FLASK_DEBUG": "False",
+        "NODE_ENV": "production",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "RATELIMIT_ENABLED": "False",
+        "EMAIL_HOST": "127.0.0.1",
+        "EMAIL_PORT": str(args.smtp_port),
+        "EMAIL_USE_TLS": "False",
+        "EMAIL_USERNAME": "bench",
+        "EMAIL_PASSWORD": "bench",
+        # Empty rather than unset, so a local .env cannot bring the real providers back
+        "AI_GATEWAY_API_KEY": "",
+        "GEMINI_API_KEY": "",
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.ai_port}/v1",
+        "RESULT_CACHE_DIR": os.path.join(workdir, "cache"),
+        "LOG_LEVEL": "WARNING",
+        "LOG_ERROR_FILE": os.path.join(workdir, "errors.log"),
+        "AUTO_MIGRATE": "True",
+    })
+    command = shlex.split(args.server_cmd) if args.server_cmd else [sys.executable, "app.py"]
+    procs.append(subprocess.Popen(command, cwd=SERVER_DIR, env=env,
+                                  stdout=subprocess.DEVNULL if args.quiet else None))
+    wait_for(f"{args.inbox}/stats", 15, procs[0])
+    wait_for(f"{args.url}/api/health", 60, procs[-1])
+    return procs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="test a running server instead of spawning one")
+    parser.add_argument("--inbox", help="fake SMTP inbox URL (default: the spawned one)")
+    parser.add_argument("--server-cmd", help="command that starts the app (run from apps/server)")
+    parser.add_argument("--port", type=int, default=5710)
+    parser.add_argument("--smtp-port", type=int, default=8025, help="SMTP port; the inbox uses the next one")
+    parser.add_argument("--smtp-latency-ms", type=float, default=20)
+    parser.add_argument("--ai-port", type=int, default=8099)
+    parser.add_argument("--ai-first-token-ms", type=float, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's requests")
+    parser.add_argument("--login-every", type=int, default=25, help="log in again every N operations (0: once)")
+    parser.add_argument("--sequence-kb", type=int, default=20, help="size of the analysed sequence in results")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--quiet", action="store_true", help="hide the spawned server's output")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a saved JSON run")
+    parser.add_argument("--max-regression", type=float, help="fail if an operation's p95 is this many percent slower")
+    args = parser.parse_args()
+
+    procs = []
+    if not args.url:
+        args.url = f"http://127.0.0.1:{args.port}"
+        args.inbox = args.inbox or f"http://127.0.0.1:{args.smtp_port + 1}"
+        procs = spawn_stack(args)
+    elif not args.inbox:
+        parser.error("--url needs --inbox (a fake_smtp.py inbox the server sends its mail to)")
+
+    length = args.sequence_kb * 1000
+    template = json.dumps(sample_results(length=length, guides=max(length // 50, 10), orfs=max(length // 125, 5)))
+    run_id = f"{int(time.time())}"
+    print(f"{args.users} users for {args.duration:.0f}s (+{args.warmup:.0f}s warm-up) against {args.url}, "
+          f"results {len(template) / 1024:.0f} KB")
+    baseline, base_meta = load_baseline(args.baseline)
+    if base_meta:
+        print(f"baseline: {base_meta.get('commit')} at {base_meta.get('timestamp')}")
+
+    try:
+        started = time.perf_counter()
+        recorder = Recorder(started + args.warmup)
+        deadline = started + args.warmup + args.duration
+        users = [VirtualUser(i, args, recorder, template, run_id) for i in range(args.users)]
+        with ThreadPoolExecutor(args.users) as pool:
+            for future in [pool.submit(user.run, deadline) for user in users]:
+                future.result()
+        elapsed = max(time.perf_counter() - recorder.warmup_until, 1e-9)
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+        for proc in procs:
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    results = {}
+    print(f"\n{'operation':<18} {'count':>7} {'errors':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for op in sorted(recorder.samples):
+        summary = summarize(recorder.samples[op])
+        summary.update(errors=recorder.errors.get(op, 0), rps=round(summary["count"] / elapsed, 2))
+        results[op] = summary
+        if not summary["count"]:
+            print(f"{op:<18} {0:>7} {summary['errors']:>7}")
+            continue
+        print(f"{op:<18} {summary['count']:>7} {summary['errors']:>7} {summary['rps']:>8.1f} {summary['p50']:>9.1f} "
+              f"{summary['p95']:>9.1f} {summary['p99']:>9.1f} {summary['max']:>9.1f}"
+              f"{delta(summary['p95'], baseline.get(op, {}).get('p95'))}")
+    requests = sum(r["count"] for op, r in results.items() if op != "ai.first_event")
+    errors = sum(r["errors"] for r in results.values())
+    print(f"\ntotal {requests} requests, {errors} errors, {requests / elapsed:.1f} req/s over {elapsed:.1f}s")
+
+    if args.save:
+        save(args.save, results, run_metadata(users=args.users, duration=args.duration, url=args.url,
+                                              sequence_kb=args.sequence_kb, think_ms=args.think_ms,
+                                              server_cmd=args.server_cmd, total_rps=round(requests / elapsed, 2),
+                                              errors=errors))
+    if args.baseline and args.max_regression is not None:
+        worse = regressions(results, baseline, "p95", args.max_regression)
+        if worse:
+            print("\nregressions: " + ", ".join(worse))
+            return 1
+    return 1 if requests == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
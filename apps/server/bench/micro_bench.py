@@ -0,0 +1,138 @@
+"""
+Microbenchmarks for the server's per-request CPU work.
+
+Covers per-user key derivation, AES-GCM encrypt_data/decrypt_data at several payload sizes,
+prompt construction for the AI engine, serialization of large analysis results (plain
+JSON and the columnar result_codec used for storage), and dot plot grids/tiles over a
+genome-sized (12 Mb) coordinate range.
+
+    python bench/micro_bench.py                              # all cases
+    python bench/micro_bench.py --filter crypto --repeat 30
+    python bench/micro_bench.py --save micro.json            # record a baseline
+    python bench/micro_bench.py --baseline micro.json --max-regression 15
+
+Each case runs `repeat` batches of at least --min-time seconds; the reported per-call times
+are the median / p95 / best over batches. Exits non-zero when a case's median regresses by
+more than --max-regression percent against --baseline.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import percentile, run_metadata, save, load_baseline, delta, regressions, sample_results  # noqa: E402
+
+SIZES = {"1KB": 1024, "64KB": 64 * 1024, "1MB": 1024 * 1024}
+EMAIL = "bench@example.org"
+SALT = b"\x01" * 16
+
+
+def cases():
+    from encryption_utils import get_user_key, encrypt_data, decrypt_data, encrypt_bytes, decrypt_bytes
+    from result_codec import encode_results, decode_results
+    from ai_engine import AIBioEngine
+    from dotplot_engine import DotPlot
+
+    results = sample_results()
+    engine = AIBioEngine()
+    yield "crypto.get_user_key", lambda: get_user_key(EMAIL, SALT)
+    for label, size in SIZES.items():
+        text = ("ACGT" * (size // 4 + 1))[:size]
+        token = encrypt_data(text, EMAIL, SALT)
+        yield f"crypto.encrypt_data.{label}", lambda text=text: encrypt_data(text, EMAIL, SALT)
+        yield f"crypto.decrypt_data.{label}", lambda token=token: decrypt_data(token, EMAIL, SALT)
+    blob = os.urandom(SIZES["1MB"])
+    sealed = encrypt_bytes(blob, EMAIL, SALT)
+    yield "crypto.encrypt_bytes.1MB", lambda: encrypt_bytes(blob, EMAIL, SALT)
+    yield "crypto.decrypt_bytes.1MB", lambda: decrypt_bytes(sealed, EMAIL, SALT)
+
+    yield "ai.build_prompt.researcher", lambda: engine._build_prompt(results, "researcher")
+    yield "ai.build_prompt.student", lambda: engine._build_prompt(results, "student")
+
+    dumped = json.dumps(results)
+    encoded = encode_results(results)
+    yield "json.dumps.results", lambda: json.dumps(results)
+    yield "json.loads.results", lambda: json.loads(dumped)
+    yield "codec.encode_results", lambda: encode_results(results)
+    yield "codec.decode_results", lambda: decode_results(encoded)
+    yield "store.encrypt_encoded_results", lambda: encrypt_data(encode_results(results), EMAIL, SALT)
+
+    # Stored match coordinates are int32; binning them must not overflow at genome scale
+    rng = np.random.default_rng(7)
+    length = 12_000_000
+    xs = np.sort(rng.integers(0, length, 200_000)).astype(np.int32)
+    ys = rng.integers(0, length, len(xs)).astype(np.int32)
+    strand = rng.integers(0, 2, len(xs)).astype(np.uint8)
+    plot = DotPlot(xs, ys, strand, {"length_x": length, "length_y": length})
+    yield "dotplot.grid.1024", lambda: plot.grid(1024)
+    yield "dotplot.tile.z0", lambda: plot.tile(0, 0, 0)
+
+
+def measure(fn, repeat, min_time):
+    # Calibrate the batch size so one batch takes at least min_time
+    number = 1
+    while True:
+        begin = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - begin
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    per_call = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - begin) / number)
+    per_call.sort()
+    us = lambda s: round(s * 1e6, 3)
+    return {
+        "calls_per_batch": number,
+        "median_us": us(percentile(per_call, 50)),
+        "p95_us": us(percentile(per_call, 95)),
+        "best_us": us(per_call[0]),
+        "ops_per_sec": round(1 / percentile(per_call, 50), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", action="append", help="only cases containing this text (repeatable)")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per batch")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a saved JSON run")
+    parser.add_argument("--max-regression", type=float, help="fail if a median is this many percent slower")
+    args = parser.parse_args()
+
+    baseline, base_meta = load_baseline(args.baseline)
+    if base_meta:
+        print(f"baseline: {base_meta.get('commit')} at {base_meta.get('timestamp')}")
+    results = {}
+    print(f"{'case':<34} {'median':>12} {'p95':>12} {'best':>12} {'ops/s':>12}")
+    for name, fn in cases():
+        if args.filter and not any(f in name for f in args.filter):
+            continue
+        r = results[name] = measure(fn, args.repeat, args.min_time)
+        before = baseline.get(name, {})
+        print(f"{name:<34} {r['median_us']:>10.1f}us {r['p95_us']:>10.1f}us {r['best_us']:>10.1f}us "
+              f"{r['ops_per_sec']:>12.1f}{delta(r['median_us'], before.get('median_us'))}")
+
+    if args.save:
+        save(args.save, results, run_metadata(repeat=args.repeat, min_time=args.min_time))
+    if args.baseline and args.max_regression is not None:
+        worse = regressions(results, baseline, "median_us", args.max_regression)
+        if worse:
+            print("\nregressions: " + ", ".join(worse))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
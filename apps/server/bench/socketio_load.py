@@ -0,0 +1,220 @@
+"""
+Socket.IO room fan-out load test.
+
+Simulates many chat clients spread across rooms and across one or more server
+processes, then reports delivery ratio and end-to-end latency percentiles.
+
+    # Against running servers
+    python bench/socketio_load.py --url http://127.0.0.1:5000 --url http://127.0.0.1:5001
+
+    # Self-contained: fake Redis + N app processes sharing the message queue
+    python bench/socketio_load.py --spawn 2 --clients 2000 --rooms 100
+
+Requires: python-socketio[asyncio_client] (aiohttp).
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+import socketio
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(pct / 100.0 * (len(values) - 1)))))
+    return values[k]
+
+
+def wait_for_port(port, timeout=30.0):
+    import socket
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def spawn_cluster(n_workers, base_port, redis_port):
+    """Starts the fake Redis broker and n single-worker app processes that share it."""
+    procs = [subprocess.Popen(
+        [sys.executable, os.path.join(SERVER_DIR, "bench", "fake_redis.py"), "--port", str(redis_port)],
+        stdout=subprocess.DEVNULL
+    )]
+    if not wait_for_port(redis_port):
+        raise RuntimeError("Fake Redis did not start")
+
+    workdir = tempfile.mkdtemp(prefix="geneforge-load-")
+    env = dict(os.environ)
+    env.update({
+        "SOCKETIO_MESSAGE_QUEUE": f"redis://127.0.0.1:{redis_port}/0",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "NODE_ENV": "development",
+    })
+    urls = []
+    for i in range(n_workers):
+        port = base_port + i
+        # Same eventlet server socketio.run uses in app.py, one process per simulated node
+        procs.append(subprocess.Popen(
+            [sys.executable, "-c",
+             f"import app; app.socketio.run(app.app, host='127.0.0.1', port={port}, debug=False)"],
+            cwd=SERVER_DIR, env=env
+        ))
+        if not wait_for_port(port):
+            raise RuntimeError(f"App worker on port {port} did not start")
+        urls.append(f"http://127.0.0.1:{port}")
+    return urls, procs
+
+
+class LoadClient:
+    def __init__(self, index, url, room, stats):
+        self.index = index
+        self.url = url
+        self.room = room
+        self.stats = stats
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("message", self.on_message)
+
+    async def on_message(self, data):
+        context = data.get("context") or {}
+        sent = context.get("sent")
+        if sent is not None:
+            self.stats["latencies"].append((time.time() - sent) * 1000.0)
+            self.stats["received"] += 1
+
+    async def connect(self):
+        await self.sio.connect(self.url, transports=["websocket"])
+        await self.sio.emit("join", {"room": self.room, "user": f"load-{self.index}"})
+
+    async def send(self, n, interval):
+        for seq in range(n):
+            await self.sio.emit("message", {
+                "room": self.room,
+                "sender": f"load-{self.index}",
+                "encrypted_payload": "x" * 64,
+                "context": {"sent": time.time(), "seq": seq}
+            })
+            self.stats["sent"] += 1
+            await asyncio.sleep(interval * random.uniform(0.5, 1.5))
+
+    async def close(self):
+        await self.sio.disconnect()
+
+
+async def run(args, urls):
+    stats = {"sent": 0, "received": 0, "latencies": [], "connect_errors": 0}
+    clients = []
+    for i in range(args.clients):
+        room = f"load-room-{i % args.rooms}"
+        clients.append(LoadClient(i, urls[i % len(urls)], room, stats))
+
+    t0 = time.time()
+    sem = asyncio.Semaphore(args.connect_concurrency)
+
+    async def connect(c):
+        async with sem:
+            try:
+                await c.connect()
+                return c
+            except Exception:
+                stats["connect_errors"] += 1
+                return None
+
+    connected = [c for c in await asyncio.gather(*(connect(c) for c in clients)) if c]
+    connect_time = time.time() - t0
+    # Let join events propagate through the queue before traffic starts
+    await asyncio.sleep(args.settle)
+
+    members = defaultdict(int)
+    for c in connected:
+        members[c.room] += 1
+    expected = sum(members[c.room] * args.messages for c in connected)
+
+    t1 = time.time()
+    await asyncio.gather(*(c.send(args.messages, args.interval) for c in connected))
+    send_time = time.time() - t1
+
+    # Wait for in-flight deliveries, up to --drain seconds
+    deadline = time.time() + args.drain
+    while stats["received"] < expected and time.time() < deadline:
+        await asyncio.sleep(0.1)
+    elapsed = time.time() - t1
+    await asyncio.gather(*(c.close() for c in connected), return_exceptions=True)
+
+    lat = stats["latencies"]
+    return {
+        "servers": urls,
+        "clients": args.clients,
+        "connected": len(connected),
+        "connect_errors": stats["connect_errors"],
+        "rooms": args.rooms,
+        "messages_sent": stats["sent"],
+        "deliveries_expected": expected,
+        "deliveries_received": stats["received"],
+        "delivery_ratio": round(stats["received"] / expected, 4) if expected else None,
+        "connect_seconds": round(connect_time, 2),
+        "send_seconds": round(send_time, 2),
+        "deliveries_per_sec": round(stats["received"] / max(elapsed, 1e-9), 1),
+        "latency_ms": {
+            "p50": percentile(lat, 50),
+            "p95": percentile(lat, 95),
+            "p99": percentile(lat, 99),
+            "max": max(lat) if lat else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO multi-room load test")
+    parser.add_argument("--url", action="append", help="Server URL (repeat for several nodes)")
+    parser.add_argument("--spawn", type=int, default=0, help="Spawn N app processes behind a fake Redis queue")
+    parser.add_argument("--base-port", type=int, default=5600)
+    parser.add_argument("--redis-port", type=int, default=6399)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=5, help="Messages per client")
+    parser.add_argument("--interval", type=float, default=0.2, help="Mean seconds between messages")
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--settle", type=float, default=2.0)
+    parser.add_argument("--drain", type=float, default=15.0, help="Max seconds to wait for deliveries")
+    parser.add_argument("--out", help="Write the JSON report here as well")
+    args = parser.parse_args()
+
+    procs = []
+    try:
+        if args.spawn:
+            urls, procs = spawn_cluster(args.spawn, args.base_port, args.redis_port)
+        else:
+            urls = args.url or ["http://127.0.0.1:5000"]
+        report = asyncio.run(run(args, urls))
+    finally:
+        for p in reversed(procs):
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
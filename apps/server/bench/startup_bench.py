@@ -0,0 +1,106 @@
+"""
+Cold-start benchmark: wall time and per-module import time of the server modules.
+
+Each run imports the target in a fresh interpreter with -X importtime and reports the
+median over runs, broken down by the modules the target imports directly.
+
+    python bench/startup_bench.py                         # app, 5 runs
+    python bench/startup_bench.py --module ai_engine --runs 10
+    python bench/startup_bench.py --save startup.json     # record a baseline
+    python bench/startup_bench.py --baseline startup.json --budget-ms 1500
+
+Exits non-zero when the median import of a target exceeds --budget-ms.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr, target):
+    """Returns (target cumulative us, {direct import: cumulative us}) from -X importtime output."""
+    total, children, pending = 0, {}, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        name = name.strip()
+        # Children are printed before their parent
+        if depth == 1:
+            pending[name] = int(cumulative)
+        elif depth == 0:
+            if name == target:
+                total, children = int(cumulative), pending
+            pending = {}
+    return total, children
+
+
+def measure(target, runs):
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    walls, totals, modules = [], [], defaultdict(list)
+    for _ in range(runs):
+        begin = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                              cwd=SERVER_DIR, env=env, capture_output=True, text=True)
+        walls.append(time.perf_counter() - begin)
+        if proc.returncode:
+            raise SystemExit(f"import {target} failed:\n{proc.stderr[-2000:]}")
+        total, children = parse_importtime(proc.stderr, target)
+        totals.append(total)
+        for name, us in children.items():
+            modules[name].append(us)
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "modules": {name: round(statistics.median(v) / 1000, 1) for name, v in modules.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", action="append", help="module to import (repeatable, default app)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a saved JSON run")
+    parser.add_argument("--budget-ms", type=float, help="fail if a target's median import exceeds this")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results, over = {}, []
+    for target in args.module or ["app"]:
+        # First run warms the bytecode cache so runs compare imports, not compilation
+        measure(target, 1)
+        result = results[target] = measure(target, args.runs)
+        before = baseline.get(target, {})
+        delta = lambda now, then: f" ({now - then:+.1f})" if then is not None else ""
+        print(f"\n{target}: import {result['import_ms']:.1f} ms{delta(result['import_ms'], before.get('import_ms'))}, "
+              f"process {result['wall_ms']:.1f} ms{delta(result['wall_ms'], before.get('wall_ms'))}")
+        ranked = sorted(result["modules"].items(), key=lambda kv: -kv[1])[:args.top]
+        for name, ms in ranked:
+            print(f"  {ms:8.1f} ms  {name}{delta(ms, before.get('modules', {}).get(name))}")
+        if args.budget_ms and result["import_ms"] > args.budget_ms:
+            over.append(target)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if over:
+        print(f"\nover the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
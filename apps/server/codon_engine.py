@@ -0,0 +1,234 @@
+import numpy as np
+
+from orf_engine import CODONS, GENETIC_CODES, UNKNOWN_CODON, encode, find_orfs
+
+# Codon usage per thousand codons (Kazusa codon usage database), NCBI TCAG order
+_USAGE_PER_THOUSAND = {
+    "ecoli": ("Escherichia coli K-12", [
+        22.1, 16.0, 14.3, 13.0, 10.4, 9.1, 8.9, 8.5, 17.5, 12.2, 2.0, 0.3, 5.2, 6.1, 1.0, 13.9,
+        11.9, 10.2, 4.2, 48.4, 7.5, 5.4, 8.6, 20.9, 12.5, 9.3, 14.6, 28.4, 20.0, 19.7, 3.8, 5.9,
+        29.8, 23.7, 6.8, 26.4, 10.3, 22.0, 9.3, 13.7, 20.6, 21.4, 35.3, 12.4, 9.9, 15.2, 3.6, 2.1,
+        19.8, 14.3, 11.6, 24.4, 18.9, 24.2, 23.0, 30.1, 32.7, 19.2, 39.1, 18.7, 21.3, 24.0, 9.2, 11.0,
+    ]),
+    "human": ("Homo sapiens", [
+        17.6, 20.3, 7.7, 12.9, 15.2, 17.7, 12.2, 4.4, 12.2, 15.3, 1.0, 0.8, 10.6, 12.6, 1.6, 13.2,
+        13.2, 19.6, 7.2, 39.6, 17.5, 19.8, 16.9, 6.9, 10.9, 15.1, 12.3, 34.2, 4.5, 10.4, 6.2, 11.4,
+        16.0, 20.8, 7.5, 22.0, 13.1, 18.9, 15.1, 6.1, 17.0, 19.1, 24.4, 31.9, 12.1, 19.5, 12.2, 12.0,
+        11.0, 14.5, 7.1, 28.1, 18.4, 27.7, 15.8, 7.4, 21.8, 25.1, 29.0, 39.6, 10.8, 22.2, 16.5, 16.5,
+    ]),
+    "yeast": ("Saccharomyces cerevisiae", [
+        26.1, 18.4, 26.2, 27.2, 23.5, 14.2, 18.7, 8.6, 18.8, 14.8, 1.1, 0.5, 8.1, 4.8, 0.7, 10.4,
+        12.3, 5.4, 13.4, 10.5, 13.5, 6.8, 18.3, 5.3, 13.6, 7.8, 27.3, 12.1, 6.4, 2.6, 3.0, 1.7,
+        30.1, 17.2, 17.8, 20.9, 20.3, 12.7, 17.8, 8.0, 35.7, 24.8, 41.9, 30.8, 14.2, 9.8, 21.3, 9.2,
+        22.1, 11.8, 11.8, 10.8, 21.2, 12.6, 16.2, 6.2, 37.6, 20.2, 45.6, 19.2, 23.9, 9.8, 10.9, 6.0,
+    ]),
+}
+
+# tRNA gene copy numbers by anticodon (GtRNAdb)
+_TRNA_GENE_COPIES = {
+    "ecoli": {
+        "GGC": 2, "TGC": 3, "ACG": 4, "CCG": 1, "CCT": 1, "TCT": 1, "GTT": 4, "GTC": 3,
+        "GCA": 1, "CTG": 2, "TTG": 2, "TTC": 4, "CCC": 1, "GCC": 4, "TCC": 1, "GTG": 1,
+        "GAT": 3, "CAA": 1, "CAG": 4, "GAG": 1, "TAA": 1, "TAG": 1, "TTT": 6, "CAT": 8,
+        "GAA": 2, "CGG": 1, "GGG": 1, "TGG": 1, "CGA": 1, "GCT": 1, "GGA": 2, "TGA": 1,
+        "CGT": 1, "GGT": 2, "TGT": 1, "CCA": 1, "GTA": 3, "GAC": 2, "TAC": 5,
+    },
+    "yeast": {
+        "AGC": 11, "TGC": 5, "ACG": 6, "CCG": 1, "CCT": 1, "TCT": 11, "GTT": 10, "GTC": 15,
+        "GCA": 4, "CTG": 1, "TTG": 9, "CTC": 2, "TTC": 14, "CCC": 2, "GCC": 16, "TCC": 3,
+        "GTG": 7, "AAT": 13, "TAT": 2, "CAA": 10, "GAG": 1, "TAA": 7, "TAG": 3, "CTT": 14,
+        "TTT": 7, "CAT": 10, "GAA": 10, "AGG": 2, "TGG": 10, "AGA": 11, "CGA": 1, "GCT": 4,
+        "TGA": 3, "AGT": 11, "CGT": 1, "TGT": 4, "CCA": 6, "GTA": 8, "AAC": 14, "CAC": 2,
+        "TAC": 2,
+    },
+}
+
+# dos Reis et al. (2004) wobble selective constraints: G:U, I:C, I:A, U:G
+_S_GU, _S_IC, _S_IA, _S_UG = 0.41, 0.28, 0.9999, 0.68
+
+# Single-codon families carry no synonymous choice and are left out of CAI / tAI
+_EXCLUDED_FROM_SCORING = ("ATG", "TGG")
+
+REFERENCES = {key: name for key, (name, _) in _USAGE_PER_THOUSAND.items()}
+
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+_GC_CODES = (1, 3)  # C and G in TCAG order
+
+
+def _reverse_complement(sequence):
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def _families(table):
+    """Synonymous family id and family size per codon index (65 entries); -1 for stops and unknown."""
+    aas = GENETIC_CODES[table].amino_acids[:UNKNOWN_CODON].tobytes().decode("ascii")
+    family = np.full(UNKNOWN_CODON + 1, -1, dtype=np.int64)
+    sizes = np.zeros(UNKNOWN_CODON + 1, dtype=np.int64)
+    members = {}
+    for i, aa in enumerate(aas):
+        if aa != "*":
+            members.setdefault(aa, []).append(i)
+    for fid, (aa, codons) in enumerate(sorted(members.items())):
+        family[codons] = fid
+        sizes[codons] = len(codons)
+    return aas, family, sizes
+
+
+def _family_max(values, family):
+    out = np.zeros(family.max() + 1)
+    valid = family >= 0
+    np.maximum.at(out, family[valid], values[valid])
+    return np.where(valid, out[np.maximum(family, 0)], 0.0)
+
+
+def _scoring_mask(table):
+    _, family, sizes = _families(table)
+    mask = (family >= 0) & (sizes > 1)
+    mask[[CODONS.index(c) for c in _EXCLUDED_FROM_SCORING]] = False
+    return mask
+
+
+def cai_weights(reference, table=1):
+    """Relative adaptiveness w = f / max(f in synonymous family) from a reference usage table."""
+    _, family, _ = _families(table)
+    freqs = np.append(np.asarray(_USAGE_PER_THOUSAND[reference][1], dtype=np.float64), 0.0)
+    w = freqs / np.maximum(_family_max(freqs, family), 1e-12)
+    w = np.where(w > 0, w, 0.01)
+    return np.where(_scoring_mask(table), w, np.nan)
+
+
+def tai_weights(reference, table=1):
+    """tRNA adaptation weights from gene copy numbers, or None when no tRNA set is bundled."""
+    copies = _TRNA_GENE_COPIES.get(reference)
+    if copies is None:
+        return None
+    # tRNA count indexed by the codon its anticodon pairs with in Watson-Crick fashion
+    t = np.zeros(64)
+    for anticodon, n in copies.items():
+        t[CODONS.index(_reverse_complement(anticodon))] += n
+
+    W = np.zeros(64)
+    for i in range(0, 64, 4):
+        # Third codon position within each block of four: T, C, A, G
+        W[i] = t[i] + (1 - _S_GU) * t[i + 1]
+        W[i + 1] = t[i + 1] + (1 - _S_IC) * t[i]
+        W[i + 2] = t[i + 2] + (1 - _S_IA) * t[i]
+        W[i + 3] = t[i + 3] + (1 - _S_UG) * t[i + 2]
+
+    mask = _scoring_mask(table)[:64]
+    w = W / W[mask].max()
+    nonzero = w[mask & (w > 0)]
+    # Codons without any decoding tRNA get the geometric mean of the others
+    w = np.where(w > 0, w, np.exp(np.log(nonzero).mean()))
+    return np.append(np.where(mask, w, np.nan), np.nan)
+
+
+def codon_counts(sequences):
+    """(genes x 65) codon count matrix for in-frame coding sequences using a single bincount."""
+    n = len(sequences)
+    lengths = np.fromiter((len(s) // 3 for s in sequences), dtype=np.int64, count=n)
+    if not lengths.sum():
+        return np.zeros((n, UNKNOWN_CODON + 1), dtype=np.int64)
+    joined = "".join(s[:3 * k] for s, k in zip(sequences, lengths.tolist()))
+    codes = encode(joined.upper()).reshape(-1, 3)
+    idx = (codes[:, 0].astype(np.int64) << 4) | (codes[:, 1] << 2) | codes[:, 2]
+    idx[(codes > 3).any(axis=1)] = UNKNOWN_CODON
+    gene = np.repeat(np.arange(n), lengths)
+    flat = np.bincount(gene * (UNKNOWN_CODON + 1) + idx, minlength=n * (UNKNOWN_CODON + 1))
+    return flat.reshape(n, UNKNOWN_CODON + 1)
+
+
+def _geometric_mean_score(counts, weights):
+    usable = ~np.isnan(weights)
+    log_w = np.where(usable, np.log(np.where(usable, weights, 1.0)), 0.0)
+    total = counts[:, usable].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.exp((counts @ log_w) / total)
+    return np.where(total > 0, score, np.nan)
+
+
+def _gc3(counts, table=1):
+    """GC fraction at third positions of sense codons."""
+    gc = np.isin(np.arange(64) & 3, _GC_CODES)
+    sense = _families(table)[1][:64] >= 0
+    total = counts[:, :64][:, sense].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, counts[:, :64][:, sense & gc].sum(axis=1) / total, np.nan)
+
+
+def usage_table(counts, table=1):
+    """Codon usage rows (count, per thousand, RSCU) for a summed count vector."""
+    aas, family, sizes = _families(table)
+    counts = counts[:64].astype(np.float64)
+    fam = family[:64]
+    fam_total = np.zeros(fam.max() + 1)
+    np.add.at(fam_total, fam[fam >= 0], counts[fam >= 0])
+    per_family = np.where(fam >= 0, fam_total[np.maximum(fam, 0)], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rscu = np.where(per_family > 0, counts * sizes[:64] / per_family, 0.0)
+    total = counts.sum()
+    return [{
+        "codon": CODONS[i],
+        "amino_acid": aas[i],
+        "count": int(counts[i]),
+        "per_thousand": round(1000.0 * counts[i] / total, 2) if total else 0.0,
+        "rscu": round(float(rscu[i]), 3),
+    } for i in range(64)]
+
+
+def _round(value, digits=4):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def analyze_codon_usage(genes, reference="ecoli", table=1, per_gene=True):
+    """
+    CAI, tAI and GC3 for each (id, coding sequence) pair plus the pooled usage table.
+    tAI is None for references without a bundled tRNA gene set.
+    """
+    if reference not in _USAGE_PER_THOUSAND:
+        raise ValueError(f"Unknown reference organism: {reference}")
+    if table not in GENETIC_CODES:
+        raise ValueError(f"Unsupported genetic code table: {table}")
+
+    ids = [g[0] for g in genes]
+    counts = codon_counts([g[1] for g in genes])
+    cai = _geometric_mean_score(counts, cai_weights(reference, table))
+    t_weights = tai_weights(reference, table)
+    tai = _geometric_mean_score(counts, t_weights) if t_weights is not None else np.full(len(genes), np.nan)
+    gc3 = _gc3(counts, table)
+
+    result = {
+        "reference": reference,
+        "reference_name": REFERENCES[reference],
+        "table": table,
+        "summary": {
+            "genes": len(genes),
+            "codons": int(counts[:, :64].sum()),
+            "mean_cai": _round(np.nanmean(cai)) if np.isfinite(cai).any() else None,
+            "mean_tai": _round(np.nanmean(tai)) if np.isfinite(tai).any() else None,
+            "mean_gc3": _round(np.nanmean(gc3)) if np.isfinite(gc3).any() else None,
+        },
+        "usage": usage_table(counts.sum(axis=0), table),
+    }
+    if per_gene:
+        result["genes"] = [{
+            "id": gid,
+            "codons": int(n),
+            "cai": _round(c),
+            "tai": _round(t),
+            "gc3": _round(g),
+        } for gid, n, c, t, g in zip(ids, counts[:, :64].sum(axis=1).tolist(), cai, tai, gc3)]
+    return result
+
+
+def genes_from_orfs(sequence, table=1, min_length=100):
+    """Coding sequences of the complete ORFs in a sequence, as (id, sequence) pairs."""
+    sequence = sequence.upper()
+    orfs = find_orfs(sequence, table=table, min_length=min_length, include_frames=False)["orfs"]
+    genes = []
+    for o in orfs:
+        nt = sequence[o["start"] - 1:o["end"]]
+        if o["strand"] == "-":
+            nt = _reverse_complement(nt)
+        genes.append((f"orf_{o['frame']}_{o['start']}_{o['end']}", nt))
+    return genes
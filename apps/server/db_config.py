@@ -0,0 +1,315 @@
+"""
+Engine settings and read-replica routing for the SQLAlchemy `db`.
+
+Postgres gets a bounded, pre-pinged, recycled QueuePool sized for green threads (many
+greenlets share a few connections and wait up to DB_POOL_TIMEOUT for one), or NullPool
+behind pgbouncer. SQLite gets WAL and pragmas suited to one node with concurrent readers.
+
+Views wrapped in @read_replica send their ORM reads to a DATABASE_REPLICA_URLS replica.
+The primary is used instead when no replica is within DB_REPLICA_MAX_LAG_SECONDS, once the
+request has written anything, and for DB_REPLICA_STICKY_SECONDS after a client's last
+write (a cookie), so users read their own writes. Lag is measured by a background loop
+(ReplicaRouter.watch), never inside a request.
+
+    DATABASE_REPLICA_URLS=postgresql://ro@replica-1/geneforge,postgresql://ro@replica-2/geneforge
+"""
+import os
+import time
+import logging
+import sqlite3
+import threading
+import contextvars
+from functools import wraps
+from flask import g, request, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool
+from metrics import db_routed_requests
+
+log = logging.getLogger(__name__)
+
+STICKY_COOKIE = 'db_primary_until'
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+_LAG_SQL = {
+    'postgresql': "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                  "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END",
+}
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, default) == 'True'
+
+
+def normalize_url(url):
+    # Fix for Render's Postgres URL format (postgres:// -> postgresql://)
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URL, from the DB_* environment settings."""
+    env = os.environ.get
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        # Pragmas are applied per connection by _sqlite_pragmas; the driver's own lock wait matches busy_timeout
+        return {"connect_args": {"timeout": int(env('DB_SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000}}
+
+    options = {"pool_pre_ping": _env_bool('DB_POOL_PRE_PING', 'True')}
+    if env('DB_POOL', 'queue') == 'null':
+        # An external pooler (pgbouncer) owns the connections; open one per checkout
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=int(env('DB_POOL_SIZE', 10)),
+            max_overflow=int(env('DB_MAX_OVERFLOW', 10)),
+            # Greenlets queue for a connection instead of opening more than the database allows
+            pool_timeout=float(env('DB_POOL_TIMEOUT', 10)),
+            # Below typical load balancer / server idle cut-offs
+            pool_recycle=int(env('DB_POOL_RECYCLE', 1800)),
+            # Reuse the most recent connection so the idle ones can be recycled away
+            pool_use_lifo=True,
+        )
+    if backend == 'postgresql':
+        connect_args = {"connect_timeout": int(env('DB_CONNECT_TIMEOUT', 5)), "application_name": "geneforge"}
+        statement_timeout = int(env('DB_STATEMENT_TIMEOUT_MS', 0))
+        if statement_timeout:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+        options["connect_args"] = connect_args
+    return options
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        if _env_bool('DB_SQLITE_WAL', 'True'):
+            # Readers no longer block the writer (or each other); NORMAL is durable under WAL except on power loss
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+        cursor.execute(f"PRAGMA cache_size=-{int(os.environ.get('DB_SQLITE_CACHE_MB', 32)) * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+event.listen(Engine, "connect", _sqlite_pragmas)
+
+
+def patch_driver(url):
+    """psycopg2 blocks the whole eventlet hub on every query unless psycogreen makes it cooperative."""
+    if make_url(url).get_driver_name() != 'psycopg2':
+        return
+    try:
+        from eventlet import patcher
+        if not patcher.is_monkey_patched('socket'):
+            return
+    except ImportError:
+        return
+    try:
+        from psycogreen.eventlet import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        log.warning("psycogreen is not installed: Postgres queries will block the eventlet hub "
+                    "(pip install psycogreen, or use the psycopg 3 driver)")
+
+
+class Replica:
+    def __init__(self, url):
+        self.url = url
+        self.name = make_url(url).host or make_url(url).database or 'replica'
+        self.lag = None
+        self.error = None
+        self.checked_at = None
+        self._engine = None
+        self._checking = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = create_engine(self.url, **engine_options(self.url))
+        return self._engine
+
+    def check(self):
+        """Measures replication lag; an unreachable replica has lag None and is skipped."""
+        if not self._checking.acquire(blocking=False):
+            return
+        try:
+            sql = _LAG_SQL.get(self.engine.dialect.name, "SELECT 0")
+            with self.engine.connect() as conn:
+                self.lag = float(conn.execute(text(sql)).scalar() or 0)
+            self.error = None
+        except Exception as e:
+            if self.error is None:
+                log.warning("DB: replica %s unavailable: %s", self.name, e)
+            self.lag, self.error = None, str(e)
+        finally:
+            self.checked_at = time.monotonic()
+            self._checking.release()
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = []
+        self.max_lag = 5.0
+        self.check_seconds = 10.0
+        self.sticky_seconds = 10
+        self._next = 0
+        self._watching = False
+
+    def configure(self):
+        env = os.environ.get
+        self.replicas = [Replica(normalize_url(u.strip()))
+                         for u in env('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+        self.max_lag = float(env('DB_REPLICA_MAX_LAG_SECONDS', 5))
+        self.check_seconds = float(env('DB_REPLICA_CHECK_SECONDS', 10))
+        self.sticky_seconds = int(env('DB_REPLICA_STICKY_SECONDS', 10))
+        for replica in self.replicas:
+            patch_driver(replica.url)
+
+    def watch(self):
+        """
+        Worker-start loop (run it with task_runner.spawn): measures every replica's lag each
+        DB_REPLICA_CHECK_SECONDS, so pick() only reads the last result.
+        """
+        if self._watching or not self.replicas:
+            return
+        self._watching = True
+        while True:
+            for replica in list(self.replicas):
+                replica.check()
+            time.sleep(self.check_seconds)
+
+    def pick(self):
+        """A replica within the lag limit (round robin), or None for the primary."""
+        # A measurement several rounds old means the watch loop is not running; don't trust it
+        horizon = time.monotonic() - 3 * self.check_seconds
+        usable = [r for r in self.replicas if r.lag is not None and r.lag <= self.max_lag
+                  and r.checked_at is not None and r.checked_at >= horizon]
+        if not usable:
+            return None
+        self._next = (self._next + 1) % len(usable)
+        return usable[self._next]
+
+    def families(self, primary):
+        """Pool usage of the primary and each replica, and replica lag, for /metrics."""
+        engines = [("primary", primary)] + [(r.name, r._engine) for r in self.replicas if r._engine is not None]
+        # NullPool keeps no connections, so it has nothing to report
+        pools = [(name, engine.pool) for name, engine in engines if hasattr(engine.pool, "checkedout")]
+        return [
+            ("db_pool_connections_in_use", "gauge", "Connections checked out of the pool.",
+             [({"database": name}, pool.checkedout()) for name, pool in pools]),
+            ("db_pool_size", "gauge", "Configured pool size (overflow connections come on top).",
+             [({"database": name}, pool.size()) for name, pool in pools]),
+            ("db_replica_lag_seconds", "gauge", "Replication lag at the last check (-1: unreachable).",
+             [({"replica": r.name}, -1 if r.lag is None else r.lag) for r in self.replicas]),
+        ]
+
+    def snapshot(self):
+        return [{"name": r.name, "lag_seconds": r.lag, "error": r.error,
+                 "checked_seconds_ago": None if r.checked_at is None else round(time.monotonic() - r.checked_at, 1)}
+                for r in self.replicas]
+
+
+router = ReplicaRouter()
+
+
+class _Route:
+    """Where the current @read_replica view reads from; decided at its first query."""
+    __slots__ = ("decided", "engine", "wrote")
+
+    def __init__(self):
+        self.decided = False
+        self.engine = None
+        self.wrote = False
+
+
+_route = contextvars.ContextVar('db_route', default=None)
+
+
+def _decide(route):
+    route.decided = True
+    if not router.replicas:
+        return
+    try:
+        sticky = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        sticky = 0
+    if sticky > time.time():
+        db_routed_requests.inc("primary", "recent_write")
+        return
+    replica = router.pick()
+    if replica is None:
+        db_routed_requests.inc("primary", "replica_lag")
+        return
+    route.engine = replica.engine
+    db_routed_requests.inc("replica", "ok")
+
+
+def read_replica(view):
+    """Lets the view's ORM reads go to a replica; anything it writes still goes to the primary."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _route.set(_Route())
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _route.reset(token)
+    return wrapper
+
+
+def carry_route(iterable):
+    """Keeps the rows a @read_replica view streams after it returns on the database it chose."""
+    route = _route.get()
+    if route is None:
+        return iterable
+
+    def run():
+        _route.set(route)
+        try:
+            yield from iterable
+        finally:
+            # Not reset(): the stream may be closed from another context; a worker thread must not keep it
+            _route.set(None)
+    return run()
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        route = _route.get()
+        if bind is None and route is not None and not route.wrote and not self._flushing:
+            if not route.decided:
+                _decide(route)
+            if route.engine is not None:
+                return route.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    route = _route.get()
+    if route is not None:
+        # Later reads in this request must see the write
+        route.wrote = True
+    if has_request_context():
+        g.db_wrote = True
+
+
+def init_app(app):
+    """Sets the read-your-writes cookie after requests that wrote; no-op without replicas."""
+    if not router.replicas:
+        return
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if g.get('db_wrote'):
+            # Same cross-site policy as the auth cookies, so it reaches every request they do
+            response.set_cookie(STICKY_COOKIE, str(int(time.time()) + router.sticky_seconds),
+                                max_age=router.sticky_seconds, httponly=True, path='/api/',
+                                samesite=app.config.get('JWT_COOKIE_SAMESITE', 'Lax'),
+                                secure=app.config.get('JWT_COOKIE_SECURE', False))
+        return response
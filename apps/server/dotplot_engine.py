@@ -0,0 +1,291 @@
+import os
+import json
+import math
+import time
+import zlib
+import shutil
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Byte -> code lookup: A, C, G, T = 0..3, anything else = 4
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _CODES[ord(_b)] = _i
+    _CODES[ord(_b.lower())] = _i
+_COMPLEMENT = np.array([3, 2, 1, 0, 4], dtype=np.uint8)
+
+DEFAULT_K = 16
+MAX_K = 32
+DEFAULT_MAX_OCCURRENCES = 32
+TILE_SIZE = 256
+FORWARD, REVERSE = 0, 1
+
+
+def encode(sequence):
+    return _CODES[np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)]
+
+
+def kmer_hashes(codes, k):
+    """
+    2-bit packed k-mer at every position (exact for k <= 32), built by shifting the whole
+    array once per base, plus a mask of windows free of ambiguous bases.
+    """
+    m = len(codes) - k + 1
+    if m <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+    hashes = np.zeros(m, dtype=np.uint64)
+    for j in range(k):
+        hashes <<= np.uint64(2)
+        hashes |= (codes[j:j + m] & 3).astype(np.uint64)
+    bad = np.concatenate(([0], np.cumsum(codes > 3)))
+    return hashes, (bad[k:] - bad[:m]) == 0
+
+
+def _kmer_table(hashes, positions):
+    """Distinct k-mers (sorted) with their occurrence counts, and positions grouped by k-mer."""
+    order = np.argsort(hashes)
+    hashes = hashes[order]
+    first = np.flatnonzero(np.concatenate((hashes[:1] == hashes[:1], hashes[1:] != hashes[:-1])))
+    counts = np.diff(np.append(first, len(hashes)))
+    return hashes[first], counts, first, positions[order]
+
+
+def _hash_join(table_a, table_b, max_occurrences):
+    """
+    All (pos_a, pos_b) pairs with equal k-mers: a merge of the two sorted distinct-k-mer lists,
+    skipping k-mers that are too repetitive on either side.
+    """
+    keys_a, count_a, first_a, pos_a = table_a
+    keys_b, count_b, first_b, pos_b = table_b
+    if not len(keys_a) or not len(keys_b):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    j = np.minimum(np.searchsorted(keys_b, keys_a), len(keys_b) - 1)
+    hit = (keys_b[j] == keys_a) & (count_a <= max_occurrences)
+    i = np.flatnonzero(hit)
+    j = j[i]
+    hit = count_b[j] <= max_occurrences
+    i, j = i[hit], j[hit]
+    ca, cb = count_a[i], count_b[j]
+    pairs = ca * cb
+    total = int(pairs.sum())
+    # Pair p of a k-mer is (a-occurrence p // cb, b-occurrence p % cb)
+    p = np.arange(total) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+    cb_rep = np.repeat(cb, pairs)
+    xs = pos_a[np.repeat(first_a[i], pairs) + p // cb_rep]
+    ys = pos_b[np.repeat(first_b[j], pairs) + p % cb_rep]
+    return xs, ys
+
+
+def find_matches(seq_x, seq_y, k=DEFAULT_K, max_occurrences=DEFAULT_MAX_OCCURRENCES):
+    """
+    Shared k-mers between two sequences on both strands. Returns x, y (0-based k-mer starts
+    on each forward strand) and strand, sorted by x.
+    """
+    cx, cy = encode(seq_x.upper()), encode(seq_y.upper())
+
+    def table(codes):
+        hashes, valid = kmer_hashes(codes, k)
+        positions = np.flatnonzero(valid)
+        return _kmer_table(hashes[positions], positions)
+
+    tx = table(cx)
+    fx, fy = _hash_join(tx, table(cy), max_occurrences)
+    # Reverse complement of y: a hit at rc position j starts at len(y) - j - k on the forward strand
+    rx, ry = _hash_join(tx, table(_COMPLEMENT[cy[::-1]]), max_occurrences)
+    ry = len(cy) - ry - k
+
+    xs = np.concatenate((fx, rx))
+    ys = np.concatenate((fy, ry))
+    strand = np.concatenate((np.full(len(fx), FORWARD, dtype=np.int8), np.full(len(rx), REVERSE, dtype=np.int8)))
+    order = np.argsort(xs, kind="stable")
+    return xs[order], ys[order], strand[order]
+
+
+def find_segments(xs, ys, strand, k, min_length=0, limit=None):
+    """Collapses consecutive k-mer hits on the same diagonal (or anti-diagonal) into segments."""
+    if not len(xs):
+        return []
+    diag = np.where(strand == FORWARD, ys - xs, ys + xs)
+    order = np.lexsort((xs, diag, strand))
+    x, y, d, s = xs[order], ys[order], diag[order], strand[order]
+    step = np.where(s[1:] == FORWARD, 1, -1)
+    continues = (s[1:] == s[:-1]) & (d[1:] == d[:-1]) & (x[1:] == x[:-1] + 1) & (y[1:] == y[:-1] + step)
+    starts = np.flatnonzero(np.concatenate(([True], ~continues)))
+    runs = np.diff(np.append(starts, len(x)))
+    lengths = runs + k - 1
+    keep = lengths >= min_length
+    starts, lengths = starts[keep], lengths[keep]
+    best = np.argsort(-lengths, kind="stable")
+    if limit:
+        best = best[:limit]
+    segments = []
+    for i in best.tolist():
+        first = starts[i]
+        forward = s[first] == FORWARD
+        segments.append({
+            "x": int(x[first]) + 1,
+            "y": int(y[first]) + 1 if forward else int(y[first]) + k,
+            "length": int(lengths[i]),
+            "strand": "+" if forward else "-",
+        })
+    return segments
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def encode_png(rgb):
+    """Minimal 8-bit RGB PNG encoder for an (h, w, 3) uint8 array."""
+    h, w, _ = rgb.shape
+    raw = np.zeros((h, w * 3 + 1), dtype=np.uint8)     # filter byte 0 per scanline
+    raw[:, 1:] = rgb.reshape(h, w * 3)
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+            + _png_chunk(b"IEND", b""))
+
+
+class DotPlot:
+    """Match coordinates for one sequence pair, sorted by x; arrays may be memory-mapped."""
+
+    def __init__(self, xs, ys, strand, meta):
+        self.xs, self.ys, self.strand = xs, ys, strand
+        self.meta = meta
+
+    @property
+    def extent(self):
+        return max(self.meta["length_x"], self.meta["length_y"], 1)
+
+    @property
+    def max_zoom(self):
+        return max(int(math.ceil(math.log2(self.extent / TILE_SIZE))), 0) if self.extent > TILE_SIZE else 0
+
+    def density(self, x0, x1, y0, y1, width, height):
+        """(2, height, width) hit counts per strand for the window [x0, x1) x [y0, y1)."""
+        lo, hi = np.searchsorted(self.xs, [x0, x1])
+        xs, ys, strand = self.xs[lo:hi], self.ys[lo:hi], self.strand[lo:hi]
+        inside = (ys >= y0) & (ys < y1)
+        xs, ys, strand = xs[inside], ys[inside], strand[inside]
+        # Coordinates are stored as int32; offset * cells overflows it past ~2 Mb
+        px = (xs.astype(np.int64) - x0) * width // max(x1 - x0, 1)
+        py = (ys.astype(np.int64) - y0) * height // max(y1 - y0, 1)
+        flat = np.bincount((strand.astype(np.int64) * height + py) * width + px, minlength=2 * height * width)
+        return flat.reshape(2, height, width)
+
+    def grid(self, size):
+        """Whole-plot density grid, size cells on the longer axis."""
+        scale = self.extent / size
+        width = max(int(math.ceil(self.meta["length_x"] / scale)), 1)
+        height = max(int(math.ceil(self.meta["length_y"] / scale)), 1)
+        counts = self.density(0, int(width * scale), 0, int(height * scale), width, height)
+        return {"width": width, "height": height, "bases_per_cell": scale,
+                "forward": counts[0].tolist(), "reverse": counts[1].tolist()}
+
+    def tile(self, z, tx, ty):
+        """PNG bytes for tile (tx, ty) at zoom z; forward hits in blue, reverse in red, log-scaled."""
+        span = self.extent / (2 ** z)
+        x0, y0 = int(tx * span), int(ty * span)
+        x1, y1 = int((tx + 1) * span), int((ty + 1) * span)
+        counts = self.density(x0, x1, y0, y1, TILE_SIZE, TILE_SIZE).astype(np.float64)
+        peak = max(counts.max(), 1.0)
+        level = np.log1p(counts) / np.log1p(peak)
+        fwd, rev = level[0], level[1]
+        rgb = np.empty((TILE_SIZE, TILE_SIZE, 3), dtype=np.float64)
+        rgb[..., 0] = 255 * (1 - fwd)
+        rgb[..., 1] = 255 * (1 - np.maximum(fwd, rev))
+        rgb[..., 2] = 255 * (1 - rev)
+        # Off-plot area (beyond either sequence) is drawn light grey
+        xs = x0 + (np.arange(TILE_SIZE) * (x1 - x0)) // TILE_SIZE
+        ys = y0 + (np.arange(TILE_SIZE) * (y1 - y0)) // TILE_SIZE
+        outside = (ys[:, None] >= self.meta["length_y"]) | (xs[None, :] >= self.meta["length_x"])
+        rgb[outside] = 235
+        return encode_png(rgb.astype(np.uint8))
+
+
+def compute_dotplot(seq_x, seq_y, k=DEFAULT_K, max_occurrences=DEFAULT_MAX_OCCURRENCES,
+                    min_segment=50, segment_limit=500):
+    xs, ys, strand = find_matches(seq_x, seq_y, k, max_occurrences)
+    dtype = np.int32 if max(len(seq_x), len(seq_y)) < 2 ** 31 else np.int64
+    meta = {
+        "length_x": len(seq_x),
+        "length_y": len(seq_y),
+        "k": k,
+        "max_occurrences": max_occurrences,
+        "matches": int(len(xs)),
+        "segments": find_segments(xs, ys, strand, k, min_segment, segment_limit),
+    }
+    return DotPlot(xs.astype(dtype), ys.astype(dtype), strand, meta)
+
+
+class PlotStore:
+    """
+    Computed plots on disk (shared between workers, opened memory-mapped) with a small
+    in-process LRU of open plots. Oldest plots are removed past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes, open_limit=8):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.open_limit = open_limit
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, plot_id, name=""):
+        return os.path.join(self.directory, plot_id, name)
+
+    def exists(self, plot_id):
+        return os.path.exists(self._path(plot_id, "meta.json"))
+
+    def save(self, plot_id, plot, owner_id):
+        tmp = self._path(plot_id + ".tmp")
+        os.makedirs(tmp, exist_ok=True)
+        np.save(os.path.join(tmp, "xs.npy"), plot.xs)
+        np.save(os.path.join(tmp, "ys.npy"), plot.ys)
+        np.save(os.path.join(tmp, "strand.npy"), plot.strand)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(dict(plot.meta, owner_id=owner_id, created=time.time()), f)
+        if os.path.exists(self._path(plot_id)):
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            os.replace(tmp, self._path(plot_id))
+        self._evict()
+
+    def load(self, plot_id):
+        with self._lock:
+            plot = self._open.get(plot_id)
+            if plot is not None:
+                self._open.move_to_end(plot_id)
+                return plot
+        if not self.exists(plot_id):
+            return None
+        with open(self._path(plot_id, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = [np.load(self._path(plot_id, name), mmap_mode="r") for name in ("xs.npy", "ys.npy", "strand.npy")]
+        plot = DotPlot(*arrays, meta)
+        with self._lock:
+            self._open[plot_id] = plot
+            while len(self._open) > self.open_limit:
+                self._open.popitem(last=False)
+        return plot
+
+    def _evict(self):
+        entries = []
+        for plot_id in os.listdir(self.directory):
+            path = self._path(plot_id)
+            if plot_id.endswith(".tmp") or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), plot_id, size))
+        total = sum(e[2] for e in entries)
+        for _, plot_id, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with self._lock:
+                self._open.pop(plot_id, None)
+            shutil.rmtree(self._path(plot_id), ignore_errors=True)
+            total -= size
@@ -1,8 +1,12 @@
 import os
 import base64
+import logging
 from Crypto.Cipher import AES
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Random import get_random_bytes
+from metrics import timed, crypto_seconds
+
+log = logging.getLogger(__name__)
 
 # Derive a user-specific key from the master key and user salt
 def get_user_key(user_email, user_salt):
@@ -11,6 +15,7 @@ def get_user_key(user_email, user_salt):
     key = PBKDF2(master_key + user_email, user_salt, dkLen=32, count=1000)
     return key
 
+@timed(crypto_seconds, 'encrypt')
 def encrypt_data(data, user_email, user_salt):
     if not data:
         return None
@@ -26,6 +31,7 @@ def encrypt_data(data, user_email, user_salt):
              base64.b64encode(ciphertext).decode('utf-8')
     return result
 
+@timed(crypto_seconds, 'decrypt')
 def decrypt_data(encrypted_str, user_email, user_salt):
     if not encrypted_str:
         return None
@@ -44,5 +50,20 @@ def decrypt_data(encrypted_str, user_email, user_salt):
         decrypted_data = cipher.decrypt_and_verify(ciphertext, tag)
         return decrypted_data.decode('utf-8')
     except Exception as e:
-        print(f"Decryption error: {e}")
+        log.warning("Decryption error: %s", e)
         return "[Error: Decryption failed]"
+
+# Binary variant for file artifacts: raw nonce (16) + tag (16) + ciphertext, no base64
+@timed(crypto_seconds, 'encrypt_bytes')
+def encrypt_bytes(data, user_email, user_salt):
+    key = get_user_key(user_email, user_salt)
+    cipher = AES.new(key, AES.MODE_GCM)
+    ciphertext, tag = cipher.encrypt_and_digest(data)
+    return cipher.nonce + tag + ciphertext
+
+@timed(crypto_seconds, 'decrypt_bytes')
+def decrypt_bytes(blob, user_email, user_salt):
+    # Raises ValueError if the blob was tampered with or belongs to another user
+    key = get_user_key(user_email, user_salt)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=blob[:16])
+    return cipher.decrypt_and_verify(blob[32:], blob[16:32])
@@ -0,0 +1,319 @@
+import os
+import gzip
+import bisect
+import shutil
+
+import numpy as np
+
+# Byte -> code lookup: A, C, G, T = 0..3, anything else (N) = 4
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _CODES[ord(_b)] = _i
+    _CODES[ord(_b.lower())] = _i
+_IS_GC = np.zeros(256, dtype=bool)
+_IS_GC[[ord("G"), ord("C"), ord("g"), ord("c")]] = True
+
+CHUNK_BYTES = 16 * 1024 * 1024     # records parsed per vectorized pass
+RANGES_PER_WORKER = 4              # file ranges per worker, for load balance
+QUAL_BINS = 94                     # ASCII '!'..'~'
+_QUAL_BIN = np.clip(np.arange(256) - 33, 0, QUAL_BINS - 1).astype(np.int32)
+DUP_PREFIX = 50                    # reads are compared on their first 50 bases, like FastQC
+HLL_BITS = 14                      # 16384 registers, ~0.8% standard error
+ADAPTERS = (
+    ("Illumina Universal Adapter", "AGATCGGAAGAG"),
+    ("Illumina Small RNA 3' Adapter", "TGGAATTCTCGG"),
+    ("Illumina Small RNA 5' Adapter", "GATCGTCGGACT"),
+    ("Nextera Transposase Sequence", "CTGTCTCTTATA"),
+    ("PolyA", "AAAAAAAAAAAA"),
+    ("PolyG", "GGGGGGGGGGGG"),
+)
+
+class FastqError(ValueError):
+    pass
+
+
+def decompress(path):
+    """Gzipped FASTQ is inflated next to the original so workers can seek; returns the plain path."""
+    with open(path, "rb") as f:
+        if f.read(2) != b"\x1f\x8b":
+            return path
+    plain = path + ".fastq"
+    with gzip.open(path, "rb") as src, open(plain, "wb") as dst:
+        shutil.copyfileobj(src, dst, 4 * 1024 * 1024)
+    return plain
+
+
+def _record_start(f, offset):
+    """Offset of the first record starting at or after offset ('@' header, '+' two lines on)."""
+    if offset == 0:
+        return 0
+    f.seek(offset - 1)
+    f.readline()                                 # finish the line offset falls in
+    while True:
+        pos = f.tell()
+        lines = [f.readline() for _ in range(4)]
+        if not lines[0]:
+            return pos
+        if lines[0][:1] == b"@" and lines[2][:1] == b"+":
+            return pos
+        f.seek(pos)
+        f.readline()
+
+
+def iter_chunks(path, start, end, chunk_bytes=CHUNK_BYTES):
+    """Blocks of complete records whose headers start in [start, end)."""
+    with open(path, "rb") as f:
+        size = os.path.getsize(path)
+        pos = _record_start(f, start)
+        stop = _record_start(f, end) if end < size else size
+        f.seek(pos)
+        leftover = b""
+        while pos < stop:
+            data = leftover + f.read(min(chunk_bytes, stop - pos))
+            pos = f.tell()
+            newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+            if pos >= stop:
+                # The range ends on a record boundary; a missing final newline is fine
+                yield data
+                return
+            complete = len(newlines) // 4 * 4
+            if not complete:
+                leftover = data
+                continue
+            cut = newlines[complete - 1] + 1
+            yield data[:cut]
+            leftover = data[cut:]
+
+
+def chunk_stats(block):
+    """Per-cycle and per-read statistics for a block of whole FASTQ records."""
+    if b"\r" in block:
+        block = block.replace(b"\r", b"")
+    lines = block.split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    if len(lines) % 4:
+        raise FastqError("Truncated FASTQ record")
+    if any(h[:1] != b"@" for h in lines[0::4]) or any(p[:1] != b"+" for p in lines[2::4]):
+        raise FastqError("Malformed FASTQ record")
+    seqs, quals = lines[1::4], lines[3::4]
+    n = len(seqs)
+    lengths = np.fromiter(map(len, seqs), dtype=np.int64, count=n)
+    if not np.array_equal(lengths, np.fromiter(map(len, quals), dtype=np.int64, count=n)):
+        raise FastqError("Sequence and quality lengths differ")
+
+    seq_bytes = b"".join(seqs).upper()
+    raw = np.frombuffer(seq_bytes, dtype=np.uint8)
+    qual = np.frombuffer(b"".join(quals), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    max_len = int(lengths.max()) if n else 0
+    cycle = np.arange(len(raw), dtype=np.int32) - np.repeat(starts.astype(np.int32), lengths)
+
+    # One pass over (cycle, quality, base); both per-cycle matrices are marginals of it
+    q = _QUAL_BIN[qual]
+    joint = np.bincount(cycle * (QUAL_BINS * 5) + q * 5 + _CODES[raw], minlength=max_len * QUAL_BINS * 5)
+    joint = joint.reshape(max_len, QUAL_BINS, 5)
+
+    nonempty = lengths > 0
+    read_q = np.zeros(n)
+    read_gc = np.zeros(n)
+    if len(raw):
+        idx = starts[nonempty]
+        read_q[nonempty] = np.add.reduceat(q, idx, dtype=np.int64) / lengths[nonempty]
+        read_gc[nonempty] = np.add.reduceat(_IS_GC[raw], idx, dtype=np.int64) * 100.0 / lengths[nonempty]
+    read_quality = np.bincount(read_q[nonempty].astype(np.int64), minlength=QUAL_BINS)[:QUAL_BINS]
+    gc_content = np.bincount(np.rint(read_gc[nonempty]).astype(np.int64), minlength=101)
+
+    return {
+        "reads": n,
+        "bases": int(len(raw)),
+        "qual_min": int(qual.min()) if len(qual) else 255,
+        "qual_max": int(qual.max()) if len(qual) else 0,
+        "quality": joint.sum(axis=2),
+        "composition": joint.sum(axis=1),
+        "lengths": np.bincount(lengths, minlength=1),
+        "read_quality": read_quality,
+        "gc_content": gc_content,
+        "hll": _hll_registers(raw, starts, lengths),
+        "adapters": _adapter_hits(seq_bytes, starts, lengths, max_len),
+    }
+
+
+def _mix64(z):
+    # splitmix64 finalizer; uint64 arithmetic wraps
+    z = z ^ (z >> np.uint64(30))
+    z = z * np.uint64(0xBF58476D1CE4E5B9)
+    z = z ^ (z >> np.uint64(27))
+    z = z * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _hll_registers(raw, starts, lengths):
+    """HyperLogLog registers over the first DUP_PREFIX bases (and length) of every read."""
+    prefix = np.minimum(lengths, DUP_PREFIX)
+    h = prefix.astype(np.uint64)
+    for j in range(DUP_PREFIX):
+        has = prefix > j
+        col = np.zeros(len(starts), dtype=np.uint64)
+        col[has] = raw[starts[has] + j]
+        h = h * np.uint64(1099511628211) + col
+    z = _mix64(h)
+    register = (z >> np.uint64(64 - HLL_BITS)).astype(np.int64)
+    rest = z & np.uint64((1 << (64 - HLL_BITS)) - 1)
+    # Leading zeros of the remaining bits, +1; frexp can round up near powers of two, so correct it
+    bit_length = np.frexp(rest.astype(np.float64))[1].astype(np.int64)
+    too_long = (bit_length > 0) & ((np.uint64(1) << np.maximum(bit_length - 1, 0).astype(np.uint64)) > rest)
+    bit_length -= too_long
+    rank = (64 - HLL_BITS) - bit_length + 1
+    registers = np.zeros(1 << HLL_BITS, dtype=np.uint8)
+    np.maximum.at(registers, register, rank.astype(np.uint8))
+    return registers
+
+
+def _adapter_hits(seq_bytes, starts, lengths, max_len):
+    """
+    Earliest cycle of each adapter motif per read, as an adapters x cycles histogram. Each
+    motif is a C-speed substring scan over the joined reads that skips to the next read after
+    a hit, so the Python loop runs at most once per read containing the motif.
+    """
+    hist = np.zeros((len(ADAPTERS), max(max_len, 1)), dtype=np.int64)
+    ends = (starts + lengths).tolist()
+    starts_list = starts.tolist()
+    for number, (_, motif) in enumerate(ADAPTERS):
+        motif = motif.encode("ascii")
+        pos = seq_bytes.find(motif)
+        while pos >= 0:
+            read = bisect.bisect_right(starts_list, pos) - 1
+            if pos + len(motif) <= ends[read]:
+                hist[number, pos - starts_list[read]] += 1
+                pos = seq_bytes.find(motif, ends[read])
+            else:
+                # Spans into the next read(s): resume inside the read the match ends in
+                pos = seq_bytes.find(motif, pos + 1)
+    return hist
+
+
+def _pad_add(a, b):
+    """Sum of two arrays padded to the larger shape along axis 0 (and 1 for 2-D)."""
+    shape = tuple(max(x, y) for x, y in zip(a.shape, b.shape))
+    out = np.zeros(shape, dtype=np.int64)
+    out[tuple(slice(0, s) for s in a.shape)] += a
+    out[tuple(slice(0, s) for s in b.shape)] += b
+    return out
+
+
+def merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    out = {
+        "reads": a["reads"] + b["reads"],
+        "bases": a["bases"] + b["bases"],
+        "qual_min": min(a["qual_min"], b["qual_min"]),
+        "qual_max": max(a["qual_max"], b["qual_max"]),
+        "hll": np.maximum(a["hll"], b["hll"]),
+    }
+    for name in ("quality", "composition", "lengths", "read_quality", "gc_content", "adapters"):
+        out[name] = _pad_add(a[name], b[name])
+    return out
+
+
+def scan_range(path, start, end):
+    """Worker entry point: merged statistics for the records starting in [start, end)."""
+    total = None
+    for block in iter_chunks(path, start, end):
+        total = merge(total, chunk_stats(block))
+    return total
+
+
+def _hll_estimate(registers):
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)          # linear counting for small cardinalities
+    return int(round(estimate))
+
+
+def _percentiles(hist, fractions):
+    """Per-row percentiles of histogram rows (cycles x quality bins)."""
+    cum = np.cumsum(hist, axis=1)
+    total = cum[:, -1:]
+    return {name: (np.argmax(cum >= np.maximum(total * f, 1), axis=1)).tolist() for name, f in fractions}
+
+
+def finalize(stats):
+    """Turns merged statistics into the QC report."""
+    if not stats or not stats["reads"]:
+        raise FastqError("No FASTQ records found")
+    # Phred+64 files never use characters below ';'
+    offset = 64 if stats["qual_min"] >= 59 and stats["qual_max"] > 74 else 33
+    shift = offset - 33
+    quality = stats["quality"][:, shift:]
+    per_cycle_reads = quality.sum(axis=1)
+    phred = np.arange(quality.shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_q = np.where(per_cycle_reads > 0, (quality * phred).sum(axis=1) / per_cycle_reads, 0.0)
+
+    comp = stats["composition"]
+    comp_pct = comp * 100.0 / np.maximum(comp.sum(axis=1, keepdims=True), 1)
+
+    reads = stats["reads"]
+    distinct = min(_hll_estimate(stats["hll"]), reads)
+    adapter_cum = np.cumsum(stats["adapters"], axis=1) * 100.0 / reads
+    lengths = stats["lengths"]
+    observed = np.flatnonzero(lengths)
+    read_quality = stats["read_quality"][shift:]
+    overall_q = float((quality * phred).sum() / max(quality.sum(), 1))
+
+    return {
+        "reads": reads,
+        "bases": stats["bases"],
+        "encoding": f"Phred+{offset}",
+        "mean_quality": round(overall_q, 2),
+        "gc_content": round(float(comp[:, [1, 2]].sum() * 100.0 / max(comp[:, :4].sum(), 1)), 2),
+        "length": {
+            "min": int(observed[0]),
+            "max": int(observed[-1]),
+            "mean": round(float((lengths * np.arange(len(lengths))).sum() / reads), 2),
+            "distribution": {str(int(l)): int(lengths[l]) for l in observed},
+        },
+        "per_cycle_quality": dict(
+            mean=np.round(mean_q, 2).tolist(),
+            **_percentiles(quality, (("p10", 0.1), ("q1", 0.25), ("median", 0.5), ("q3", 0.75), ("p90", 0.9)))
+        ),
+        # Reads per (cycle, Phred score); row i is cycle i + 1
+        "quality_matrix": quality[:, :int(np.flatnonzero(quality.sum(axis=0)).max()) + 1].tolist(),
+        "per_cycle_composition": {base: np.round(comp_pct[:, i], 2).tolist() for i, base in enumerate("ACGTN")},
+        "per_read_quality": {str(i): int(c) for i, c in enumerate(read_quality) if c},
+        "per_read_gc": stats["gc_content"].tolist(),
+        "duplication": {
+            "distinct_estimate": distinct,
+            "duplicate_percent": round((1 - distinct / reads) * 100, 2),
+            "method": f"HyperLogLog (2^{HLL_BITS} registers) over the first {DUP_PREFIX} bases",
+        },
+        "adapter_content": {name: np.round(adapter_cum[i], 3).tolist() for i, (name, _) in enumerate(ADAPTERS)},
+    }
+
+
+def file_ranges(path, workers):
+    size = os.path.getsize(path)
+    parts = max(workers * RANGES_PER_WORKER, 1)
+    step = max(-(-size // parts), CHUNK_BYTES)
+    return [(path, lo, min(lo + step, size)) for lo in range(0, size, step)]
+
+
+def qc_report(path, workers=None, mapper=None):
+    """
+    QC report for a plain FASTQ file. Byte ranges are scanned in parallel by mapper (a
+    process pool by default) and their statistics merged.
+    """
+    if mapper is None:
+        from task_runner import process_map as mapper
+    workers = workers or os.cpu_count() or 1
+    total = None
+    for partial in mapper(scan_range, file_ranges(path, workers), workers):
+        total = merge(total, partial)
+    return finalize(total)
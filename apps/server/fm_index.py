@@ -0,0 +1,378 @@
+import os
+import json
+
+import numpy as np
+
+# Symbols: $ (sentinel) < A < C < G < T < N. N also separates contigs and never matches a query base.
+ALPHABET = "$ACGTN"
+SENTINEL = 0
+SEPARATOR = 5
+BASE_SYMBOLS = np.arange(1, 5, dtype=np.uint8)
+
+_SYMBOLS = np.full(256, SEPARATOR, dtype=np.uint8)
+for _i, _b in enumerate("ACGT", start=1):
+    _SYMBOLS[ord(_b)] = _i
+    _SYMBOLS[ord(_b.lower())] = _i
+_COMPLEMENT = np.array([0, 4, 3, 2, 1, 5], dtype=np.uint8)
+
+OCC_INTERVAL = 64       # one rank checkpoint and one 64-bit occurrence mask per 64 BWT rows
+SA_SAMPLE_RATE = 32     # keep suffix array entries for text positions divisible by 32
+_PACK_SYMBOLS = 21      # 3 bits per symbol in a uint64 seeds the prefix doubling
+_FRONTIER_CHUNK = 500_000
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(values):
+        return _POP8[values.view(np.uint8).reshape(*values.shape, 8)].sum(axis=-1)
+
+
+INDEX_FILES = ("masks.npy", "occ.npy", "sa_rows.npy", "sa_values.npy", "meta.json")
+
+
+def encode(sequence):
+    if isinstance(sequence, str):
+        sequence = sequence.encode("ascii", errors="replace")
+    return _SYMBOLS[np.frombuffer(sequence, dtype=np.uint8)]
+
+
+def read_fasta(path):
+    """Yields (name, sequence bytes) for each record; bare sequence files become one record."""
+    name, parts = None, []
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(b">"):
+                if name is not None or parts:
+                    yield name or "sequence_1", b"".join(parts)
+                name = line[1:].split()[0].decode("utf-8", errors="replace") if len(line) > 1 else None
+                parts = []
+            else:
+                parts.append(line)
+    if name is not None or parts:
+        yield name or "sequence_1", b"".join(parts)
+
+
+def _dense_rank(sorted_keys):
+    """1-based ranks for already sorted keys (equal keys share a rank)."""
+    ranks = np.empty(len(sorted_keys), dtype=np.int64)
+    ranks[0] = 1
+    np.cumsum(sorted_keys[1:] != sorted_keys[:-1], out=ranks[1:])
+    ranks[1:] += 1
+    return ranks
+
+
+def suffix_array(text):
+    """
+    Suffix array by prefix doubling. Ranks are seeded with 21 packed symbols, so only
+    repeats longer than that cost extra sorting rounds. text must end with a unique sentinel.
+    """
+    n = len(text)
+    packed = np.zeros(n, dtype=np.uint64)
+    t = text.astype(np.uint64)
+    for j in range(_PACK_SYMBOLS):
+        packed <<= np.uint64(3)
+        if j < n:
+            packed[:n - j] |= t[j:]
+    order = np.argsort(packed, kind="stable")
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = _dense_rank(packed[order])
+    del packed, t
+
+    h = _PACK_SYMBOLS
+    while rank[order[-1]] < n:
+        second = np.zeros(n, dtype=np.int64)
+        if h < n:
+            second[:n - h] = rank[h:]
+        key = rank * (n + 1) + second
+        del second
+        order = np.argsort(key)
+        rank[order] = _dense_rank(key[order])
+        del key
+        h *= 2
+    return order
+
+
+class FMIndex:
+    """
+    FM-index over one or more contigs. The BWT is stored as one 64-bit occurrence mask per
+    base per 64 rows (half a byte per row) next to cumulative rank checkpoints, so Occ is a
+    checkpoint lookup plus a popcount. The suffix array is sampled by text position. All
+    arrays may be memory-mapped from disk.
+    """
+
+    def __init__(self, masks, occ, sa_rows, sa_values, C, contigs, length, sentinel_row):
+        self.masks = masks                         # (blocks, 4) uint64 for A, C, G, T
+        self.occ = occ                             # (blocks, 4) counts before each block
+        self.sa_rows = sa_rows
+        self.sa_values = sa_values
+        self.C = np.asarray(C, dtype=np.int64)
+        self.contigs = contigs                     # [(name, start offset, length)]
+        self.length = length                       # rows, sentinel included
+        self.sentinel_row = sentinel_row
+        self._contig_starts = np.array([c[1] for c in contigs], dtype=np.int64)
+
+    # --- construction ---
+    @classmethod
+    def build(cls, contigs):
+        """contigs: iterable of (name, sequence bytes/str)."""
+        names, parts, offsets = [], [], []
+        offset = 0
+        for name, seq in contigs:
+            codes = encode(seq)
+            names.append(name)
+            offsets.append((offset, len(codes)))
+            parts.append(codes)
+            parts.append(np.array([SEPARATOR], dtype=np.uint8))
+            offset += len(codes) + 1
+        if not names:
+            raise ValueError("Reference contains no sequences")
+        parts[-1] = np.array([SENTINEL], dtype=np.uint8)
+        text = np.concatenate(parts)
+        del parts
+        n = len(text)
+
+        sa = suffix_array(text)
+        blocks = n // OCC_INTERVAL + 1
+        bwt = np.zeros(blocks * OCC_INTERVAL, dtype=np.uint8)
+        bwt[:n] = text[sa - 1]                      # sa == 0 wraps to the sentinel
+        counts = np.bincount(text, minlength=len(ALPHABET))
+        C = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        del text
+
+        count_dtype = np.int32 if n < 2 ** 31 else np.int64
+        masks = np.empty((blocks, 4), dtype=np.uint64)
+        occ = np.zeros((blocks, 4), dtype=count_dtype)
+        for j, c in enumerate(BASE_SYMBOLS):
+            bits = (bwt == c).reshape(blocks, OCC_INTERVAL)
+            masks[:, j] = np.packbits(bits, axis=1, bitorder="little").view("<u8")[:, 0]
+            occ[1:, j] = np.cumsum(bits.sum(axis=1))[:-1]
+        sentinel_row = int(np.flatnonzero(sa == 0)[0])
+        del bwt
+
+        sa_rows = np.flatnonzero(sa % SA_SAMPLE_RATE == 0)
+        sa_values = sa[sa_rows].astype(count_dtype)
+        sa_rows = sa_rows.astype(count_dtype)
+        contig_meta = [(name, start, length) for name, (start, length) in zip(names, offsets)]
+        return cls(masks, occ, sa_rows, sa_values, C, contig_meta, n, sentinel_row)
+
+    # --- persistence ---
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "masks.npy"), self.masks)
+        np.save(os.path.join(directory, "occ.npy"), self.occ)
+        np.save(os.path.join(directory, "sa_rows.npy"), self.sa_rows)
+        np.save(os.path.join(directory, "sa_values.npy"), self.sa_values)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({
+                "length": self.length,
+                "sentinel_row": self.sentinel_row,
+                "C": self.C.tolist(),
+                "contigs": self.contigs,
+                "occ_interval": OCC_INTERVAL,
+                "sa_sample_rate": SA_SAMPLE_RATE,
+            }, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["occ_interval"] != OCC_INTERVAL or meta["sa_sample_rate"] != SA_SAMPLE_RATE:
+            raise ValueError("Index was built with different sampling parameters")
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(directory, name), mmap_mode=mode) for name in INDEX_FILES[:4]]
+        return cls(*arrays, meta["C"], [tuple(c) for c in meta["contigs"]], meta["length"],
+                   meta["sentinel_row"])
+
+    @property
+    def nbytes(self):
+        return int(self.masks.nbytes + self.occ.nbytes + self.sa_rows.nbytes + self.sa_values.nbytes)
+
+    # --- queries ---
+    def occurrences(self, symbols, rows):
+        """Occ(base, row): how many of BWT[:row] equal base (1..4), for parallel arrays."""
+        block = rows // OCC_INTERVAL
+        column = symbols.astype(np.int64) - 1
+        below = (np.uint64(1) << (rows % OCC_INTERVAL).astype(np.uint64)) - np.uint64(1)
+        return self.occ[block, column] + _popcount(self.masks[block, column] & below)
+
+    def symbols_at(self, rows):
+        """BWT symbols for rows; rows with no base bit set are the sentinel or N."""
+        bits = (self.masks[rows // OCC_INTERVAL] >> (rows % OCC_INTERVAL).astype(np.uint64)[:, None]) & np.uint64(1)
+        found = bits.any(axis=1)
+        sym = np.where(found, bits.argmax(axis=1) + 1, SEPARATOR)
+        sym[rows == self.sentinel_row] = SENTINEL
+        return sym
+
+    def _lf(self, rows):
+        """LF mapping for rows whose BWT symbol is a base or N (never the sentinel row)."""
+        sym = self.symbols_at(rows)
+        out = np.empty(len(rows), dtype=np.int64)
+        base = sym != SEPARATOR
+        out[base] = self.C[sym[base]] + self.occurrences(sym[base], rows[base])
+        n_rows = rows[~base]
+        if len(n_rows):
+            block = n_rows // OCC_INTERVAL
+            below = (np.uint64(1) << (n_rows % OCC_INTERVAL).astype(np.uint64)) - np.uint64(1)
+            bases = (self.occ[block].sum(axis=1)
+                     + _popcount(self.masks[block] & below[:, None]).sum(axis=1))
+            n_before = n_rows - bases - (self.sentinel_row < n_rows)
+            out[~base] = self.C[SEPARATOR] + n_before
+        return out
+
+    def _step(self, symbols, lo, hi):
+        start = self.C[symbols]
+        return start + self.occurrences(symbols, lo), start + self.occurrences(symbols, hi)
+
+    def search(self, queries, max_mismatches=0):
+        """
+        Backward search for many encoded queries at once, allowing up to max_mismatches
+        substitutions. Returns parallel arrays (query index, lo, hi, mismatches) of
+        non-empty suffix array intervals; each interval is a distinct matched string.
+        Queries with anything but A, C, G, T (e.g. N) match nothing.
+        """
+        m = len(queries)
+        lengths = np.array([len(q) for q in queries], dtype=np.int64)
+        padded = np.zeros((m, max(int(lengths.max(initial=0)), 1)), dtype=np.uint8)
+        for i, q in enumerate(queries):
+            padded[i, :len(q)] = q
+
+        # encode() maps everything outside ACGT to the separator, which no query base matches
+        qid = np.flatnonzero(~(padded == SEPARATOR).any(axis=1)).astype(np.int64)
+        n = len(qid)
+        lo = np.zeros(n, dtype=np.int64)
+        hi = np.full(n, self.length, dtype=np.int64)
+        mm = np.zeros(n, dtype=np.int64)
+        depth = np.zeros(n, dtype=np.int64)
+        done = ([], [], [], [])
+
+        while len(qid):
+            finished = depth >= lengths[qid]
+            if finished.any():
+                for out, arr in zip(done, (qid, lo, hi, mm)):
+                    out.append(arr[finished])
+                keep = ~finished
+                qid, lo, hi, mm, depth = qid[keep], lo[keep], hi[keep], mm[keep], depth[keep]
+                if not len(qid):
+                    break
+
+            wanted = padded[qid, lengths[qid] - 1 - depth]
+            if max_mismatches:
+                # Every frontier entry branches into A, C, G, T; off-query bases cost a mismatch
+                k = len(BASE_SYMBOLS)
+                sym = np.tile(BASE_SYMBOLS, len(qid))
+                qid, lo, hi, depth = (np.repeat(a, k) for a in (qid, lo, hi, depth))
+                mm = np.repeat(mm, k) + (sym != np.repeat(wanted, k))
+                ok = mm <= max_mismatches
+                qid, lo, hi, mm, depth, sym = qid[ok], lo[ok], hi[ok], mm[ok], depth[ok], sym[ok]
+            else:
+                sym = wanted
+
+            new_lo = np.empty_like(lo)
+            new_hi = np.empty_like(hi)
+            for s in range(0, len(sym), _FRONTIER_CHUNK):
+                e = s + _FRONTIER_CHUNK
+                new_lo[s:e], new_hi[s:e] = self._step(sym[s:e], lo[s:e], hi[s:e])
+            alive = new_lo < new_hi
+            qid, lo, hi, mm, depth = qid[alive], new_lo[alive], new_hi[alive], mm[alive], depth[alive] + 1
+
+        if not done[0]:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        return tuple(np.concatenate(parts) for parts in done)
+
+    def locate(self, rows):
+        """Text positions for suffix array rows, walking LF to the nearest sampled entry."""
+        rows = np.asarray(rows, dtype=np.int64).copy()
+        steps = np.zeros(len(rows), dtype=np.int64)
+        positions = np.empty(len(rows), dtype=np.int64)
+        pending = np.arange(len(rows))
+        while len(pending):
+            r = rows[pending]
+            slot = np.minimum(np.searchsorted(self.sa_rows, r), len(self.sa_rows) - 1)
+            hit = self.sa_rows[slot] == r
+            positions[pending[hit]] = self.sa_values[slot[hit]] + steps[pending[hit]]
+            pending = pending[~hit]
+            rows[pending] = self._lf(r[~hit])
+            steps[pending] += 1
+        return positions
+
+    def contig_of(self, positions):
+        idx = np.searchsorted(self._contig_starts, positions, side="right") - 1
+        return idx, positions - self._contig_starts[idx]
+
+
+def reverse_complement_codes(codes):
+    return _COMPLEMENT[codes[::-1]]
+
+
+def check_specificity(index, sequences, max_mismatches=0, max_locations=20):
+    """
+    Counts and locates every occurrence of each sequence (and its reverse complement)
+    with up to max_mismatches substitutions.
+    """
+    queries = []
+    for seq in sequences:
+        codes = encode(seq.upper())
+        queries.append(codes)
+        queries.append(reverse_complement_codes(codes))
+    qid, lo, hi, mm = index.search(queries, max_mismatches)
+
+    # Palindromic queries hit the same locations on both strands
+    palindromic = np.array([np.array_equal(queries[i], queries[i + 1]) for i in range(0, len(queries), 2)])
+    keep = ~((qid % 2 == 1) & palindromic[qid // 2]) if len(qid) else np.zeros(0, dtype=bool)
+    qid, lo, hi, mm = qid[keep], lo[keep], hi[keep], mm[keep]
+    order = np.lexsort((qid % 2, mm, qid // 2))
+    qid, lo, hi, mm = qid[order], lo[order], hi[order], mm[order]
+
+    # Pick up to max_locations rows per sequence (fewest mismatches first), then locate in one pass
+    seq_of = qid // 2
+    hits = hi - lo
+    before = np.zeros(len(hits), dtype=np.int64)
+    if len(hits):
+        running = np.cumsum(hits) - hits
+        first = np.concatenate(([True], seq_of[1:] != seq_of[:-1]))
+        before = running - np.maximum.accumulate(np.where(first, running, 0))
+    take = np.clip(max_locations - before, 0, hits)
+    rows = np.repeat(lo, take) + (np.arange(take.sum()) - np.repeat(np.cumsum(take) - take, take))
+    contig, local = index.contig_of(index.locate(rows))
+    owner = np.repeat(np.arange(len(take)), take)
+
+    results = [{
+        "sequence": seq,
+        "total_hits": 0,
+        "exact_hits": 0,
+        "hits_by_mismatches": [0] * (max_mismatches + 1),
+        "unique": False,
+        "locations": [],
+    } for seq in sequences]
+    for s, m, n in zip(seq_of.tolist(), mm.tolist(), hits.tolist()):
+        results[s]["hits_by_mismatches"][m] += n
+    for j, c, p in zip(owner.tolist(), contig.tolist(), local.tolist()):
+        results[seq_of[j]]["locations"].append({
+            "contig": index.contigs[c][0],
+            "position": p + 1,
+            "strand": "+" if qid[j] % 2 == 0 else "-",
+            "mismatches": int(mm[j]),
+        })
+    for r in results:
+        r["total_hits"] = sum(r["hits_by_mismatches"])
+        r["exact_hits"] = r["hits_by_mismatches"][0]
+        r["unique"] = r["total_hits"] == 1
+        r["locations"].sort(key=lambda h: (h["mismatches"], h["contig"], h["position"]))
+    return results
+
+
+def build_index_from_fasta(fasta_path, index_dir):
+    """Builds and saves the index for a FASTA file; returns a summary for the database row."""
+    index = FMIndex.build(read_fasta(fasta_path))
+    index.save(index_dir)
+    return {
+        "length": int(sum(c[2] for c in index.contigs)),
+        "contigs": len(index.contigs),
+        "index_bytes": index.nbytes,
+    }
@@ -0,0 +1,139 @@
+import os
+import zlib
+import hashlib
+
+from flask import request, make_response
+
+# Optional brotli support, gzip otherwise
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/plain',
+    'text/html',
+    'text/csv',
+    'image/svg+xml',
+}
+# Event streams must reach the client chunk by chunk, never buffered by a compressor
+NEVER_COMPRESS_TYPES = {'text/event-stream'}
+MIN_COMPRESS_SIZE = int(os.environ.get('MIN_COMPRESS_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ANALYSIS_CACHE_MAX_AGE = int(os.environ.get('ANALYSIS_CACHE_MAX_AGE', 0))
+
+_ENCODING_SUFFIXES = ('-br', '-gzip')
+
+
+def _pick_encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+
+def _gzip_compressor():
+    # wbits=31 -> gzip container
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def _compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    c = _gzip_compressor()
+    return c.compress(data) + c.flush()
+
+
+def _compress_stream(chunks, encoding):
+    """Compresses a streamed body, flushing after every chunk so nothing is held back."""
+    if encoding == 'br':
+        c = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = c.process(chunk) + c.flush()
+            if out:
+                yield out
+        yield c.finish()
+    else:
+        c = _gzip_compressor()
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = c.compress(chunk) + c.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield c.flush()
+
+
+def _tag_etag(response, encoding):
+    # Each content-coding is a distinct representation and needs its own strong ETag
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+
+
+def compress_response(response):
+    """after_request hook: gzip/brotli for compressible payloads, streaming-aware."""
+    if response.mimetype in NEVER_COMPRESS_TYPES or response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.status_code < 200 or response.status_code in (204, 304) \
+            or 'Content-Encoding' in response.headers:
+        return response
+
+    encoding = _pick_encoding()
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return response
+        response.set_data(_compress_body(data, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+    _tag_etag(response, encoding)
+    return response
+
+
+def immutable_etag(*parts):
+    """Strong ETag for resources that never change once written."""
+    return hashlib.sha256('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:32]
+
+
+def _cache_control():
+    if ANALYSIS_CACHE_MAX_AGE > 0:
+        return f'private, max-age={ANALYSIS_CACHE_MAX_AGE}, immutable'
+    # Always revalidate, which costs a 304 and no decryption
+    return 'private, no-cache'
+
+
+def not_modified(etag):
+    """Returns a 304 response if the client already holds this representation, else None."""
+    candidates = set()
+    for tag in request.if_none_match.as_set():
+        candidates.add(tag)
+        for suffix in _ENCODING_SUFFIXES:
+            if tag.endswith(suffix):
+                candidates.add(tag[:-len(suffix)])
+    if etag not in candidates and not request.if_none_match.star_tag:
+        return None
+    resp = make_response('', 304)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = _cache_control()
+    return resp
+
+
+def cacheable(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = _cache_control()
+    return response
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class NCList:
+    """
+    Nested containment list over half-open intervals [start, end).
+
+    Intervals are sorted by (start asc, end desc); each one is placed in the sublist of the
+    closest interval containing it, so within a sublist both starts and ends increase and an
+    overlap query is two binary searches per visited sublist.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        n = len(starts)
+        order = np.lexsort((-ends, starts))
+
+        parent = np.full(n, -1, dtype=np.int64)
+        stack = []
+        e_sorted = ends[order].tolist()
+        for rank in range(n):
+            while stack and e_sorted[stack[-1]] < e_sorted[rank]:
+                stack.pop()
+            if stack:
+                parent[rank] = stack[-1]
+            stack.append(rank)
+
+        # Lay sublists out contiguously: the top level (parent -1) first, then by parent rank
+        layout = np.lexsort((np.arange(n), parent))
+        self.ids = order[layout]                   # original interval index at each slot
+        self.starts = starts[self.ids]
+        self.ends = ends[self.ids]
+        slot_of_rank = np.empty(n, dtype=np.int64)
+        slot_of_rank[layout] = np.arange(n)
+        owners = parent[layout]                    # sorted: -1 first, then parent ranks
+
+        # Sublist bounds for the top level (index n) and for every slot's children
+        self.child_start = np.zeros(n + 1, dtype=np.int64)
+        self.child_end = np.zeros(n + 1, dtype=np.int64)
+        keys = np.where(owners < 0, n, slot_of_rank[np.maximum(owners, 0)])
+        if n:
+            boundaries = np.flatnonzero(np.concatenate(([True], owners[1:] != owners[:-1])))
+            group_end = np.append(boundaries[1:], n)
+            self.child_start[keys[boundaries]] = boundaries
+            self.child_end[keys[boundaries]] = group_end
+        self.size = n
+
+    def __len__(self):
+        return self.size
+
+    def overlapping(self, start, end):
+        """Original indices of intervals overlapping [start, end), in no particular order."""
+        if not self.size or end <= start:
+            return np.zeros(0, dtype=np.int64)
+        found = []
+        pending = [self.size]
+        while pending:
+            next_level = []
+            for key in pending:
+                a, b = self.child_start[key], self.child_end[key]
+                if a == b:
+                    continue
+                lo = a + np.searchsorted(self.ends[a:b], start, side="right")
+                hi = a + np.searchsorted(self.starts[a:b], end, side="left")
+                if lo >= hi:
+                    continue
+                found.append(np.arange(lo, hi))
+                slots = np.arange(lo, hi)
+                nested = slots[self.child_end[slots] > self.child_start[slots]]
+                next_level.extend(nested.tolist())
+            pending = next_level
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return self.ids[np.concatenate(found)]
+
+
+class FeatureIndex:
+    """Features of one sequence (1-based inclusive coordinates) behind an NCList."""
+
+    def __init__(self, features):
+        self.features = features
+        self.kinds = sorted({f["kind"] for f in features})
+        kind_ids = {k: i for i, k in enumerate(self.kinds)}
+        self.kind_of = np.array([kind_ids[f["kind"]] for f in features], dtype=np.int64)
+        self.starts = np.array([f["start"] - 1 for f in features], dtype=np.int64)
+        self.ends = np.array([f["end"] for f in features], dtype=np.int64)
+        self.index = NCList(self.starts, self.ends)
+
+    def query(self, start, end, kinds=None):
+        """Indices of features overlapping 1-based inclusive [start, end], sorted by position."""
+        idx = self.index.overlapping(start - 1, end)
+        if kinds:
+            wanted = [self.kinds.index(k) for k in kinds if k in self.kinds]
+            idx = idx[np.isin(self.kind_of[idx], wanted)]
+        return idx[np.lexsort((self.ends[idx], self.starts[idx]))]
+
+    def binned_counts(self, idx, start, end, bins):
+        """Per-kind feature counts for equal bins over [start, end]; a feature counts in every bin it touches."""
+        span = end - start + 1
+        bin_size = max(-(-span // bins), 1)
+        n_bins = -(-span // bin_size)
+        first = np.clip((self.starts[idx] - (start - 1)) // bin_size, 0, n_bins - 1)
+        last = np.clip((self.ends[idx] - 1 - (start - 1)) // bin_size, 0, n_bins - 1)
+        # Difference array per kind, then cumulative sum along bins
+        diff = np.zeros((len(self.kinds), n_bins + 1), dtype=np.int64)
+        np.add.at(diff, (self.kind_of[idx], first), 1)
+        np.add.at(diff, (self.kind_of[idx], last + 1), -1)
+        return bin_size, np.cumsum(diff[:, :-1], axis=1)
@@ -0,0 +1,217 @@
+"""
+Structured logging that never blocks a serving greenlet.
+
+Records are formatted in the caller (message, exception text, request id), put on an
+unbounded C queue, and written by a native OS thread: stdout and the rotating log files are
+touched only there, so slow disks or pipes cannot stall the eventlet hub. When the queue
+backs up past LOG_QUEUE_SIZE, new records are dropped and counted instead of waiting.
+
+    LOG_LEVEL=INFO LOG_FORMAT=json LOG_FILE=logs/server.log LOG_ERROR_FILE=critical_errors.log
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import logging
+import contextvars
+import logging.handlers
+from functools import wraps
+from _queue import SimpleQueue    # C queue: not replaced by eventlet's monkey patching
+
+# Correlation id of the request being served (per greenlet / thread)
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else came in through extra= and is emitted as a field
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id', 'sampled'}
+
+
+def new_request_id(incoming=None):
+    # Accept an upstream id (load balancer / client) if it looks like one
+    if incoming and len(incoming) <= 64 and incoming.replace('-', '').replace('_', '').isalnum():
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+def carry_request_id(fn):
+    """Wraps fn so it logs with the current request id when run on another greenlet or thread."""
+    rid = request_id.get()
+    if rid is None:
+        return fn
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        token = request_id.set(rid)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            request_id.reset(token)
+    return run
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the request id and samples repeated DEBUG messages, in the calling greenlet."""
+
+    def __init__(self, sample_every):
+        super().__init__()
+        self.sample_every = sample_every
+        self._seen = {}
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        if record.levelno <= logging.DEBUG and self.sample_every > 1:
+            key = (record.name, record.msg)
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+            if n % self.sample_every:
+                return False
+            if n:
+                record.sampled = self.sample_every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "pid": record.process,
+        }
+        if getattr(record, 'request_id', None):
+            entry["request_id"] = record.request_id
+        if getattr(record, 'sampled', None):
+            entry["sampled"] = record.sampled
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s %(message)s', '%H:%M:%S')
+
+    def format(self, record):
+        line = super().format(record)
+        rid = getattr(record, 'request_id', None)
+        return f"{line} [{rid}]" if rid else line
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotates at `when` boundaries (midnight, H, ...) and whenever the file passes max_bytes."""
+
+    def __init__(self, filename, max_bytes, when, backup_count):
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(filename, when=when, backupCount=backup_count, encoding='utf-8', delay=True, utc=True)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes and self.stream is not None:
+            return self.stream.tell() + len(self.format(record)) + 1 > self.max_bytes
+        return False
+
+    def rotation_filename(self, default_name):
+        # A size rollover inside the same period gets .1, .2, ... instead of replacing the first file
+        name, n = default_name, 0
+        while os.path.exists(name):
+            n += 1
+            name = f"{default_name}.{n}"
+        return name
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, queue, limit):
+        super().__init__(queue)
+        self.limit = limit
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve everything that refers to caller state now; the writer only serializes
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.limit:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class _NativeListener(logging.handlers.QueueListener):
+    def start(self):
+        # logging.handlers uses the (possibly green) threading module; the writer must be a real thread
+        from task_runner import native_thread
+        self._thread = native_thread(self._monitor, name='log-writer')
+
+
+_listener = None
+_handler = None
+
+
+def configure_logging():
+    """Routes the root logger through the background writer. Safe to call more than once."""
+    global _listener, _handler
+    if _listener is not None:
+        return _handler
+
+    env = os.environ.get
+    level = env('LOG_LEVEL', 'INFO').upper()
+    fmt = env('LOG_FORMAT', 'text' if env('NODE_ENV') == 'development' else 'json')
+    rotation = dict(max_bytes=int(env('LOG_MAX_MB', 50)) * 1024 * 1024, when=env('LOG_ROTATE_WHEN', 'midnight'),
+                    backup_count=int(env('LOG_BACKUP_COUNT', 14)))
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    targets = [stream]
+    if env('LOG_FILE'):
+        file_handler = SizedTimedRotatingFileHandler(env('LOG_FILE'), **rotation)
+        file_handler.setFormatter(JsonFormatter())
+        targets.append(file_handler)
+    if env('LOG_ERROR_FILE', 'critical_errors.log'):
+        errors = SizedTimedRotatingFileHandler(env('LOG_ERROR_FILE', 'critical_errors.log'), **rotation)
+        errors.setLevel(logging.ERROR)
+        errors.setFormatter(JsonFormatter())
+        targets.append(errors)
+
+    queue = SimpleQueue()
+    _handler = NonBlockingQueueHandler(queue, int(env('LOG_QUEUE_SIZE', 10000)))
+    # Keep the first and then every Nth occurrence of each DEBUG message (1 keeps all)
+    _handler.addFilter(ContextFilter(max(int(env('LOG_DEBUG_SAMPLE', 10)), 1)))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    if level != 'DEBUG':
+        # One INFO line per provider HTTP request is noise next to the ai_* metrics
+        for name in ('httpx', 'httpx2', 'httpcore'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = _NativeListener(queue, *targets, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _handler
+
+
+def snapshot():
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "level": logging.getLevelName(logging.getLogger().level).lower(),
+    }
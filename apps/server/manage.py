@@ -0,0 +1,31 @@
+"""
+One-time setup steps kept out of the serving import path.
+
+    python manage.py init         # create missing tables, then seed the admin from the environment
+    python manage.py migrate      # tables only
+    python manage.py seed-admin   # ADMIN_EMAIL / ADMIN_PASSWORD only
+
+Run it once per deploy (Procfile release phase, container entrypoint), not per worker.
+"""
+import sys
+import logging
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gene Forge database setup")
+    parser.add_argument("command", choices=("init", "migrate", "seed-admin"))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    from models import core_app, init_db, seed_admin
+    if args.command in ("init", "migrate"):
+        init_db(core_app())
+        print("Database schema is up to date.")
+    if args.command in ("init", "seed-admin"):
+        seed_admin(core_app())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Process-local instrumentation exposed in the Prometheus text format (GET /metrics).
+
+Counters and histograms keep fixed buckets behind one lock each, so recording is a
+bisect and two additions; nothing is computed until a scrape renders the registry.
+Every worker keeps its own numbers, like socket_metrics.
+"""
+import os
+import time
+import logging
+import threading
+from bisect import bisect_left
+from functools import wraps
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_number(v)}" for key, v in values]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then the running sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {values[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def timed(histogram, *labels):
+    """Decorator recording the call duration in `histogram`."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labels)
+        return wrapper
+    return decorate
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Registers func() -> [(name, kind, help, [(labels dict, value)])], evaluated at scrape time."""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                log.warning("METRICS: collector %s failed: %s", collect.__name__, e)
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Time to produce the response headers, per route.",
+    ("method", "endpoint", "status"))
+db_query_seconds = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", buckets=FAST_BUCKETS)
+db_request_queries = registry.histogram(
+    "db_queries_per_request", "SQL statements executed while handling one request.",
+    ("endpoint",), buckets=COUNT_BUCKETS)
+db_request_seconds = registry.histogram(
+    "db_request_duration_seconds", "Total SQL time spent while handling one request.", ("endpoint",))
+db_routed_requests = registry.counter(
+    "db_routed_requests_total", "Replica-eligible requests by where their reads went.", ("target", "reason"))
+crypto_seconds = registry.histogram(
+    "crypto_operation_duration_seconds", "Per-user AES-GCM operations including key derivation.",
+    ("operation",), buckets=FAST_BUCKETS)
+ai_first_token_seconds = registry.histogram(
+    "ai_time_to_first_token_seconds", "From provider request to the first generated text.", ("provider",))
+ai_request_seconds = registry.histogram(
+    "ai_request_duration_seconds", "Full provider response time (to the end of the stream).", ("provider",),
+    buckets=LATENCY_BUCKETS + (60.0, 120.0))
+ai_requests = registry.counter(
+    "ai_requests_total", "Provider calls by outcome.", ("provider", "outcome"))
+ai_fallbacks = registry.counter(
+    "ai_fallbacks_total", "Responses served by a provider after an earlier one failed.", ("provider",))
+
+
+class AICall:
+    """Times one provider attempt; attempt > 0 means earlier providers failed."""
+
+    def __init__(self, provider, attempt=0):
+        self.provider = provider
+        self.attempt = attempt
+        self.started = time.perf_counter()
+        self.first = None
+
+    def token(self):
+        if self.first is None:
+            self.first = time.perf_counter()
+            ai_first_token_seconds.observe(self.first - self.started, self.provider)
+
+    def done(self):
+        self.token()
+        ai_request_seconds.observe(time.perf_counter() - self.started, self.provider)
+        ai_requests.inc(self.provider, "success")
+        if self.attempt:
+            ai_fallbacks.inc(self.provider)
+
+    def failed(self):
+        ai_requests.inc(self.provider, "error")
+
+
+# Per request (greenlet-local under eventlet): SQL statements and time
+_request = threading.local()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("metrics_started")
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+    db_query_seconds.observe(elapsed)
+    if getattr(_request, "active", False):
+        _request.queries += 1
+        _request.db_seconds += elapsed
+
+
+def init_app(app):
+    """Times every request and SQL statement; call once after the app is configured."""
+    if not ENABLED:
+        return
+    from flask import request
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def _start_request_metrics():
+        _request.active = True
+        _request.queries = 0
+        _request.db_seconds = 0.0
+        _request.started = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        if getattr(_request, "active", False):
+            _request.active = False
+            # The route template keeps label cardinality bounded (/api/projects/<int:project_id>)
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            http_request_seconds.observe(time.perf_counter() - _request.started,
+                                         request.method, endpoint, str(response.status_code))
+            db_request_queries.observe(_request.queries, endpoint)
+            db_request_seconds.observe(_request.db_seconds, endpoint)
+        return response
@@ -0,0 +1,222 @@
+"""
+SQLAlchemy models and database setup, importable without the web stack.
+
+app.py binds `db` to the serving app; command-line tools (manage.py, admin.py) use
+core_app(), which only configures the database.
+"""
+import os
+import json
+import logging
+import datetime
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.security import generate_password_hash, check_password_hash
+from db_config import RoutingSession, normalize_url, engine_options, patch_driver, router
+
+log = logging.getLogger(__name__)
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def database_url():
+    return normalize_url(os.environ.get('DATABASE_URL', 'sqlite:///geneforge.db'))
+
+
+def configure(flask_app):
+    url = database_url()
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = url
+    flask_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url)
+    flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    patch_driver(url)
+    router.configure()
+    db.init_app(flask_app)
+    return flask_app
+
+
+_core_app = None
+
+def core_app():
+    """Database-only Flask app for scripts; same .env and sqlite instance folder as app.py."""
+    global _core_app
+    if _core_app is None:
+        from dotenv import load_dotenv
+        load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.env'))
+        _core_app = configure(Flask(__name__))
+    return _core_app
+
+
+# Models
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    role = db.Column(db.String(20), default='user')
+    salt = db.Column(db.LargeBinary, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=True) # For Admin Password
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+class GenomicData(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    data_type = db.Column(db.String(50), nullable=False) # raw_sequence, analysis_result, ai_report
+    encrypted_payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+class Project(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    analyses = db.relationship('AnalysisSession', backref='project', lazy=True, cascade="all, delete-orphan")
+    jobs = db.relationship('BackgroundJob', backref='project', lazy=True, cascade="all, delete-orphan")
+
+class AnalysisSession(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    encrypted_sequence = db.Column(db.Text, nullable=False)
+    encrypted_results = db.Column(db.Text, nullable=True) # JSON stored as encrypted string
+    version = db.Column(db.Integer, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    annotations = db.relationship('SequenceAnnotation', backref='analysis', lazy=True, cascade="all, delete-orphan")
+
+class SequenceAnnotation(db.Model):
+    # Coordinates and scores only; sequence-derived text (repeat units) is rebuilt from the encrypted sequence on read
+    id = db.Column(db.Integer, primary_key=True)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis_session.id'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False) # cpg_island, microsatellite, tandem_repeat, low_complexity
+    start = db.Column(db.Integer, nullable=False) # 1-based, inclusive
+    end = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, default=0.0)
+    period = db.Column(db.Integer, nullable=True)
+    attributes = db.Column(db.Text, nullable=True) # JSON
+    __table_args__ = (db.Index('ix_sequence_annotation_lookup', 'analysis_id', 'kind', 'start'),)
+
+    def to_dict(self, sequence=None):
+        attributes = json.loads(self.attributes) if self.attributes else {}
+        return annotation_dict(self.kind, self.start, self.end, self.score, self.period, attributes, sequence)
+
+def annotation_dict(kind, start, end, score, period, attributes, sequence=None):
+    if period:
+        attributes['period'] = period
+        if sequence:
+            attributes['unit'] = sequence[start - 1:start - 1 + period]
+    if kind == 'snp' and sequence:
+        attributes['reference_base'] = sequence[start - 1:start]
+    return {
+        "kind": kind,
+        "start": start,
+        "end": end,
+        "score": score,
+        "attributes": attributes
+    }
+
+class OTP(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), nullable=False)
+    code = db.Column(db.String(6), nullable=False)
+    expiry = db.Column(db.DateTime, nullable=False)
+    used = db.Column(db.Boolean, default=False)
+
+class AuditLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    action = db.Column(db.String(100), nullable=False)
+    details = db.Column(db.Text, nullable=True)
+    ip_address = db.Column(db.String(45), nullable=True)
+    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+class AIUsage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    model_used = db.Column(db.String(50), nullable=False)
+    tokens_input = db.Column(db.Integer, default=0)
+    tokens_output = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(20), default='success') # success, failed, fallback
+    timestamp = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+class ReferenceGenome(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20), default='pending') # pending, building, ready, failed
+    length = db.Column(db.BigInteger, default=0)
+    contigs = db.Column(db.Integer, default=0)
+    index_bytes = db.Column(db.BigInteger, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    built_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "length": self.length,
+            "contigs": self.contigs,
+            "index_bytes": self.index_bytes,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "built_at": self.built_at.isoformat() if self.built_at else None
+        }
+
+class BackgroundJob(db.Model):
+    # Long-running work for a project; the result holds sequence-derived data, so it is encrypted
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=True)
+    kind = db.Column(db.String(30), nullable=False) # alignment, fastq_qc, report
+    status = db.Column(db.String(20), default='pending') # pending, running, done, failed
+    params = db.Column(db.Text, nullable=True) # JSON
+    encrypted_result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "project_id": self.project_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": job_progress.get(self.id, 1.0 if self.status == 'done' else 0.0),
+            "params": json.loads(self.params) if self.params else {},
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+# Fraction done of running jobs, per process
+job_progress = {}
+
+
+def init_db(flask_app):
+    with flask_app.app_context():
+        db.create_all()
+
+def seed_admin(flask_app):
+    # Seed Admin from Env: creates it, or resyncs role and password with ADMIN_EMAIL / ADMIN_PASSWORD
+    admin_email = os.environ.get('ADMIN_EMAIL')
+    admin_pass = os.environ.get('ADMIN_PASSWORD')
+    if not (admin_email and admin_pass):
+        return
+    with flask_app.app_context():
+        try:
+            admin = User.query.filter_by(email=admin_email).first()
+            if not admin:
+                log.info("Creating Admin User: %s", admin_email)
+                salt = os.urandom(16)
+                admin = User(email=admin_email, role='admin', salt=salt)
+                admin.password_hash = generate_password_hash(admin_pass)
+                db.session.add(admin)
+                db.session.commit()
+            else:
+                # Always ensure the admin password in DB matches the ENV variable
+                if admin.role != 'admin' or not admin.password_hash or not check_password_hash(admin.password_hash, admin_pass):
+                    admin.role = 'admin'
+                    admin.password_hash = generate_password_hash(admin_pass)
+                    db.session.commit()
+                    log.info("Updated Admin User credentials from Environment: %s", admin_email)
+        except Exception as e:
+            log.error("Admin seeding error: %s", e)
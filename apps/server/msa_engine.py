@@ -0,0 +1,270 @@
+import numpy as np
+
+from task_runner import parallel_map
+
+# Byte -> code lookup: A, C, G, T = 0..3, anything else (N) = 4; 5 is a gap in alignments
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _CODES[ord(_b)] = _i
+    _CODES[ord(_b.lower())] = _i
+GAP = 5
+SYMBOLS = np.frombuffer(b"ACGTN-", dtype=np.uint8)
+
+KMER_SIZE = 6
+DISTANCE_BLOCK = 16        # rows per parallel distance task
+
+# Nucleotide scores (BLASTN-like); terminal gaps are free so partial sequences align cleanly
+MATCH = 2.0
+MISMATCH = -3.0
+GAP_OPEN = -7.0            # first gapped column
+GAP_EXTEND = -2.0          # each further column
+
+# Profile columns are frequencies of A, C, G, T and gap; N counts a quarter towards each base
+_SCORES = np.full((5, 5), MISMATCH)
+np.fill_diagonal(_SCORES, MATCH)
+_SCORES[4, :] = _SCORES[:, 4] = 0.0
+_TO_PROFILE = np.zeros((6, 5))
+_TO_PROFILE[np.arange(4), np.arange(4)] = 1.0
+_TO_PROFILE[4, :4] = 0.25
+_TO_PROFILE[GAP, 4] = 1.0
+
+# Traceback flags, one byte per cell
+_FROM_F, _FROM_E, _D_FROM_F, _F_EXTEND, _E_EXTEND = 1, 2, 4, 8, 16
+
+
+def encode(sequence):
+    return _CODES[np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)]
+
+
+def kmer_counts(codes, k=KMER_SIZE):
+    """k-mer count vector (4^k entries), skipping windows with ambiguous bases."""
+    m = len(codes) - k + 1
+    counts = np.zeros(4 ** k, dtype=np.int32)
+    if m <= 0:
+        return counts
+    packed = np.zeros(m, dtype=np.int64)
+    for j in range(k):
+        packed = (packed << 2) | (codes[j:j + m] & 3)
+    bad = np.concatenate(([0], np.cumsum(codes > 3)))
+    packed = packed[(bad[k:] - bad[:m]) == 0]
+    return np.bincount(packed, minlength=4 ** k).astype(np.int32)
+
+
+def kmer_distances(encoded, k=KMER_SIZE, workers=None):
+    """
+    Pairwise k-mer distance 1 - shared / (shorter length - k + 1), where shared counts common
+    k-mers with multiplicity. Row blocks are computed in parallel on OS threads.
+    """
+    n = len(encoded)
+    counts = np.stack([kmer_counts(c, k) for c in encoded]) if n else np.zeros((0, 4 ** k), dtype=np.int32)
+    lengths = np.array([max(len(c) - k + 1, 1) for c in encoded], dtype=np.float64)
+
+    def block(lo):
+        hi = min(lo + DISTANCE_BLOCK, n)
+        shared = np.minimum(counts[lo:hi, None, :], counts[None, :, :]).sum(axis=2)
+        return shared / np.minimum(lengths[lo:hi, None], lengths[None, :])
+
+    shared = np.vstack(parallel_map(block, range(0, n, DISTANCE_BLOCK), workers)) if n else np.zeros((0, 0))
+    distances = np.clip(1.0 - shared, 0.0, 1.0)
+    np.fill_diagonal(distances, 0.0)
+    return distances
+
+
+def upgma(distances):
+    """
+    UPGMA guide tree. Returns merges as (left, right, height) in order; leaves are 0..n-1 and
+    the i-th merge creates node n + i.
+    """
+    n = len(distances)
+    d = distances.astype(np.float64).copy()
+    np.fill_diagonal(d, np.inf)
+    sizes = np.ones(n)
+    node = list(range(n))
+    active = np.ones(n, dtype=bool)
+    merges = []
+    for step in range(n - 1):
+        masked = np.where(active[:, None] & active[None, :], d, np.inf)
+        i, j = np.unravel_index(np.argmin(masked), masked.shape)
+        i, j = min(i, j), max(i, j)
+        merges.append((node[i], node[j], float(d[i, j]) / 2))
+        # Average linkage: the merged cluster replaces row i
+        merged = (d[i] * sizes[i] + d[j] * sizes[j]) / (sizes[i] + sizes[j])
+        d[i, :] = d[:, i] = merged
+        d[i, i] = np.inf
+        sizes[i] += sizes[j]
+        active[j] = False
+        node[i] = n + step
+    return merges
+
+
+def newick(merges, names):
+    n = len(names)
+    labels = {i: name.replace("(", "_").replace(")", "_").replace(",", "_").replace(":", "_").replace(";", "_")
+              for i, name in enumerate(names)}
+    heights = {i: 0.0 for i in range(n)}
+    for step, (left, right, height) in enumerate(merges):
+        labels[n + step] = (f"({labels[left]}:{height - heights[left]:.4f},"
+                            f"{labels[right]}:{height - heights[right]:.4f})")
+        heights[n + step] = height
+    return labels[n + len(merges) - 1 if merges else 0] + ";"
+
+
+def profile(rows):
+    """Column frequencies (length x 5: A, C, G, T, gap) of an alignment block."""
+    one_hot = _TO_PROFILE[rows]                   # depth x length x 5
+    return one_hot.mean(axis=0)
+
+
+def align_profiles(p, q):
+    """
+    Affine-gap profile-profile alignment (free end gaps). Rows are vectorized: horizontal gaps
+    come from a running maximum instead of a per-cell recurrence. Returns per-column ops
+    'M' (both), 'I' (column of p only) and 'D' (column of q only).
+    """
+    n, m = len(p), len(q)
+    if not n or not m:
+        return "I" * n + "D" * m
+    pq = p @ _SCORES
+    cols = np.arange(m + 1, dtype=np.float64)
+    flags = np.zeros((n + 1, m + 1), dtype=np.uint8)
+    prev_h = np.zeros(m + 1)
+    prev_f = np.full(m + 1, -np.inf)
+    last_col = np.zeros(n + 1)                    # H[i, m], for free trailing gaps in q
+    for i in range(1, n + 1):
+        diag = prev_h[:-1] + pq[i - 1] @ q.T
+        f_open, f_ext = prev_h[1:] + GAP_OPEN, prev_f[1:] + GAP_EXTEND
+        f = np.maximum(f_open, f_ext)
+        d = np.maximum(diag, f)
+        d_full = np.concatenate(([0.0], d))       # H[i, 0] = 0: leading gaps are free
+        # E[j] = max over j' < j of D[j'] + open + extend * (j - j' - 1)
+        shifted = d_full - GAP_EXTEND * cols
+        best = np.maximum.accumulate(shifted)
+        arg = np.maximum.accumulate(np.where(shifted >= best, np.arange(m + 1), 0))
+        e = best[:-1] + GAP_OPEN + GAP_EXTEND * cols[:-1]
+        h = np.maximum(d, e)
+        row = flags[i, 1:]
+        row |= np.where(f > diag, _D_FROM_F, 0).astype(np.uint8)
+        row |= np.where(f_ext > f_open, _F_EXTEND, 0).astype(np.uint8)
+        row |= np.where(arg[:-1] < cols[:-1], _E_EXTEND, 0).astype(np.uint8)
+        row |= np.where(e > d, _FROM_E, np.where(f > diag, _FROM_F, 0)).astype(np.uint8)
+        prev_h = np.concatenate(([0.0], h))
+        prev_f = np.concatenate(([-np.inf], f))
+        last_col[i] = h[-1]
+
+    # Best end on the last row or column; the rest is a free terminal gap
+    j_best = int(np.argmax(prev_h))
+    i_best = int(np.argmax(last_col))
+    if prev_h[j_best] >= last_col[i_best]:
+        i, j = n, j_best
+    else:
+        i, j = i_best, m
+    ops = ["D"] * (m - j) + ["I"] * (n - i)
+    state = "H"
+    while i > 0 and j > 0:
+        cell = flags[i, j]
+        if state == "H":
+            state = "E" if cell & _FROM_E else ("F" if cell & _FROM_F else "M")
+        if state == "M":
+            ops.append("M")
+            i, j = i - 1, j - 1
+            state = "H"
+        elif state == "F":
+            ops.append("I")
+            state = "F" if cell & _F_EXTEND else "H"
+            i -= 1
+        else:
+            ops.append("D")
+            j -= 1
+            # Opened from D at (i, j): a diagonal step or a vertical gap, never another E
+            state = "E" if cell & _E_EXTEND else ("F" if flags[i, j] & _D_FROM_F else "M")
+    ops.extend(["I"] * i + ["D"] * j)
+    return "".join(reversed(ops))
+
+
+def _apply(rows_a, rows_b, ops):
+    ops = np.frombuffer(ops.encode("ascii"), dtype=np.uint8)
+    length = len(ops)
+    merged = np.full((len(rows_a) + len(rows_b), length), GAP, dtype=np.uint8)
+    merged[:len(rows_a), ops != ord("D")] = rows_a
+    merged[len(rows_a):, ops != ord("I")] = rows_b
+    return merged
+
+
+def progressive_align(encoded, merges, progress=None):
+    """Aligns profiles bottom-up along the guide tree; returns (row order, alignment)."""
+    n = len(encoded)
+    blocks = {i: ([i], encoded[i][None, :]) for i in range(n)}
+    for step, (left, right, _) in enumerate(merges):
+        ids_a, rows_a = blocks.pop(left)
+        ids_b, rows_b = blocks.pop(right)
+        ops = align_profiles(profile(rows_a), profile(rows_b))
+        blocks[n + step] = (ids_a + ids_b, _apply(rows_a, rows_b, ops))
+        if progress:
+            progress(step + 1, len(merges))
+    return blocks.popitem()[1]
+
+
+def column_stats(alignment):
+    """Majority consensus (gaps included) and per-column Shannon entropy in bits."""
+    counts = np.stack([(alignment == s).sum(axis=0) for s in range(6)])       # 6 x length
+    consensus = SYMBOLS[np.argmax(counts, axis=0)].tobytes().decode("ascii")
+    freqs = counts / max(len(alignment), 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(freqs > 0, freqs * np.log2(freqs), 0.0).sum(axis=0)
+    return consensus, np.round(entropy + 0.0, 3)
+
+
+def gap_runs(row):
+    """[column, length] runs of gaps in one aligned row: a compact stand-in for the gapped string."""
+    edges = np.diff(np.concatenate(([0], (row == GAP).view(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return [[int(s), int(e - s)] for s, e in zip(starts, ends)]
+
+
+def aligned_strings(alignment):
+    return [SYMBOLS[row].tobytes().decode("ascii") for row in alignment]
+
+
+def align(records, workers=None, progress=None):
+    """
+    Progressive multiple alignment of [(id, sequence)]: k-mer distances, UPGMA guide tree,
+    then profile-profile alignment up the tree.
+    """
+    names = [rid for rid, _ in records]
+    encoded = [encode(seq.upper()) for _, seq in records]
+    distances = kmer_distances(encoded, workers=workers)
+    merges = upgma(distances)
+    if len(encoded) > 1:
+        order, alignment = progressive_align(encoded, merges, progress)
+    else:
+        order, alignment = [0], encoded[0][None, :]
+    # Back to input order
+    alignment = alignment[np.argsort(order)]
+    consensus, entropy = column_stats(alignment)
+    identity = (alignment == alignment[0]).all(axis=0) & (alignment[0] != GAP)
+    return {
+        "length": int(alignment.shape[1]),
+        "sequences": [{"id": names[i], "length": len(records[i][1]), "gaps": gap_runs(alignment[i])}
+                      for i in range(len(records))],
+        "consensus": consensus,
+        "variability": entropy.tolist(),
+        "identical_columns": int(identity.sum()),
+        "guide_tree": newick(merges, names),
+    }
+
+
+def to_fasta(records, result):
+    """Aligned FASTA rebuilt from the gap runs."""
+    lines = []
+    for (rid, sequence), entry in zip(records, result["sequences"]):
+        seq = sequence.upper()
+        parts, pos, column = [], 0, 0
+        for start, length in entry["gaps"]:
+            parts.append(seq[pos:pos + start - column])
+            pos += start - column
+            parts.append("-" * length)
+            column = start + length
+        parts.append(seq[pos:])
+        lines.append(f">{rid}")
+        lines.append("".join(parts))
+    return "\n".join(lines) + "\n"
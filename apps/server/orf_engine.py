@@ -0,0 +1,177 @@
+import numpy as np
+
+# NCBI codon order: bases T, C, A, G; codon index = 16 * b1 + 4 * b2 + b3
+BASES = "TCAG"
+CODONS = [a + b + c for a in BASES for b in BASES for c in BASES]
+UNKNOWN_CODON = 64
+
+STANDARD_AAS = "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"
+
+# NCBI translation tables as (name, amino-acid changes from the standard code, start codons)
+_TABLE_DIFFS = {
+    1: ("Standard", {}, ("TTG", "CTG", "ATG")),
+    2: ("Vertebrate Mitochondrial",
+        {"AGA": "*", "AGG": "*", "ATA": "M", "TGA": "W"},
+        ("ATT", "ATC", "ATA", "ATG", "GTG")),
+    3: ("Yeast Mitochondrial",
+        {"ATA": "M", "CTT": "T", "CTC": "T", "CTA": "T", "CTG": "T", "TGA": "W"},
+        ("ATA", "ATG", "GTG")),
+    4: ("Mold, Protozoan, and Coelenterate Mitochondrial; Mycoplasma/Spiroplasma",
+        {"TGA": "W"},
+        ("TTA", "TTG", "CTG", "ATT", "ATC", "ATA", "ATG", "GTG")),
+    5: ("Invertebrate Mitochondrial",
+        {"AGA": "S", "AGG": "S", "ATA": "M", "TGA": "W"},
+        ("TTG", "ATT", "ATC", "ATA", "ATG", "GTG")),
+    6: ("Ciliate, Dasycladacean and Hexamita Nuclear",
+        {"TAA": "Q", "TAG": "Q"},
+        ("ATG",)),
+    11: ("Bacterial, Archaeal and Plant Plastid", {},
+         ("TTG", "CTG", "ATT", "ATC", "ATA", "ATG", "GTG")),
+    12: ("Alternative Yeast Nuclear",
+         {"CTG": "S"},
+         ("CTG", "ATG")),
+}
+
+# Byte -> code lookup: T, C, A, G = 0..3, anything else = 4
+_CODES = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate(BASES):
+    _CODES[ord(_b)] = _i
+    _CODES[ord(_b.lower())] = _i
+_CODES[ord("U")] = _CODES[ord("u")] = 0
+
+# In TCAG order the complement of a code is code ^ 2 (T<->A, C<->G)
+_COMPLEMENT = np.array([2, 3, 0, 1, 4], dtype=np.uint8)
+
+
+class GeneticCode:
+    """65-entry lookup tables (64 codons + unknown) for one NCBI translation table."""
+
+    def __init__(self, table_id, name, amino_acids, starts):
+        self.id = table_id
+        self.name = name
+        self.amino_acids = np.frombuffer((amino_acids + "X").encode("ascii"), dtype=np.uint8)
+        self.is_stop = self.amino_acids == ord("*")
+        self.is_start = np.zeros(UNKNOWN_CODON + 1, dtype=bool)
+        self.is_start[[CODONS.index(c) for c in starts]] = True
+        self.is_atg = np.zeros(UNKNOWN_CODON + 1, dtype=bool)
+        self.is_atg[CODONS.index("ATG")] = True
+
+
+def _build_tables():
+    tables = {}
+    for table_id, (name, changes, starts) in _TABLE_DIFFS.items():
+        aas = list(STANDARD_AAS)
+        for codon, aa in changes.items():
+            aas[CODONS.index(codon)] = aa
+        tables[table_id] = GeneticCode(table_id, name, "".join(aas), starts)
+    return tables
+
+
+GENETIC_CODES = _build_tables()
+
+
+def encode(sequence):
+    return _CODES[np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)]
+
+
+def codon_indices(codes):
+    """Codon index starting at every position (len - 2 entries); codons with ambiguous bases map to 64."""
+    if len(codes) < 3:
+        return np.zeros(0, dtype=np.uint8)
+    a, b, c = codes[:-2], codes[1:-1], codes[2:]
+    idx = (a << 4) | (b << 2) | c
+    idx[(a > 3) | (b > 3) | (c > 3)] = UNKNOWN_CODON
+    return idx
+
+
+def _frames(codes):
+    """Yields (label, codon indices) for the six reading frames, +1..+3 then -1..-3."""
+    reverse = _COMPLEMENT[codes[::-1]]
+    for sign, strand in (("+", codes), ("-", reverse)):
+        per_position = codon_indices(strand)
+        for offset in range(3):
+            yield f"{sign}{offset + 1}", offset, per_position[offset::3]
+
+
+def _orfs_in_frame(idx, code, min_length, alternative_starts, include_partial):
+    """(start codon, stop codon) index pairs for ORFs in one frame; stop is len(idx) when open-ended."""
+    starts = np.flatnonzero((code.is_start if alternative_starts else code.is_atg)[idx])
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    stops = np.flatnonzero(code.is_stop[idx])
+    # Next in-frame stop for every start; keep only the first (outermost) start before each stop
+    which = np.searchsorted(stops, starts)
+    first = np.unique(which, return_index=True)[1]
+    starts, which = starts[first], which[first]
+    ends = np.append(stops, len(idx))[which]
+    keep = (ends - starts) >= min_length
+    if not include_partial:
+        keep &= which < len(stops)
+    return starts[keep], ends[keep]
+
+
+def find_orfs(sequence, table=1, min_length=30, alternative_starts=False,
+              include_partial=False, include_frames=True):
+    """
+    Six-frame translation and ORF detection.
+    min_length is in amino acids (stop excluded). Coordinates are 1-based and inclusive on the
+    forward strand, and cover the stop codon when there is one.
+    """
+    if table not in GENETIC_CODES:
+        raise ValueError(f"Unsupported genetic code table: {table}")
+    code = GENETIC_CODES[table]
+    sequence = sequence.upper()
+    codes = encode(sequence)
+    n = len(codes)
+
+    frames = []
+    orfs = []
+    for label, offset, idx in _frames(codes):
+        protein = code.amino_acids[idx].tobytes().decode("ascii")
+        if include_frames:
+            frames.append({"frame": label, "protein": protein})
+
+        starts, ends = _orfs_in_frame(idx, code, min_length, alternative_starts, include_partial)
+        for s, e in zip(starts.tolist(), ends.tolist()):
+            complete = e < len(idx)
+            # Strand-local 0-based span, including the stop codon when present
+            lo = offset + 3 * s
+            hi = offset + 3 * (e + 1 if complete else e) - 1
+            if label[0] == "+":
+                start, end = lo + 1, hi + 1
+            else:
+                start, end = n - hi, n - lo
+            # Alternative initiators are still read as methionine
+            peptide = "M" + protein[s + 1:e]
+            orfs.append({
+                "frame": label,
+                "strand": label[0],
+                "start": start,
+                "end": end,
+                "length_nt": end - start + 1,
+                "length_aa": len(peptide),
+                "start_codon": CODONS[idx[s]],
+                "complete": complete,
+                "protein": peptide,
+            })
+
+    orfs.sort(key=lambda o: (-o["length_aa"], o["start"]))
+    result = {
+        "table": code.id,
+        "table_name": code.name,
+        "length": n,
+        "orfs": orfs,
+    }
+    if include_frames:
+        result["frames"] = frames
+    return result
+
+
+def translate(sequence, table=1, frame=1):
+    """Translates a single frame (1..3 forward, -1..-3 reverse) to a protein string."""
+    code = GENETIC_CODES[table]
+    label = f"{'+' if frame > 0 else '-'}{abs(frame)}"
+    for name, _, idx in _frames(encode(sequence.upper())):
+        if name == label:
+            return code.amino_acids[idx].tobytes().decode("ascii")
+    raise ValueError(f"Invalid frame: {frame}")
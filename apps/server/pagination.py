@@ -0,0 +1,93 @@
+"""
+Cursor pagination and NDJSON streaming for list endpoints.
+
+A page is the same JSON array the endpoint always returned, cut to ?limit= rows
+(LIST_PAGE_SIZE by default). When more rows follow, the response carries X-Next-Cursor and
+a Link rel="next" header; pass the cursor back as ?cursor= for the next page. The cursor is
+the last row's key, so every page is an index range scan (no OFFSET) and stays stable
+while rows are inserted.
+
+?format=ndjson (or Accept: application/x-ndjson) streams every matching row instead, one
+JSON object per line, from a server-side cursor (yield_per), so memory stays flat however
+many rows there are.
+
+    curl -H 'Accept: application/x-ndjson' .../api/ai/usage > usage.ndjson
+"""
+import os
+import json
+import base64
+from itertools import islice
+from urllib.parse import urlencode
+from flask import request, jsonify, Response, stream_with_context
+from db_config import carry_route
+
+PAGE_SIZE = int(os.environ.get('LIST_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('LIST_MAX_PAGE_SIZE', 1000))
+STREAM_BATCH = int(os.environ.get('LIST_STREAM_BATCH', 500))
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps([value]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The key value inside a cursor; ValueError if it was not made by encode_cursor."""
+    try:
+        value, = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(value, (int, str)):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def wants_stream():
+    return request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+
+def _next_link(cursor):
+    args = request.args.to_dict(flat=False)
+    args['cursor'] = [cursor]
+    return f'<{request.base_url}?{urlencode(args, doseq=True)}>; rel="next"'
+
+
+def paginate(query, key, serialize, descending=False):
+    """Responds with one page of `query` in `key` order, or all of it as NDJSON.
+
+    key is a unique, indexed column (usually the primary key); rows are ORM objects or
+    column rows that expose it under the same name. Call with no order_by on the query.
+    """
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"msg": "Invalid cursor"}), 400
+        query = query.filter(key < after if descending else key > after)
+    query = query.order_by(key.desc() if descending else key.asc())
+
+    if wants_stream():
+        # Unbounded without ?limit=; a negative LIMIT would fail (Postgres) after the headers went out
+        limit = request.args.get('limit', type=int)
+        rows = (query.limit(max(limit, 1)) if limit is not None else query).yield_per(STREAM_BATCH)
+
+        def generate():
+            # One chunk per batch: compress_response flushes after every chunk
+            iterator = iter(rows)
+            while True:
+                batch = list(islice(iterator, STREAM_BATCH))
+                if not batch:
+                    break
+                yield "".join(json.dumps(serialize(row), default=str) + "\n" for row in batch)
+        return Response(stream_with_context(carry_route(generate())), mimetype='application/x-ndjson',
+                        headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'})
+
+    limit = max(1, min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    rows = query.limit(limit + 1).all()
+    response = jsonify([serialize(row) for row in rows[:limit]])
+    if len(rows) > limit:
+        next_cursor = encode_cursor(getattr(rows[limit - 1], key.key))
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = _next_link(next_cursor)
+    return response
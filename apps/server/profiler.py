@@ -0,0 +1,280 @@
+"""
+On-demand profiling for a live worker.
+
+SamplingProfiler runs on a native OS thread (not a green one, so it keeps sampling while a
+greenlet hogs the hub) and reads sys._current_frames() every interval. Under eventlet every
+request shares the main thread, so a greenlet switch hook tags each sample with the request
+the running greenlet is serving. Output is collapsed stacks ("root;caller;callee count"),
+which flamegraph.pl, speedscope and inferno read directly.
+
+RequestProfile is plain cProfile for one request. Under eventlet it also sees whatever other
+greenlets run while that request waits.
+"""
+import os
+import sys
+import time
+import uuid
+import marshal
+import pstats
+import cProfile
+import importlib
+import threading
+from io import StringIO
+from collections import Counter, OrderedDict
+
+MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS', 120))
+KEEP_PROFILES = int(os.environ.get('PROFILER_KEEP', 10))
+MAX_DEPTH = 128
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+
+def _native(name):
+    # The unpatched module when eventlet has monkey-patched it
+    try:
+        from eventlet import patcher
+        return patcher.original(name)
+    except ImportError:
+        return importlib.import_module(name)
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    parts = filename.replace("\\", "/").rsplit("/", 2)
+    short = "/".join(parts[-2:]) if len(parts) > 1 else filename
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, seconds, interval):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = "sampling"
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at = None
+        self.finished_at = None
+        self.samples = 0
+        self.stacks = Counter()
+        self._stop = False
+        self._labels = {}
+        self._current = None
+        self._previous_trace = None
+        self._traced_thread = None
+        self._hub = None
+
+    @property
+    def running(self):
+        return self.started_at is not None and self.finished_at is None
+
+    def start(self):
+        """Call from the serving thread: its greenlets are the ones that get tagged."""
+        self.started_at = time.time()
+        self._traced_thread = _native('_thread').get_ident()
+        if greenlet is not None:
+            self._current = greenlet.getcurrent()
+            try:
+                from eventlet import hubs
+                self._hub = hubs.get_hub().greenlet
+            except ImportError:
+                pass
+            previous = greenlet.settrace(self._on_switch)
+            if isinstance(getattr(previous, "__self__", None), SamplingProfiler):
+                # An earlier run's hook that has not seen a switch since it finished
+                previous = previous.__self__._previous_trace
+            self._previous_trace = previous
+        sampler = _native('threading').Thread(target=self._run, name="sampling-profiler", daemon=True)
+        sampler.start()
+
+    def stop(self):
+        self._stop = True
+
+    def label(self, name):
+        """Names the current greenlet (e.g. "GET /api/projects") for samples taken while it runs."""
+        if greenlet is not None:
+            self._labels[greenlet.getcurrent()] = name
+
+    def _on_switch(self, event, args):
+        if event in ("switch", "throw"):
+            self._current = args[1]
+        if self.finished_at is not None:
+            # greenlet.settrace is per thread, so the hook removes itself from the serving thread
+            greenlet.settrace(self._previous_trace)
+        elif self._previous_trace:
+            self._previous_trace(event, args)
+
+    def _root(self, ident, names):
+        if ident != self._traced_thread:
+            return names.get(ident, f"thread {ident}")
+        current = self._current
+        if current is None:
+            return "main"
+        if current is self._hub:
+            return "hub (idle or scheduling)"
+        return self._labels.get(current) or "greenlet"
+
+    def _run(self):
+        sleep = _native('time').sleep
+        own = _native('_thread').get_ident()
+        deadline = time.monotonic() + self.seconds
+        try:
+            while not self._stop and time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    stack = []
+                    while frame is not None and len(stack) < MAX_DEPTH:
+                        stack.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    stack.append(self._root(ident, names))
+                    self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+                sleep(self.interval)
+        finally:
+            self.finished_at = time.time()
+            self._labels.clear()
+
+    def _stacks(self):
+        # The sampler thread may still be adding stacks; dict() copies in one step under the GIL
+        return Counter(dict(self.stacks))
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks().most_common())
+
+    def summary(self, top=25):
+        stacks = self._stacks()
+        own, inclusive, roots = Counter(), Counter(), Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            roots[frames[0]] += count
+            if len(frames) > 1:
+                own[frames[-1]] += count
+            for frame in set(frames[1:]):
+                inclusive[frame] += count
+        total = sum(stacks.values()) or 1
+        share = lambda counter: [{"frame": f, "samples": n, "percent": round(100 * n / total, 1)}
+                                 for f, n in counter.most_common(top)]
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": "running" if self.running else "done",
+            "seconds": self.seconds,
+            "interval_ms": round(self.interval * 1000, 2),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "samples": self.samples,
+            "roots": share(roots),
+            "self": share(own),
+            "inclusive": share(inclusive),
+        }
+
+
+class RequestProfile:
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = "request"
+        self.name = name
+        self.started_at = time.time()
+        self.finished_at = None
+        self.profile = cProfile.Profile()
+        self.stats = None
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.stats = pstats.Stats(self.profile)
+        self.finished_at = time.time()
+
+    def pstats_dump(self):
+        """Binary .prof contents for snakeviz / pstats.Stats(path)."""
+        return marshal.dumps(self.stats.stats)
+
+    def text(self, top=60, sort="cumulative"):
+        # Sorting reorders a Stats in place, so print from a copy
+        out = StringIO()
+        stats = pstats.Stats(stream=out)
+        stats.add(self.stats)
+        stats.sort_stats(sort).print_stats(top)
+        return out.getvalue()
+
+    def summary(self):
+        stats = self.stats
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "request": self.name,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "calls": stats.total_calls,
+            "seconds": round(stats.total_tt, 6),
+        }
+
+
+class ProfileStore:
+    """The last KEEP_PROFILES results of this worker, at most one running sampler and one profiled request."""
+
+    def __init__(self, keep=KEEP_PROFILES):
+        self.keep = keep
+        self.active = None
+        self.request_active = None
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start_sampling(self, seconds, interval):
+        with self._lock:
+            if self.active and self.active.running:
+                return None
+            profiler = self.active = SamplingProfiler(seconds, interval)
+            self._add(profiler)
+        profiler.start()
+        return profiler
+
+    def start_request(self, name):
+        # cProfile hooks the thread (every greenlet on it under eventlet, and the whole
+        # interpreter on 3.12+), so overlapping request profiles would corrupt or refuse each other
+        with self._lock:
+            if self.request_active is not None:
+                return None
+            profile = self.request_active = RequestProfile(name)
+        profile.start()
+        return profile
+
+    def finish_request(self, profile):
+        profile.stop()
+        with self._lock:
+            if self.request_active is profile:
+                self.request_active = None
+            self._add(profile)
+
+    def add(self, profile):
+        with self._lock:
+            self._add(profile)
+
+    def _add(self, profile):
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.keep:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        return self._profiles.get(profile_id)
+
+    @property
+    def sampling(self):
+        return self.active is not None and self.active.running
+
+    def label(self, name):
+        if self.sampling:
+            self.active.label(name)
+
+    def snapshot(self):
+        return [p.summary() if p.kind == "request" else
+                {k: v for k, v in p.summary(top=0).items() if k not in ("roots", "self", "inclusive")}
+                for p in reversed(self._profiles.values())]
+
+
+profiles = ProfileStore()
@@ -0,0 +1,533 @@
+import os
+import re
+import zlib
+import html
+import datetime
+
+import numpy as np
+
+from batch_engine import analyze_batch, GUIDE_LENGTH
+from orf_engine import find_orfs
+
+CHART_POINTS = 400          # charts are downsampled to at most this many points
+TABLE_ROWS = 25
+ORF_MIN_LENGTH = 100        # amino acids
+ORF_TRACK_LIMIT = 500
+RESULT_FIELDS_LIMIT = 60
+FORMATS = ("html", "pdf")
+MODES = ("researcher", "student")
+
+BRAND = (30, 132, 168)
+MUTED = (148, 163, 184)
+INK = (30, 41, 59)
+BASE_COLORS = {"A": (34, 197, 94), "C": (59, 130, 246), "G": (234, 179, 8), "T": (239, 68, 68), "Other": (148, 163, 184)}
+FOOTER = "GENE FORGE LABS • ANALYTICAL INTELLIGENCE LAYER"
+
+
+# --- report model ---
+
+def gc_profile(sequence, points=CHART_POINTS):
+    """Windowed GC% downsampled to at most `points` windows; returns (window size, starts, values)."""
+    n = len(sequence)
+    if not n:
+        return 0, [], []
+    window = max(-(-n // points), 1)
+    raw = np.frombuffer(sequence.encode("ascii", errors="replace"), dtype=np.uint8)
+    gc = ((raw == ord("G")) | (raw == ord("C"))).astype(np.int64)
+    edges = np.arange(0, n, window)
+    sizes = np.diff(np.append(edges, n))
+    values = np.round(np.add.reduceat(gc, edges) * 100.0 / sizes, 2)
+    return window, (edges + 1).tolist(), values.tolist()
+
+
+def _scalar_fields(results, prefix="", out=None):
+    """Flattens saved results to (path, value) pairs of scalars and short lists."""
+    out = [] if out is None else out
+    for key, value in (results or {}).items():
+        if len(out) >= RESULT_FIELDS_LIMIT:
+            break
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            _scalar_fields(value, path + ".", out)
+        elif isinstance(value, list):
+            out.append((path, f"{len(value)} items"))
+        elif isinstance(value, (int, float, str, bool)) or value is None:
+            text = str(value)
+            out.append((path, text if len(text) <= 80 else text[:77] + "..."))
+    return out
+
+
+def build_report(sequence, results=None, annotations=None, narrative=None, meta=None):
+    """
+    Report model: a title, metadata and sections of blocks (kv, table, chart, markdown).
+    Everything is derived from the stored sequence, so reports do not depend on what the
+    browser happened to have loaded.
+    """
+    sequence = (sequence or "").upper()
+    meta = dict(meta or {})
+    record = next(analyze_batch([("sequence", sequence)]))
+    sections = []
+
+    counts = record["base_counts"]
+    sections.append({"title": "Base Composition & Statistics", "blocks": [
+        {"type": "kv", "items": [
+            ("Sequence length", f"{len(sequence):,} bp"),
+            ("GC content", f"{record['gc_content']}%"),
+        ] + [(f"{base} count", f"{count:,}") for base, count in counts.items()]},
+        {"type": "chart", "kind": "bar", "title": "Nucleotide counts",
+         "labels": list(counts), "values": list(counts.values()),
+         "colors": [BASE_COLORS[b] for b in counts]},
+    ]})
+
+    window, starts, values = gc_profile(sequence)
+    sections.append({"title": "GC Density Profile", "blocks": [
+        {"type": "chart", "kind": "line", "title": f"GC% per {window:,} bp window",
+         "x": starts, "values": values, "y_range": (0, 100), "length": len(sequence)},
+    ]})
+
+    orfs = find_orfs(sequence, min_length=ORF_MIN_LENGTH, include_frames=False)["orfs"] if sequence else []
+    orfs.sort(key=lambda o: -o["length_aa"])
+    sections.append({"title": "Open Reading Frame (ORF) Analysis", "blocks": [
+        {"type": "kv", "items": [(f"ORFs >= {ORF_MIN_LENGTH} aa", f"{len(orfs):,}")]},
+        {"type": "chart", "kind": "track", "title": "ORF positions (longest first)", "length": len(sequence),
+         "intervals": [(o["start"], o["end"], o["strand"]) for o in orfs[:ORF_TRACK_LIMIT]]},
+        {"type": "table", "columns": ["Frame", "Start", "End", "Length (aa)", "Start codon"],
+         "rows": [[o["frame"], o["start"], o["end"], o["length_aa"], o["start_codon"]] for o in orfs[:TABLE_ROWS]]},
+    ]})
+
+    sites = record["restriction_sites"]
+    per_enzyme = {}
+    for enzyme, position in zip(sites["enzyme"], sites["position"]):
+        per_enzyme.setdefault(enzyme, []).append(position)
+    sections.append({"title": "Endonuclease Cleavage Map", "blocks": [
+        {"type": "table", "columns": ["Enzyme", "Sites", "First positions"],
+         "rows": [[enzyme, len(p), ", ".join(map(str, p[:8])) + (" ..." if len(p) > 8 else "")]
+                  for enzyme, p in sorted(per_enzyme.items())]},
+    ]})
+
+    guides = record.get("crispr_guides") or {"position": [], "gc_content": []}
+    guide_rows = [[p, sequence[p - 1:p - 1 + GUIDE_LENGTH], gc]
+                  for p, gc in zip(guides["position"], guides["gc_content"])]
+    sections.append({"title": "CRISPR-Cas9 Guide Design", "blocks": [
+        {"type": "kv", "items": [("Candidate guides (NGG)", f"{len(guide_rows):,}")]},
+        {"type": "table", "columns": ["Position", "Guide", "GC%"], "rows": guide_rows[:TABLE_ROWS]},
+    ]})
+
+    if annotations:
+        sections.append({"title": "Structural Annotations", "blocks": [
+            {"type": "table", "columns": ["Feature", "Count", "Bases"],
+             "rows": [[kind.replace("_", " "), v["count"], v["bases"]] for kind, v in annotations.items() if v["count"]]},
+        ]})
+
+    fields = _scalar_fields(results)
+    if fields:
+        sections.append({"title": "Saved Analysis Results", "blocks": [
+            {"type": "table", "columns": ["Field", "Value"], "rows": [list(f) for f in fields]},
+        ]})
+
+    if narrative:
+        sections.append({"title": "AI Interpretation", "blocks": [{"type": "markdown", "text": narrative}]})
+
+    meta.setdefault("generated", datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"))
+    meta.setdefault("title", "Genomic Analysis Report")
+    return {"title": meta["title"], "meta": meta, "sections": sections}
+
+
+# --- HTML ---
+
+_CSS = """
+body{font-family:Helvetica,Arial,sans-serif;color:#1e293b;margin:0;background:#f8fafc}
+header{background:#fff;border-bottom:1px solid #e2e8f0;padding:24px 40px}
+header h1{color:#1e84a8;margin:0;font-size:28px;letter-spacing:.04em}
+header p{color:#94a3b8;margin:4px 0 0;font-size:12px;text-transform:uppercase}
+main{max-width:960px;margin:0 auto;padding:24px 40px}
+section{background:#fff;border:1px solid #e2e8f0;border-radius:8px;padding:20px 24px;margin-bottom:20px}
+h2{color:#1e84a8;font-size:18px;margin:0 0 12px}
+table{border-collapse:collapse;width:100%;font-size:13px;margin:8px 0}
+th,td{text-align:left;padding:4px 8px;border-bottom:1px solid #e2e8f0}
+th{color:#64748b;font-weight:600}
+dl{display:grid;grid-template-columns:max-content 1fr;gap:4px 16px;font-size:14px}
+dt{color:#64748b}dd{margin:0;font-weight:600}
+code{font-family:monospace}
+footer{text-align:center;color:#94a3b8;font-size:11px;padding:16px}
+"""
+
+
+def _rgb(color):
+    return "rgb(%d,%d,%d)" % color
+
+
+def _svg_chart(block, width=880, height=220):
+    pad_l, pad_b, pad_t = 48, 24, 24
+    plot_w, plot_h = width - pad_l - 12, height - pad_b - pad_t
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" viewBox="0 0 {width} {height}" role="img">',
+             f'<text x="{pad_l}" y="16" font-size="12" fill="#64748b">{html.escape(block["title"])}</text>',
+             f'<line x1="{pad_l}" y1="{pad_t + plot_h}" x2="{pad_l + plot_w}" y2="{pad_t + plot_h}" stroke="#cbd5e1"/>']
+    if block["kind"] == "bar":
+        peak = max(block["values"] + [1])
+        slot = plot_w / max(len(block["values"]), 1)
+        for i, (label, value, color) in enumerate(zip(block["labels"], block["values"], block["colors"])):
+            h = plot_h * value / peak
+            x = pad_l + i * slot + slot * 0.2
+            parts.append(f'<rect x="{x:.1f}" y="{pad_t + plot_h - h:.1f}" width="{slot * 0.6:.1f}" '
+                         f'height="{h:.1f}" fill="{_rgb(color)}"/>')
+            parts.append(f'<text x="{x + slot * 0.3:.1f}" y="{height - 6}" font-size="11" text-anchor="middle" '
+                         f'fill="#475569">{html.escape(label)} ({value:,})</text>')
+    elif block["kind"] == "line":
+        lo, hi = block["y_range"]
+        span = max(block["length"], 1)
+        points = " ".join(f"{pad_l + plot_w * (x - 1) / span:.1f},{pad_t + plot_h * (1 - (v - lo) / (hi - lo)):.1f}"
+                          for x, v in zip(block["x"], block["values"]))
+        parts.append(f'<polyline fill="none" stroke="{_rgb(BRAND)}" stroke-width="1.5" points="{points}"/>')
+        for tick in (lo, (lo + hi) / 2, hi):
+            y = pad_t + plot_h * (1 - (tick - lo) / (hi - lo))
+            parts.append(f'<text x="{pad_l - 6}" y="{y + 4:.1f}" font-size="10" text-anchor="end" fill="#94a3b8">{tick:g}</text>')
+    else:
+        span = max(block["length"], 1)
+        for start, end, strand in block["intervals"]:
+            y = pad_t + (plot_h * 0.25 if strand == "+" else plot_h * 0.6)
+            parts.append(f'<rect x="{pad_l + plot_w * (start - 1) / span:.1f}" y="{y:.1f}" '
+                         f'width="{max(plot_w * (end - start + 1) / span, 1):.1f}" height="{plot_h * 0.2:.1f}" '
+                         f'fill="{_rgb(BRAND if strand == "+" else (234, 88, 12))}" fill-opacity="0.7"/>')
+        parts.append(f'<text x="{pad_l - 6}" y="{pad_t + plot_h * 0.37:.1f}" font-size="10" text-anchor="end" fill="#94a3b8">+</text>')
+        parts.append(f'<text x="{pad_l - 6}" y="{pad_t + plot_h * 0.72:.1f}" font-size="10" text-anchor="end" fill="#94a3b8">−</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def _markdown_html(text):
+    """Small Markdown subset (headings, bullets, bold, italics, code) for AI narratives."""
+    out, in_list = [], False
+    for line in html.escape(text).splitlines():
+        stripped = line.strip()
+        inline = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", stripped)
+        inline = re.sub(r"(?<!\*)\*(?!\s)(.+?)\*", r"<em>\1</em>", inline)
+        inline = re.sub(r"`(.+?)`", r"<code>\1</code>", inline)
+        bullet = re.match(r"^([-*]|\d+\.)\s+(.*)", inline)
+        if bullet and not stripped.startswith("**"):
+            if not in_list:
+                out.append("<ul>")
+                in_list = True
+            out.append(f"<li>{bullet.group(2)}</li>")
+            continue
+        if in_list:
+            out.append("</ul>")
+            in_list = False
+        heading = re.match(r"^(#{1,4})\s+(.*)", inline)
+        if heading:
+            level = min(len(heading.group(1)) + 2, 6)
+            out.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif inline:
+            out.append(f"<p>{inline}</p>")
+    if in_list:
+        out.append("</ul>")
+    return "\n".join(out)
+
+
+def render_html(report):
+    meta = report["meta"]
+    body = []
+    for section in report["sections"]:
+        body.append(f'<section><h2>{html.escape(section["title"])}</h2>')
+        for block in section["blocks"]:
+            if block["type"] == "kv":
+                body.append("<dl>" + "".join(f"<dt>{html.escape(str(k))}</dt><dd>{html.escape(str(v))}</dd>"
+                                             for k, v in block["items"]) + "</dl>")
+            elif block["type"] == "table":
+                if not block["rows"]:
+                    body.append("<p>None found.</p>")
+                    continue
+                head = "".join(f"<th>{html.escape(c)}</th>" for c in block["columns"])
+                rows = "".join("<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>"
+                               for row in block["rows"])
+                body.append(f"<table><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>")
+            elif block["type"] == "chart":
+                body.append(_svg_chart(block))
+            elif block["type"] == "markdown":
+                body.append(_markdown_html(block["text"]))
+        body.append("</section>")
+    subtitle = " • ".join(html.escape(str(meta[k])) for k in ("subject", "generated", "mode") if meta.get(k))
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+            f'<title>{html.escape(report["title"])}</title><style>{_CSS}</style></head><body>'
+            f'<header><h1>GENEFORGE</h1><p>{html.escape(report["title"])}</p><p>{subtitle}</p></header>'
+            f'<main>{"".join(body)}</main><footer>{html.escape(FOOTER)}</footer></body></html>')
+
+
+# --- PDF ---
+
+PAGE_W, PAGE_H = 595.28, 841.89      # A4 in points
+MARGIN = 48
+
+
+def _pdf_text(text):
+    text = str(text).encode("cp1252", errors="replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_width(text, size):
+    # Helvetica averages a little over half an em per character
+    return len(str(text)) * size * 0.52
+
+
+class PdfDocument:
+    """Minimal multi-page PDF writer: Helvetica text, filled rectangles and lines."""
+
+    def __init__(self, title):
+        self.title = title
+        self.pages = []
+        self.ops = None
+        self.y = 0
+
+    # drawing primitives (PDF origin is bottom-left)
+    def _color(self, color, stroke=False):
+        self.ops.append("%.3f %.3f %.3f %s" % (color[0] / 255, color[1] / 255, color[2] / 255, "RG" if stroke else "rg"))
+
+    def text(self, x, y, text, size=10, bold=False, color=INK):
+        self._color(color)
+        self.ops.append(f"BT /{'F2' if bold else 'F1'} {size} Tf {x:.2f} {y:.2f} Td ({_pdf_text(text)}) Tj ET")
+
+    def rect(self, x, y, w, h, color):
+        self._color(color)
+        self.ops.append(f"{x:.2f} {y:.2f} {w:.2f} {h:.2f} re f")
+
+    def line(self, points, color, width=1.0):
+        self._color(color, stroke=True)
+        path = " ".join(f"{x:.2f} {y:.2f} {'m' if i == 0 else 'l'}" for i, (x, y) in enumerate(points))
+        self.ops.append(f"{width:.2f} w {path} S")
+
+    # flow layout
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.rect(0, PAGE_H - 56, PAGE_W, 56, (248, 250, 252))
+        self.line([(0, PAGE_H - 56), (PAGE_W, PAGE_H - 56)], (226, 232, 240), 0.5)
+        self.text(MARGIN, PAGE_H - 32, "GENEFORGE", 16, bold=True, color=BRAND)
+        self.text(MARGIN, PAGE_H - 46, self.title.upper(), 8, color=MUTED)
+        self.text(PAGE_W / 2 - 10, 24, str(len(self.pages)), 9, color=MUTED)
+        self.y = PAGE_H - 84
+
+    def ensure(self, height):
+        if self.y - height < 48:
+            self.new_page()
+
+    def paragraph(self, text, size=10, bold=False, color=INK, indent=0):
+        width = PAGE_W - 2 * MARGIN - indent
+        words, line = str(text).split(), ""
+        lines = []
+        for word in words:
+            candidate = f"{line} {word}".strip()
+            if _text_width(candidate, size) > width and line:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        if line:
+            lines.append(line)
+        for text_line in lines:
+            self.ensure(size * 1.4)
+            self.text(MARGIN + indent, self.y - size, text_line, size, bold, color)
+            self.y -= size * 1.4
+        self.y -= size * 0.4
+
+    def render(self):
+        objects = [
+            "<< /Type /Catalog /Pages 2 0 R >>",
+            None,                                     # page tree, filled in below
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+            f"<< /Title ({_pdf_text(self.title)}) /Producer (GeneForge) >>",
+        ]
+        kids = []
+        streams = {}
+        for ops in self.pages:
+            content = zlib.compress("\n".join(ops).encode("latin-1"))
+            objects.append(None)
+            streams[len(objects)] = content
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_W} {PAGE_H}] "
+                           f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {len(objects)} 0 R >>")
+            kids.append(f"{len(objects)} 0 R")
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode()
+            if number in streams:
+                data = streams[number]
+                out += f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode() + data + b"\nendstream"
+            else:
+                out += body.encode("latin-1")
+            out += b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 5 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(out)
+
+
+def _pdf_chart(doc, block, height=150):
+    doc.ensure(height + 24)
+    doc.text(MARGIN, doc.y - 10, block["title"], 9, color=(100, 116, 139))
+    top = doc.y - 18
+    left, width = MARGIN + 30, PAGE_W - 2 * MARGIN - 30
+    bottom = top - height
+    doc.line([(left, bottom), (left + width, bottom)], (203, 213, 225), 0.5)
+    if block["kind"] == "bar":
+        peak = max(block["values"] + [1])
+        slot = width / max(len(block["values"]), 1)
+        for i, (label, value, color) in enumerate(zip(block["labels"], block["values"], block["colors"])):
+            h = (height - 20) * value / peak
+            doc.rect(left + i * slot + slot * 0.2, bottom, slot * 0.6, h, color)
+            caption = f"{label} ({value:,})"
+            doc.text(left + i * slot + slot / 2 - _text_width(caption, 8) / 2, bottom - 12, caption, 8, color=(71, 85, 105))
+    elif block["kind"] == "line":
+        lo, hi = block["y_range"]
+        span = max(block["length"], 1)
+        points = [(left + width * (x - 1) / span, bottom + height * (v - lo) / (hi - lo))
+                  for x, v in zip(block["x"], block["values"])]
+        if len(points) > 1:
+            doc.line(points, BRAND, 0.8)
+        for tick in (lo, (lo + hi) / 2, hi):
+            doc.text(MARGIN, bottom + height * (tick - lo) / (hi - lo) - 3, f"{tick:g}", 7, color=MUTED)
+    else:
+        span = max(block["length"], 1)
+        for start, end, strand in block["intervals"]:
+            y = bottom + (height * 0.55 if strand == "+" else height * 0.2)
+            doc.rect(left + width * (start - 1) / span, y, max(width * (end - start + 1) / span, 0.5), height * 0.2,
+                     BRAND if strand == "+" else (234, 88, 12))
+        doc.text(MARGIN + 16, bottom + height * 0.62, "+", 9, color=MUTED)
+        doc.text(MARGIN + 16, bottom + height * 0.27, "-", 9, color=MUTED)
+    doc.y = bottom - 22
+
+
+def _pdf_table(doc, block):
+    if not block["rows"]:
+        doc.paragraph("None found.", 9, color=MUTED)
+        return
+    width = PAGE_W - 2 * MARGIN
+    col_w = width / len(block["columns"])
+    max_chars = int(col_w / (8 * 0.52)) - 1
+
+    def row(values, bold=False, color=INK):
+        doc.ensure(14)
+        for i, value in enumerate(values):
+            text = str(value)
+            if len(text) > max_chars:
+                text = text[:max(max_chars - 3, 1)] + "..."
+            doc.text(MARGIN + i * col_w, doc.y - 10, text, 8, bold, color)
+        doc.y -= 14
+        doc.line([(MARGIN, doc.y + 2), (MARGIN + width, doc.y + 2)], (226, 232, 240), 0.4)
+
+    row(block["columns"], bold=True, color=(100, 116, 139))
+    for values in block["rows"]:
+        row(values)
+    doc.y -= 8
+
+
+def _pdf_markdown(doc, text):
+    for line in text.splitlines():
+        stripped = re.sub(r"\*\*(.+?)\*\*|`(.+?)`", lambda m: m.group(1) or m.group(2), line.strip())
+        if not stripped:
+            continue
+        heading = re.match(r"^(#{1,4})\s+(.*)", stripped)
+        bullet = re.match(r"^([-*]|\d+\.)\s+(.*)", stripped)
+        if heading:
+            doc.y -= 4
+            doc.paragraph(heading.group(2), 13 - len(heading.group(1)), bold=True, color=BRAND)
+        elif bullet:
+            marker = "•" if bullet.group(1) in "-*" else bullet.group(1)
+            doc.ensure(14)
+            doc.text(MARGIN + 6, doc.y - 10, marker, 10)
+            doc.paragraph(bullet.group(2), 10, indent=20)
+        else:
+            doc.paragraph(stripped, 10)
+
+
+def render_pdf(report):
+    meta = report["meta"]
+    doc = PdfDocument(report["title"])
+    doc.new_page()
+    doc.paragraph(report["title"], 22, bold=True, color=BRAND)
+    for key in ("subject", "version", "mode", "generated"):
+        if meta.get(key):
+            doc.paragraph(f"{key.title()}: {meta[key]}", 11, color=(71, 85, 105))
+    doc.y -= 12
+    for section in report["sections"]:
+        doc.ensure(60)
+        doc.paragraph(section["title"], 15, bold=True, color=BRAND)
+        for block in section["blocks"]:
+            if block["type"] == "kv":
+                for key, value in block["items"]:
+                    doc.ensure(14)
+                    doc.text(MARGIN, doc.y - 10, key, 9, color=(100, 116, 139))
+                    doc.text(MARGIN + 170, doc.y - 10, value, 9, bold=True)
+                    doc.y -= 14
+                doc.y -= 6
+            elif block["type"] == "table":
+                _pdf_table(doc, block)
+            elif block["type"] == "chart":
+                _pdf_chart(doc, block)
+            elif block["type"] == "markdown":
+                _pdf_markdown(doc, block["text"])
+        doc.y -= 10
+    return doc.render()
+
+
+def render(report, fmt):
+    """Artifact bytes and MIME type for a report model."""
+    if fmt == "pdf":
+        return render_pdf(report), "application/pdf"
+    return render_html(report).encode("utf-8"), "text/html; charset=utf-8"
+
+
+class ArtifactStore:
+    """
+    Rendered reports on disk, shared between workers and already encrypted by the caller.
+    Reads refresh the modification time; the least recently used files go past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def save(self, key, blob):
+        tmp = self._path(key + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def load(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(self._path(key))
+        return blob
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        total = sum(e[2] for e in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+            total -= size
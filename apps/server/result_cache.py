@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import logging
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from encryption_utils import encrypt_data, decrypt_data
+
+log = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sequence_hash(sequence):
+    # Sequences are case-insensitive; anything else goes through content_hash as is
+    return content_hash((sequence or "").upper())
+
+
+def make_key(kind, sequence_digest, params=None, scope=None):
+    """Cache key for (sequence hash, analysis type, parameters), optionally namespaced per user."""
+    canonical = json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+    raw = f"{scope or '-'}|{kind}|{sequence_digest}|{canonical}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier result cache: an in-memory LRU bounded by bytes in front of a size-bounded
+    directory on disk. Values are strings (usually JSON). Entries written with an owner
+    (an (email, salt) pair) are encrypted with that user's key on disk. Values larger than
+    entry_bytes are not cached at all.
+    """
+
+    def __init__(self, memory_bytes, disk_dir=None, disk_bytes=0, entry_bytes=None):
+        self.memory_bytes = memory_bytes
+        self.entry_bytes = entry_bytes or memory_bytes
+        self.disk_dir = disk_dir if disk_bytes > 0 else None
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> value
+        self._memory_used = 0
+        # Disk usage as of the last directory scan (every worker writes to it)
+        self._disk_entries = 0
+        self._disk_used = 0
+        self._disk_written = 0         # bytes this worker wrote since that scan
+        self.stats = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "bytes_saved": 0, "memory_evictions": 0, "disk_evictions": 0
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_evict()
+
+    # --- disk tier ---
+    # The directory is shared by every worker (and node mounting it), so its size is measured
+    # by scanning it, not tracked per process: each worker rescans after writing 1/16 of
+    # disk_bytes and removes the least recently used files (reads refresh the mtime).
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".bin")
+
+    def _disk_evict(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue    # evicted by another worker meanwhile
+                entries.append((st.st_mtime, path, st.st_size))
+        total = sum(e[2] for e in entries)
+        evicted = 0
+        for _, path, size in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_entries = len(entries) - evicted
+            self._disk_used = total
+            self._disk_written = 0
+            self.stats["disk_evictions"] += evicted
+
+    def _disk_get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _disk_put(self, key, data):
+        size = len(data.encode("utf-8"))
+        if size > self.disk_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._disk_written += size
+            due = self._disk_written >= max(self.disk_bytes // 16, 1)
+        if due:
+            self._disk_evict()
+
+    # --- memory tier ---
+    def _memory_put(self, key, value, size):
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_used -= len(self._memory.pop(key).encode("utf-8"))
+            self._memory[key] = value
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes and self._memory:
+                _, old = self._memory.popitem(last=False)
+                self._memory_used -= len(old.encode("utf-8"))
+                self.stats["memory_evictions"] += 1
+
+    # --- public API ---
+    def get(self, key, owner=None):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["bytes_saved"] += len(value)
+                return value
+
+        if self.disk_dir:
+            data = self._disk_get(key)
+            if data is not None:
+                value = decrypt_data(data, *owner) if owner else data
+                if value is not None and not value.startswith("[Error:"):
+                    self._memory_put(key, value, len(value.encode("utf-8")))
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                        self.stats["bytes_saved"] += len(value)
+                    return value
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, value, owner=None):
+        size = len(value.encode("utf-8"))
+        if size > self.entry_bytes:
+            return
+        self._memory_put(key, value, size)
+        if self.disk_dir:
+            try:
+                self._disk_put(key, encrypt_data(value, *owner) if owner else value)
+            except OSError as e:
+                log.warning("Result cache disk write failed: %s", e)
+
+    def get_or_compute(self, key, compute, owner=None, bypass=False):
+        """Returns the cached string for key, or runs compute() (which must return a string) and stores it."""
+        if not bypass:
+            cached = self.get(key, owner)
+            if cached is not None:
+                return cached
+        value = compute()
+        if value is not None:
+            self.put(key, value, owner)
+        return value
+
+    def tee(self, key, chunks, owner=None):
+        """
+        Yields chunks as they are produced and stores their concatenation once all of them were.
+        Past entry_bytes it stops collecting (the body would not be cached anyway) and just streams.
+        """
+        parts, size = [], 0
+        for chunk in chunks:
+            if parts is not None:
+                size += len(chunk)
+                if size > self.entry_bytes:
+                    parts = None
+                else:
+                    parts.append(chunk)
+            yield chunk
+        # Not reached when the client disconnects midway, so a partial body is never cached
+        if parts is not None:
+            self.put(key, "".join(parts), owner)
+
+    def snapshot(self):
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return dict(
+                self.stats,
+                hit_ratio=round(hits / lookups, 4) if lookups else 0.0,
+                memory_entries=len(self._memory),
+                memory_bytes=self._memory_used,
+                memory_limit=self.memory_bytes,
+                entry_limit=self.entry_bytes,
+                disk_entries=self._disk_entries,
+                disk_bytes=self._disk_used,
+                disk_limit=self.disk_bytes if self.disk_dir else 0,
+                timestamp=time.time()
+            )
+
+
+result_cache = ResultCache(
+    memory_bytes=int(float(os.environ.get("RESULT_CACHE_MEMORY_MB", 64)) * MB),
+    disk_dir=os.environ.get("RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "geneforge-result-cache")),
+    disk_bytes=int(float(os.environ.get("RESULT_CACHE_DISK_MB", 512)) * MB),
+    entry_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_ENTRY_MB", 8)) * MB),
+)
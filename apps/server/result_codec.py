@@ -0,0 +1,213 @@
+import json
+import base64
+import zlib
+from collections.abc import Mapping
+
+import numpy as np
+
+# Optional zstd support, zlib otherwise
+try:
+    import zstandard
+    _zstd_c = zstandard.ZstdCompressor(level=6)
+    _zstd_d = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+CODEC_TAG = "gfcol/1"
+MIN_COLUMN_LEN = 16       # shorter lists stay plain JSON
+MIN_COMPRESS_BYTES = 512  # payloads below this are not worth compressing
+
+
+def _compress(raw, compress):
+    if not compress or len(raw) < MIN_COMPRESS_BYTES:
+        return raw, None
+    if zstandard is not None:
+        return _zstd_c.compress(raw), "zstd"
+    return zlib.compress(raw, 6), "zlib"
+
+
+def _decompress(raw, method):
+    if method is None:
+        return raw
+    if method == "zstd":
+        if zstandard is None:
+            raise ValueError("Result payload is zstd-compressed but zstandard is not installed")
+        return _zstd_d.decompress(raw)
+    if method == "zlib":
+        return zlib.decompress(raw)
+    raise ValueError(f"Unknown compression: {method}")
+
+
+def _pack(raw, compress):
+    data, method = _compress(raw, compress)
+    return {"data": base64.b64encode(data).decode("ascii"), "z": method}
+
+
+def _unpack(desc):
+    return _decompress(base64.b64decode(desc["data"]), desc.get("z"))
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _encode_array(arr, compress):
+    arr = np.asarray(arr)
+    if arr.dtype.kind == "f":
+        # Only when every value survives the round trip exactly
+        narrow = arr.astype(np.float32)
+        if np.array_equal(narrow.astype(arr.dtype), arr, equal_nan=True):
+            arr = narrow
+    elif arr.dtype.kind in "iu":
+        lo, hi = (int(arr.min()), int(arr.max())) if arr.size else (0, 0)
+        for dt in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dt)
+            if info.min <= lo and hi <= info.max:
+                arr = arr.astype(dt)
+                break
+        else:
+            # Unsigned values past the int64 range would wrap negative
+            if hi <= np.iinfo(np.int64).max:
+                arr = arr.astype(np.int64)
+            else:
+                arr = arr.astype(np.uint64)
+    arr = np.ascontiguousarray(arr)
+    desc = {"t": "array", "dtype": arr.dtype.newbyteorder("<").str, "n": int(arr.size)}
+    desc.update(_pack(arr.astype(desc["dtype"], copy=False).tobytes(), compress))
+    return desc
+
+
+def _encode_json(value, compress):
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if not compress or len(raw) < MIN_COMPRESS_BYTES:
+        return {"t": "json", "value": value}
+    desc = {"t": "jsonz"}
+    desc.update(_pack(raw, compress))
+    return desc
+
+
+def _encode_strings(values, compress):
+    categories = sorted(set(values))
+    if len(categories) <= max(256, len(values) // 4):
+        lookup = {c: i for i, c in enumerate(categories)}
+        codes = np.fromiter((lookup[v] for v in values), dtype=np.int64, count=len(values))
+        return {"t": "dict", "categories": categories, "codes": _encode_array(codes, compress)}
+    return _encode_json(values, compress)
+
+
+def encode_value(value, compress=True):
+    """Encodes one result field into a descriptor, choosing a columnar layout where it fits."""
+    if isinstance(value, np.ndarray):
+        return _encode_array(value, compress)
+    if not isinstance(value, list) or not value:
+        return _encode_json(value, compress)
+
+    if all(isinstance(v, list) for v in value):
+        # Ragged nested lists (e.g. six reading frames) -> offsets + flattened child column
+        flat = [item for v in value for item in v]
+        if len(flat) >= MIN_COLUMN_LEN:
+            offsets = np.zeros(len(value) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(v) for v in value])
+            return {
+                "t": "lists",
+                "offsets": _encode_array(offsets, compress),
+                "values": encode_value(flat, compress)
+            }
+    if len(value) < MIN_COLUMN_LEN:
+        return _encode_json(value, compress)
+
+    first = value[0]
+    if all(_is_number(v) for v in value):
+        arr = np.array(value)
+        if arr.dtype.kind in "iuf":
+            return _encode_array(arr, compress)
+        return _encode_json(value, compress)
+    if isinstance(first, str) and all(isinstance(v, str) for v in value):
+        return _encode_strings(value, compress)
+    if isinstance(first, dict):
+        keys = list(first.keys())
+        if all(isinstance(v, dict) and list(v.keys()) == keys for v in value):
+            # Array of objects -> one column per key
+            return {
+                "t": "records",
+                "n": len(value),
+                "columns": {k: encode_value([v[k] for v in value], compress) for k in keys}
+            }
+    return _encode_json(value, compress)
+
+
+def decode_value(desc):
+    kind = desc["t"]
+    if kind == "json":
+        return desc["value"]
+    if kind == "jsonz":
+        return json.loads(_unpack(desc))
+    if kind == "array":
+        arr = np.frombuffer(_unpack(desc), dtype=np.dtype(desc["dtype"]))
+        if arr.dtype == np.float32:
+            # Only exactly representable values are narrowed, so widening restores them bit for bit
+            arr = arr.astype(np.float64)
+        return arr.tolist()
+    if kind == "dict":
+        categories = desc["categories"]
+        return [categories[i] for i in decode_value(desc["codes"])]
+    if kind == "records":
+        columns = {k: decode_value(d) for k, d in desc["columns"].items()}
+        keys = list(columns.keys())
+        return [dict(zip(keys, row)) for row in zip(*(columns[k] for k in keys))] if keys else [{}] * desc["n"]
+    if kind == "lists":
+        offsets = decode_value(desc["offsets"])
+        flat = decode_value(desc["values"])
+        return [flat[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    raise ValueError(f"Unknown column type: {kind}")
+
+
+def encode_results(results, compress=True):
+    """Serializes an analysis results dict into the columnar envelope (a JSON string)."""
+    if not isinstance(results, dict):
+        return json.dumps(results)
+    return json.dumps({
+        "__codec__": CODEC_TAG,
+        "fields": {k: encode_value(v, compress) for k, v in results.items()}
+    }, separators=(",", ":"))
+
+
+class ColumnarResults(Mapping):
+    """Read-only view over an encoded envelope; each field is decoded on first access."""
+
+    def __init__(self, fields):
+        self._fields = fields
+        self._cache = {}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            self._cache[key] = decode_value(self._fields[key])
+        return self._cache[key]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def to_dict(self, fields=None):
+        keys = [k for k in fields if k in self._fields] if fields else list(self._fields)
+        return {k: self[k] for k in keys}
+
+
+def decode_results(text):
+    """Accepts both the columnar envelope and legacy plain-JSON results. Returns a Mapping."""
+    if not text:
+        return {}
+    data = json.loads(text)
+    if isinstance(data, dict) and data.get("__codec__") == CODEC_TAG:
+        return ColumnarResults(data["fields"])
+    return data
+
+
+def results_to_dict(results, fields=None):
+    if isinstance(results, ColumnarResults):
+        return results.to_dict(fields)
+    if fields and isinstance(results, dict):
+        return {k: results[k] for k in fields if k in results}
+    return results
@@ -0,0 +1,162 @@
+import os
+import time
+import threading
+from collections import defaultdict
+
+RATE_WINDOW_SECONDS = 60
+
+
+class _RateWindow:
+    """Per-second buckets over the last RATE_WINDOW_SECONDS."""
+
+    def __init__(self):
+        self.buckets = [0] * RATE_WINDOW_SECONDS
+        self.stamps = [0] * RATE_WINDOW_SECONDS
+
+    def add(self, now, n=1):
+        sec = int(now)
+        i = sec % RATE_WINDOW_SECONDS
+        if self.stamps[i] != sec:
+            self.stamps[i] = sec
+            self.buckets[i] = 0
+        self.buckets[i] += n
+
+    def per_second(self, now):
+        cutoff = int(now) - RATE_WINDOW_SECONDS
+        total = sum(b for b, s in zip(self.buckets, self.stamps) if s > cutoff)
+        return total / RATE_WINDOW_SECONDS
+
+    def merge(self, other):
+        for i, (b, sec) in enumerate(zip(other.buckets, other.stamps)):
+            if sec > self.stamps[i]:
+                self.stamps[i], self.buckets[i] = sec, b
+            elif sec == self.stamps[i]:
+                self.buckets[i] += b
+
+
+class _RoomStats:
+    def __init__(self):
+        self.members = set()
+        self.messages = 0
+        self.deliveries = 0
+        self.bytes = 0
+        self.events = defaultdict(int)
+        self.rate = _RateWindow()
+
+    def absorb(self, other):
+        self.messages += other.messages
+        self.deliveries += other.deliveries
+        self.bytes += other.bytes
+        for event, n in other.events.items():
+            self.events[event] += n
+        self.rate.merge(other.rate)
+
+
+class RoomMetrics:
+    """
+    Per-worker room membership and fan-out counters for the Socket.IO relay.
+    Membership is local to this worker; with a message queue each node reports its own share.
+    Room names come from clients, so a room is tracked only while it has members here; when the
+    last one leaves its counters are folded into the worker totals and the room is dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms = defaultdict(_RoomStats)
+        self._retired = _RoomStats()
+        self._sid_rooms = defaultdict(set)
+        self._started = time.time()
+        self.worker_id = f"{os.uname().nodename if hasattr(os, 'uname') else 'local'}:{os.getpid()}"
+
+    def connected(self, sid):
+        with self._lock:
+            self._sid_rooms[sid]
+
+    def joined(self, sid, room):
+        with self._lock:
+            self._rooms[room].members.add(sid)
+            self._sid_rooms[sid].add(room)
+
+    def left(self, sid, room):
+        with self._lock:
+            self._leave(sid, room)
+            self._sid_rooms[sid].discard(room)
+
+    def disconnected(self, sid):
+        with self._lock:
+            for room in self._sid_rooms.pop(sid, ()):
+                self._leave(sid, room)
+
+    def _leave(self, sid, room):
+        stats = self._rooms.get(room)
+        if stats is None:
+            return
+        stats.members.discard(sid)
+        if not stats.members:
+            self._retired.absorb(stats)
+            del self._rooms[room]
+
+    def relayed(self, room, event, size, include_self=True):
+        now = time.time()
+        with self._lock:
+            stats = self._rooms.get(room)
+            if stats is None:
+                # No members on this worker: nothing delivered here, and no entry for an arbitrary name
+                return
+            recipients = len(stats.members) - (0 if include_self else 1)
+            stats.messages += 1
+            stats.deliveries += max(recipients, 0)
+            stats.bytes += size
+            stats.events[event] += 1
+            stats.rate.add(now)
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            rooms = {}
+            for name, s in self._rooms.items():
+                rooms[name] = {
+                    "members": len(s.members),
+                    "messages": s.messages,
+                    "deliveries": s.deliveries,
+                    "bytes": s.bytes,
+                    "avg_fanout": round(s.deliveries / s.messages, 2) if s.messages else 0,
+                    "messages_per_sec": round(s.rate.per_second(now), 3),
+                    "events": dict(s.events)
+                }
+            return {
+                "worker": self.worker_id,
+                "uptime_seconds": round(now - self._started, 1),
+                "connections": len(self._sid_rooms),
+                "rooms": rooms
+            }
+
+    def families(self):
+        """Worker totals for /metrics; rooms are summed rather than labelled to keep cardinality flat."""
+        now = time.time()
+        with self._lock:
+            live = list(self._rooms.values())
+            # Counters include rooms that have since emptied so they never go backwards
+            rooms = live + [self._retired]
+            events = defaultdict(int)
+            for s in rooms:
+                for event, n in s.events.items():
+                    events[event] += n
+            return [
+                ("socketio_connections", "gauge", "Connected Socket.IO clients on this worker.",
+                 [({}, len(self._sid_rooms))]),
+                ("socketio_rooms", "gauge", "Rooms with members on this worker.", [({}, len(live))]),
+                ("socketio_room_members", "gauge", "Room memberships across all rooms.",
+                 [({}, sum(len(s.members) for s in rooms))]),
+                ("socketio_messages_total", "counter", "Relayed room events by type.",
+                 [({"event": e}, n) for e, n in events.items()]),
+                ("socketio_deliveries_total", "counter", "Messages delivered to room members (fan-out).",
+                 [({}, sum(s.deliveries for s in rooms))]),
+                ("socketio_message_bytes_total", "counter", "Payload bytes relayed.",
+                 [({}, sum(s.bytes for s in rooms))]),
+                ("socketio_messages_per_second", "gauge", f"Relay rate over the last {RATE_WINDOW_SECONDS}s.",
+                 [({}, round(sum(s.rate.per_second(now) for s in rooms), 3))]),
+            ]
+
+
+room_metrics = RoomMetrics()
@@ -0,0 +1,115 @@
+import time
+import uuid
+import threading
+
+KEEPALIVE_SECONDS = 15
+
+
+def sse_event(data, event_id=None, event=None):
+    """One Server-Sent Events frame; multi-line data becomes several data: fields."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in str(data).split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_event_id(value):
+    """Splits a Last-Event-ID of the form '<generation>-<seq>'; returns (None, -1) if malformed."""
+    generation, _, seq = (value or "").strip().rpartition("-")
+    if not generation or not seq.isdigit():
+        return None, -1
+    return generation, int(seq)
+
+
+class Generation:
+    """
+    One upstream generation: an append-only list of (event, data) that any number of
+    readers can follow from any position while the producer is still running.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.id = uuid.uuid4().hex[:12]
+        self.events = []
+        self.done = False
+        self.finished_at = None
+        self._cond = threading.Condition()
+
+    def append(self, data, event=None):
+        with self._cond:
+            self.events.append((event, data))
+            self._cond.notify_all()
+
+    def finish(self):
+        with self._cond:
+            self.done = True
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def follow(self, after=-1, keepalive=KEEPALIVE_SECONDS):
+        """
+        Yields (seq, event, data) for every event after `after`, blocking for new ones until
+        the generation finishes. Yields None when nothing arrived for `keepalive` seconds.
+        """
+        seq = after + 1
+        while True:
+            with self._cond:
+                if seq >= len(self.events) and not self.done:
+                    self._cond.wait(keepalive)
+                pending = self.events[seq:]
+                done = self.done
+            if not pending and not done:
+                yield None
+            for event, data in pending:
+                yield seq, event, data
+                seq += 1
+            if done and seq >= len(self.events):
+                return
+
+
+class StreamHub:
+    """
+    Live and recently finished generations of this worker. Requests for the same key attach
+    to the running generation instead of starting another; finished ones stay replayable
+    for `ttl` seconds.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_id = {}
+
+    def _sweep(self, now):
+        expired = [g for g in self._by_id.values() if g.done and now - g.finished_at > self.ttl]
+        for generation in expired:
+            del self._by_id[generation.id]
+            if self._by_key.get(generation.key) is generation:
+                del self._by_key[generation.key]
+
+    def get(self, generation_id):
+        with self._lock:
+            self._sweep(time.time())
+            return self._by_id.get(generation_id)
+
+    def attach(self, key):
+        """Returns (generation, started): the running generation for key, or a new one to produce."""
+        with self._lock:
+            self._sweep(time.time())
+            generation = self._by_key.get(key)
+            if generation is not None and not generation.done:
+                return generation, False
+            generation = Generation(key)
+            self._by_key[key] = generation
+            self._by_id[generation.id] = generation
+            return generation, True
+
+    def snapshot(self):
+        with self._lock:
+            self._sweep(time.time())
+            live = [g for g in self._by_id.values() if not g.done]
+            return {"live": len(live), "replayable": len(self._by_id) - len(live),
+                    "events": sum(len(g.events) for g in self._by_id.values())}
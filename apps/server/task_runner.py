@@ -0,0 +1,119 @@
+import os
+import threading
+from log_utils import carry_request_id
+
+
+def _green():
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched("thread")
+
+
+def spawn(fn, *args, **kwargs):
+    """Starts fn in the background: a greenlet under eventlet, a daemon thread otherwise."""
+    # Background work logs under the request id that started it
+    fn = carry_request_id(fn)
+    if _green():
+        import eventlet
+        return eventlet.spawn(fn, *args, **kwargs)
+    thread = threading.Thread(target=fn, args=args, kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+def offload(fn, *args, **kwargs):
+    """
+    Runs CPU-bound fn on a real OS thread and waits for the result. Under eventlet this
+    only blocks the calling greenlet (NumPy releases the GIL), so the server keeps serving.
+    """
+    if _green():
+        from eventlet import tpool
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+class TaskLimiter:
+    """Caps how many background jobs of one kind run at once (green-aware when patched)."""
+
+    def __init__(self, limit):
+        self._semaphore = threading.BoundedSemaphore(max(int(limit), 1))
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._semaphore.release()
+        return False
+
+
+def _os_threading():
+    # Real threads even when the threading module is monkey-patched
+    if _green():
+        from eventlet import patcher
+        return patcher.original("threading")
+    return threading
+
+
+def native_thread(fn, *args, name=None):
+    """Starts fn on a real OS daemon thread, for work that must never run on the hub (blocking I/O)."""
+    thread = _os_threading().Thread(target=fn, args=args, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def parallel_map(fn, items, workers=None):
+    """
+    Maps fn over items on a pool of OS threads and returns the results in order. Meant for
+    NumPy-heavy fn that releases the GIL; call it from offload() so the hub is never blocked.
+    """
+    items = list(items)
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+
+    real_threading = _os_threading()
+    results = [None] * len(items)
+    errors = []
+    pending = iter(range(len(items)))
+    lock = real_threading.Lock()
+
+    def worker():
+        while not errors:
+            with lock:
+                i = next(pending, None)
+            if i is None:
+                return
+            try:
+                results[i] = fn(items[i])
+            except Exception as e:
+                errors.append(e)
+
+    threads = [real_threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def process_map(fn, arg_tuples, workers=None):
+    """
+    Runs fn(*args) for every tuple in a pool of worker processes and returns the results in
+    order. Workers are spawned, so they start clean (no server state, no monkey-patching);
+    fn must be a module-level function. Under eventlet, waiting on the pool only blocks the
+    calling greenlet, so call this directly rather than through offload().
+    """
+    tasks = list(arg_tuples)
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return offload(lambda: [fn(*args) for args in tasks])
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(fn, *args) for args in tasks]
+        return [future.result() for future in futures]